@@ -0,0 +1,154 @@
+"""
+Measure how many dashboard sockets one web process can keep updated.
+
+Connects growing numbers of dashboard WebSockets to the ASGI application
+in this process, broadcasts a dashboard update of realistic size each
+tick and times how long it takes to reach every socket. A socket count is
+sustained while updates reach all sockets within half the push interval.
+The channel layer comes from the settings, so set CHANNEL_REDIS_URL to
+measure the Redis layer:
+
+    python benchmarks/dashboard_sockets.py --sockets 100 500 1000 2000
+
+WebSocket framing and the network are not included; with real browsers
+the server's send cost per socket comes on top of the figures reported.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import django
+import psutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "netcreep.settings")
+django.setup()
+
+from channels.layers import get_channel_layer  # noqa: E402
+from channels.testing import WebsocketCommunicator  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from monitor.dashboard_publisher import publisher  # noqa: E402
+from monitor.utils import abroadcast_update  # noqa: E402
+from netcreep.asgi import application  # noqa: E402
+
+HEADERS = [(b"host", b"localhost"), (b"origin", b"http://localhost")]
+
+
+def sample_update(tick: int) -> dict:
+    """
+    Dashboard update with every section changed.
+
+    Args:
+        tick (int): Tick number, so consecutive updates differ
+
+    Returns:
+        Update in the format sent by the dashboard publisher
+    """
+    return {
+        "system_stats": {
+            "cpu_usage": 12.5,
+            "memory_usage": 48.1,
+            "disk_usage": 61.0,
+            "network_in": 125000.0 + tick,
+            "network_out": 48000.0,
+            "timestamp": time.time(),
+        },
+        "recent_packets": [
+            {
+                "timestamp": "2024-01-01T12:00:00+00:00",
+                "protocol": "TCP",
+                "source": f"10.0.0.{i}:{40000 + tick}",
+                "destination": "192.168.0.1:443",
+                "size": 1500,
+            }
+            for i in range(10)
+        ],
+    }
+
+
+async def run(sockets: int, ticks: int, interval: float) -> dict:
+    """
+    Connect sockets and time update fan-out to them.
+
+    Args:
+        sockets (int): Number of dashboard sockets
+        ticks (int): Updates broadcast
+        interval (float): Seconds between updates
+
+    Returns:
+        Dictionary of connect rate, fan-out times and memory per socket
+    """
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+
+    started = time.perf_counter()
+    communicators = []
+    for _ in range(sockets):
+        communicator = WebsocketCommunicator(application, "/ws/dashboard/", HEADERS)
+        connected, _ = await communicator.connect()
+        if not connected:
+            raise RuntimeError("Dashboard socket was refused")
+        communicators.append(communicator)
+    connect_seconds = time.perf_counter() - started
+    rss_per_socket = (process.memory_info().rss - rss_before) / sockets
+
+    fan_out = []
+    try:
+        for tick in range(ticks):
+            tick_started = time.perf_counter()
+            await abroadcast_update(sample_update(tick))
+            await asyncio.gather(
+                *(
+                    communicator.receive_from(timeout=30)
+                    for communicator in communicators
+                )
+            )
+            elapsed = time.perf_counter() - tick_started
+            fan_out.append(elapsed)
+            await asyncio.sleep(max(0.0, interval - elapsed))
+    finally:
+        for communicator in communicators:
+            await communicator.disconnect()
+
+    fan_out.sort()
+    return {
+        "connects_per_second": sockets / connect_seconds,
+        "median_ms": statistics.median(fan_out) * 1000,
+        "p99_ms": fan_out[min(len(fan_out) - 1, int(len(fan_out) * 0.99))] * 1000,
+        "rss_kb_per_socket": rss_per_socket / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sockets", type=int, nargs="+", default=[100, 500, 1000, 2000]
+    )
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument(
+        "--interval", type=float, default=settings.DASHBOARD_PUSH_INTERVAL
+    )
+    args = parser.parse_args()
+
+    # Updates come from this script rather than the database
+    publisher.viewer_joined = publisher.viewer_left = lambda: None
+
+    print(f"Channel layer: {type(get_channel_layer()).__name__}")
+    for sockets in args.sockets:
+        result = asyncio.run(run(sockets, args.ticks, args.interval))
+        sustained = "yes" if result["p99_ms"] < args.interval * 1000 / 2 else "no"
+        print(
+            f"{sockets:>6} sockets: {result['connects_per_second']:7.0f} connects/s, "
+            f"fan-out median {result['median_ms']:7.1f}ms "
+            f"p99 {result['p99_ms']:7.1f}ms, "
+            f"{result['rss_kb_per_socket']:5.1f}KB/socket, sustained: {sustained}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,549 @@
+"""
+Measure packet throughput through capture, ingest and analysis.
+
+Creates a throwaway test database and times each stage of the pipeline on
+synthetic frames with a configurable protocol mix:
+
+    decode     scapy dissection plus the scapy capture callback's field
+               extraction, and the struct decoder of the raw and mmap engines
+    transport  packets through each writer transport and back
+    pipeline   a pcap file of the frames replayed at --rate through capture
+               workers, writer queues and writer processes into the database
+    writes     the writers' batched inserts and rollups, filling the packet
+               table to each --rows size
+    views      the dashboard, packet history and analysis pages
+    detector   AdvancedAnomalyDetector over the last hour of packets
+
+Results are written as JSON; pass an earlier file as --baseline to list the
+metrics that got worse:
+
+    python benchmarks/throughput.py --rows 10000 1000000 10000000 \\
+        --output results.json --baseline previous.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "netcreep.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from scapy.all import ICMP, IP, TCP, UDP, Ether  # noqa: E402
+from scapy.layers.inet6 import IPv6  # noqa: E402
+from scapy.layers.l2 import ARP  # noqa: E402
+
+from monitor.anomaly_detector import AdvancedAnomalyDetector  # noqa: E402
+from monitor.packet_decoder import decode_frame  # noqa: E402
+from monitor.pcap_replay import PcapReplayManager  # noqa: E402
+from monitor.pcap_ring import PcapRing  # noqa: E402
+from monitor.sniffer import TRANSPORTS, PacketCaptureManager  # noqa: E402
+
+STAGES = ("decode", "transport", "pipeline", "writes", "views", "detector")
+DEFAULT_MIX = "tcp=60,udp=30,icmp=5,ipv6=4,arp=1"
+VIEWS = {
+    "dashboard": "/monitor/",
+    "packet_history": "/monitor/packet-history/",
+    "network_analysis": "/monitor/network-analysis/",
+    "anomalies": "/monitor/anomalies/",
+}
+INTERFACE = "bench0"
+# Fixed addresses spare scapy a route and ARP lookup per frame
+ETHERNET = {"src": "02:00:00:00:00:01", "dst": "02:00:00:00:00:02"}
+# Metrics that got worse by more than this fraction are reported
+DEFAULT_TOLERANCE = 0.1
+
+
+def parse_mix(value: str) -> dict:
+    """
+    Parse a protocol mix such as ``tcp=60,udp=40``.
+
+    Args:
+        value (str): Comma-separated protocol=weight pairs
+
+    Returns:
+        Weights by protocol
+    """
+    mix = {}
+    for part in value.split(","):
+        protocol, _, weight = part.partition("=")
+        protocol = protocol.strip().lower()
+        if protocol not in ("tcp", "udp", "icmp", "ipv6", "arp"):
+            raise argparse.ArgumentTypeError(f"Unknown protocol {protocol!r}")
+        mix[protocol] = float(weight or 1)
+    return mix
+
+
+def synthetic_frame(rng: random.Random, protocol: str) -> bytes:
+    """
+    Build an Ethernet frame, one in fifty coming from a single busy host.
+
+    Args:
+        rng (random.Random): Random number generator
+        protocol (str): "tcp", "udp", "icmp", "ipv6" (UDP over IPv6) or
+            "arp"
+
+    Returns:
+        Frame bytes
+    """
+    if protocol == "arp":
+        return bytes(Ether(**ETHERNET) / ARP(pdst="192.168.0.1"))
+    payload = b"x" * min(int(rng.lognormvariate(5, 1)), 1400)
+    sport = rng.randrange(1024, 65536)
+    if protocol == "ipv6":
+        ip = IPv6(src=f"fd00::{rng.randrange(1, 65536):x}", dst="fd00::1")
+        return bytes(Ether(**ETHERNET) / ip / UDP(sport=sport, dport=53) / payload)
+
+    if rng.random() < 0.02:
+        source = "10.99.0.1"
+    else:
+        source = f"10.{rng.randrange(4)}.{rng.randrange(256)}.{rng.randrange(256)}"
+    ip = IP(src=source, dst="192.168.0.1")
+    if protocol == "tcp":
+        dport = rng.choice((80, 443, 443, 22, rng.randrange(1, 65536)))
+        layer = TCP(sport=sport, dport=dport, flags=rng.choice("SAPF"))
+    elif protocol == "udp":
+        layer = UDP(sport=sport, dport=rng.choice((53, 123, 5353)))
+    else:
+        layer = ICMP()
+    return bytes(Ether(**ETHERNET) / ip / layer / payload)
+
+
+def frame_pool(mix: dict, size: int, seed: int = 0) -> list:
+    """
+    Build a pool of distinct frames in the given protocol mix.
+
+    Args:
+        mix (dict): Weights by protocol
+        size (int): Number of frames
+        seed (int): Random seed, so runs are comparable
+
+    Returns:
+        List of frame bytes
+    """
+    rng = random.Random(seed)
+    protocols = rng.choices(list(mix), weights=list(mix.values()), k=size)
+    return [synthetic_frame(rng, protocol) for protocol in protocols]
+
+
+def cycle(pool: list, count: int):
+    """Yield ``count`` items, going round ``pool`` as often as needed."""
+    for index in range(count):
+        yield pool[index % len(pool)]
+
+
+def rate(count: int, seconds: float) -> float:
+    """Items per second, 0 if nothing was timed."""
+    return count / seconds if seconds > 0 else 0.0
+
+
+def bench_decode(pool: list, count: int) -> dict:
+    """
+    Time per-frame decoding by the capture engines.
+
+    The scapy figure covers what each sniffed packet costs the capture
+    worker's callback: dissecting the frame and extracting its fields.
+
+    Args:
+        pool (list): Frames
+        count (int): Frames decoded per engine
+
+    Returns:
+        Frames per second by engine
+    """
+    manager = PacketCaptureManager(interfaces=[INTERFACE])
+    started = time.perf_counter()
+    for frame in cycle(pool, count):
+        manager._process_packet(Ether(frame), INTERFACE)
+    scapy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for frame in cycle(pool, count):
+        decode_frame(frame, INTERFACE)
+    raw_seconds = time.perf_counter() - started
+    return {
+        "scapy_per_second": rate(count, scapy_seconds),
+        "raw_per_second": rate(count, raw_seconds),
+    }
+
+
+def bench_transport(packets: list, count: int, batch: int = 1000) -> dict:
+    """
+    Time packets through each writer transport, put then taken in batches.
+
+    Args:
+        packets (list): Decoded packet data
+        count (int): Packets sent per transport
+        batch (int): Packets put before they are taken back
+
+    Returns:
+        Packets per second by transport
+    """
+    results = {}
+    for transport in TRANSPORTS:
+        manager = PacketCaptureManager(
+            interfaces=[INTERFACE], transport=transport, max_queue_size=batch
+        )
+        manager._counter_slot = 0
+        sent = 0
+        started = time.perf_counter()
+        while sent < count:
+            size = min(batch, count - sent)
+            for index in range(sent, sent + size):
+                manager._enqueue_packet(packets[index % len(packets)], INTERFACE)
+            received = 0
+            while received < size:
+                received += len(manager._get_packets(size - received, 1.0))
+            sent += size
+        seconds = time.perf_counter() - started
+        results[f"{transport}_per_second"] = rate(count, seconds)
+    return results
+
+
+def bench_pipeline(pool: list, count: int, packet_rate: float, args) -> dict:
+    """
+    Replay the frames through capture workers and writers into the database.
+
+    Args:
+        pool (list): Frames
+        count (int): Frames replayed
+        packet_rate (float): Frames per second offered, 0 for as fast as
+            the pipeline takes them
+        args: Command line arguments
+
+    Returns:
+        Replay statistics; packets are dropped rather than held back when
+        the offered rate is not sustained
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        per_file = -(-count // args.capture_workers)
+        gap = 1 / packet_rate * args.capture_workers if packet_rate else 0.0
+        for worker in range(args.capture_workers):
+            ring = PcapRing(directory, f"bench{worker}", file_size=1 << 62)
+            start = worker * per_file
+            for index, frame in enumerate(
+                cycle(pool, min(per_file, count - start)), start
+            ):
+                ring.write(frame, timestamp=1700000000 + index * gap)
+            ring.close()
+        files = sorted(
+            os.path.join(directory, entry) for entry in os.listdir(directory)
+        )
+
+        manager = PcapReplayManager(
+            files,
+            interface=INTERFACE,
+            parallel=args.capture_workers > 1,
+            speed=1.0 if packet_rate else 0.0,
+            drop_on_full=bool(packet_rate),
+            num_writers=args.writers,
+            transport=args.transport,
+            shard_by="flow",
+            batch_size=args.batch_size,
+            max_packet_store=None,
+            stream_detection=False,
+        )
+        stats = manager.replay()
+    stats["offered_per_second"] = packet_rate
+    return stats
+
+
+def write_rows(manager, packets: list, rows: int, rng: random.Random) -> float:
+    """
+    Insert packets the way a writer does, spread over the last hour.
+
+    Args:
+        manager (PacketCaptureManager): Manager whose writer code is used
+        packets (list): Decoded packet data to copy
+        rows (int): Packets inserted
+        rng (random.Random): Random number generator for the timestamps
+
+    Returns:
+        Seconds spent in inserts and rollups
+    """
+    now = timezone.now()
+    seconds = 0.0
+    for offset in range(0, rows, manager.batch_size):
+        batch = [
+            dict(
+                packet_data,
+                timestamp=now - timezone.timedelta(seconds=rng.uniform(0, 3000)),
+            )
+            for packet_data in cycle(packets, min(manager.batch_size, rows - offset))
+        ]
+        started = time.perf_counter()
+        manager._flush_batch(batch)
+        manager.rollups.add(batch)
+        seconds += time.perf_counter() - started
+    started = time.perf_counter()
+    manager.rollups.flush()
+    return seconds + time.perf_counter() - started
+
+
+def median_ms(function, repeat: int) -> float:
+    """Median wall time of ``function`` in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def bench_views(repeat: int) -> dict:
+    """
+    Time the analysis pages against the current packet table.
+
+    Args:
+        repeat (int): Requests per page
+
+    Returns:
+        Median response time in milliseconds by page
+    """
+    client = Client(HTTP_HOST="localhost")
+    results = {}
+    for name, url in VIEWS.items():
+
+        def get():
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}")
+
+        results[f"{name}_ms"] = median_ms(get, repeat)
+    return results
+
+
+def bench_detector(rows: int, per_object_max: int) -> dict:
+    """
+    Time anomaly detection over the last hour of packets.
+
+    Args:
+        rows (int): Packets in the table
+        per_object_max (int): Largest table the per-object path is run on
+
+    Returns:
+        Seconds per detection path
+    """
+    results = {}
+    for label, vectorized in (("vectorized", True), ("per_object", False)):
+        if not vectorized and rows > per_object_max:
+            continue
+        started = time.perf_counter()
+        AdvancedAnomalyDetector.detect_network_anomalies(vectorized=vectorized)
+        results[f"{label}_seconds"] = time.perf_counter() - started
+    return results
+
+
+def run(args) -> dict:
+    """
+    Run the selected stages.
+
+    Args:
+        args: Command line arguments
+
+    Returns:
+        Results by stage; table-size dependent stages by row count
+    """
+    pool = frame_pool(args.mix, args.pool_size)
+    packets = [
+        packet_data
+        for packet_data in (decode_frame(frame, INTERFACE) for frame in pool)
+        if packet_data is not None
+    ]
+    results = {}
+
+    if "decode" in args.stages:
+        results["decode"] = bench_decode(pool, args.packets)
+        print(f"decode: {results['decode']}")
+    if "transport" in args.stages:
+        results["transport"] = bench_transport(packets, args.packets)
+        print(f"transport: {results['transport']}")
+    if "pipeline" in args.stages:
+        results["pipeline"] = {}
+        for packet_rate in args.rate:
+            stats = bench_pipeline(pool, args.packets, packet_rate, args)
+            results["pipeline"][str(packet_rate)] = stats
+            print(f"pipeline at {packet_rate or 'max'} packets/s: {stats}")
+
+    tiers = [stage for stage in ("writes", "views", "detector") if stage in args.stages]
+    if not tiers:
+        return results
+
+    from monitor.models import Packet
+
+    # Tiers build on each other, topping the table up to each size
+    Packet.objects.all().delete()
+    manager = PacketCaptureManager(
+        interfaces=[INTERFACE], max_packet_store=None, batch_size=args.batch_size
+    )
+    rng = random.Random(1)
+    stored = 0
+    for rows in sorted(args.rows):
+        tier = results.setdefault("tiers", {}).setdefault(str(rows), {})
+        seconds = write_rows(manager, packets, rows - stored, rng)
+        if "writes" in args.stages:
+            tier["writes"] = {"rows_per_second": rate(rows - stored, seconds)}
+        stored = rows
+        if "views" in args.stages:
+            tier["views"] = bench_views(args.repeat)
+        if "detector" in args.stages:
+            tier["detector"] = bench_detector(rows, args.per_object_max)
+        print(f"{rows} rows: {tier}")
+    return results
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """Flatten nested results into dotted metric names."""
+    metrics = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)):
+            metrics[name] = value
+    return metrics
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    List the metrics that got worse than in a baseline run.
+
+    Rates ending in ``_per_second`` should not fall; times ending in ``_ms``
+    or ``_seconds`` should not rise.
+
+    Args:
+        results (dict): Results of this run
+        baseline (dict): Results of the earlier run
+        tolerance (float): Fraction a metric may get worse by
+
+    Returns:
+        List of (metric, baseline value, value) tuples
+    """
+    current = flatten(results)
+    regressions = []
+    for name, before in flatten(baseline).items():
+        after = current.get(name)
+        if after is None or not before:
+            continue
+        if name.endswith("_per_second"):
+            worse = after < before * (1 - tolerance)
+        elif name.endswith(("_ms", "_seconds")):
+            worse = after > before * (1 + tolerance)
+        else:
+            continue
+        if worse:
+            regressions.append((name, before, after))
+    return regressions
+
+
+def git_revision() -> str:
+    """Commit the benchmarked tree is at, empty outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.strip().splitlines()[2:]),
+    )
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10000, 1000000, 10000000]
+    )
+    parser.add_argument(
+        "--packets",
+        type=int,
+        default=100000,
+        help="Packets per decode, transport and pipeline run",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        nargs="+",
+        default=[0.0],
+        help="Packets per second offered to the pipeline, 0 for maximum",
+    )
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--pool-size", type=int, default=5000)
+    parser.add_argument("--capture-workers", type=int, default=1)
+    parser.add_argument("--writers", type=int, default=1)
+    parser.add_argument("--transport", choices=TRANSPORTS, default="queue")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5, help="Requests per view")
+    parser.add_argument(
+        "--per-object-max",
+        type=int,
+        default=1000000,
+        help="Largest table the per-object anomaly detector is timed on",
+    )
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="Earlier results to compare with")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    # Writer processes cannot share SQLite's in-memory test database
+    test_settings = connection.settings_dict.setdefault("TEST", {})
+    if connection.vendor == "sqlite" and not test_settings.get("NAME"):
+        test_settings["NAME"] = os.path.join(tempfile.gettempdir(), "netcreep_bench.db")
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        started = time.perf_counter()
+        results = run(args)
+        elapsed = time.perf_counter() - started
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    report = {
+        "revision": git_revision(),
+        "created": timezone.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "database": connection.vendor,
+        "config": {
+            key: value for key, value in vars(args).items() if key != "baseline"
+        },
+        "total_seconds": elapsed,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:.4g} -> {after:.4g}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} ({baseline['revision']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,21 @@ import logging
 from typing import Any, Dict, List
 
 import numpy as np
-from django.db.models import Avg, Count, Sum
+from django.db.models import Avg, Count, F, Q
 from django.utils import timezone
 from scipy import stats
 
-from .models import NetworkAnomaly, Packet, SystemStat
+from .heavy_hitters import HEAVY_HITTER_WINDOW, get_heavy_hitters
+from .models import NetworkAnomaly, NetworkInterface, Packet, SystemStat
+from .packet_columns import COLUMN_CHUNK_SIZE, load_packet_columns
+from .rollups import rollup_totals
+from .scan_detector import (
+    SERVICE_PORT_LIMIT,
+    TCP_ACK,
+    TCP_SYN,
+    classify_scan,
+    describe_scan,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,17 +28,26 @@ class AdvancedAnomalyDetector:
 
     @classmethod
     def detect_network_anomalies(
-        cls, time_window_hours: int = 1
+        cls,
+        time_window_hours: int = 1,
+        vectorized: bool = False,
+        chunk_size: int = COLUMN_CHUNK_SIZE,
     ) -> List[Dict[str, Any]]:
         """
         Comprehensive network anomaly detection
 
         Args:
             time_window_hours (int): Hours to analyze for anomalies
+            vectorized (bool): Load the window as NumPy columns and run every
+                detector on them, instead of one query or object per detector
+            chunk_size (int): Rows fetched per chunk in vectorized mode
 
         Returns:
             List of detected anomalies
         """
+        if vectorized:
+            return cls._detect_vectorized(time_window_hours, chunk_size)
+
         anomalies = []
 
         # Protocol Distribution Anomalies
@@ -65,34 +84,30 @@ class AdvancedAnomalyDetector:
             List of protocol distribution anomalies
         """
         cutoff_time = timezone.now() - timezone.timedelta(hours=time_window_hours)
-        protocol_counts = (
-            Packet.objects.filter(timestamp__gte=cutoff_time)
-            .values("protocol")
-            .annotate(count=Count("id"))
-        )
+        protocol_counts = rollup_totals("protocol", since=cutoff_time)
 
-        total_packets = sum(proto["count"] for proto in protocol_counts)
+        total_packets = sum(proto["packets"] for proto in protocol_counts)
         anomalies = []
 
         for proto in protocol_counts:
-            percentage = (proto["count"] / total_packets) * 100
+            percentage = (proto["packets"] / total_packets) * 100
 
             # Unusual protocol percentage thresholds
-            if proto["protocol"] == "TCP" and percentage > 90:
+            if proto["key"] == "TCP" and percentage > 90:
                 anomalies.append(
                     {
                         "type": "Protocol Distribution",
                         "description": f"Unusually high TCP traffic: {percentage:.2f}%",
-                        "severity": "MEDIUM",
+                        "severity": "medium",
                     }
                 )
 
-            if proto["protocol"] == "UDP" and percentage > 50:
+            if proto["key"] == "UDP" and percentage > 50:
                 anomalies.append(
                     {
                         "type": "Protocol Distribution",
                         "description": f"Unusually high UDP traffic: {percentage:.2f}%",
-                        "severity": "LOW",
+                        "severity": "low",
                     }
                 )
 
@@ -115,7 +130,7 @@ class AdvancedAnomalyDetector:
         packets = Packet.objects.filter(timestamp__gte=cutoff_time)
 
         # Packet size analysis
-        sizes = [packet.size for packet in packets]
+        sizes = [packet.packet_size for packet in packets]
 
         if len(sizes) > 10:  # Ensure enough data points
             z_scores = np.abs(stats.zscore(sizes))
@@ -126,7 +141,7 @@ class AdvancedAnomalyDetector:
                     {
                         "type": "Traffic Volume",
                         "description": f"Detected {len(outliers)} unusual packet sizes",
-                        "severity": "HIGH",
+                        "severity": "high",
                     }
                 ]
 
@@ -139,38 +154,48 @@ class AdvancedAnomalyDetector:
         """
         Detect unusual IP address behavior
 
+        For a one hour window, the heavy hitters of a running capture are
+        used when available, so the check does not depend on how many
+        distinct IPs were seen.
+
         Args:
             time_window_hours (int): Hours to analyze
 
         Returns:
             List of IP behavior anomalies
         """
-        cutoff_time = timezone.now() - timezone.timedelta(hours=time_window_hours)
-        ip_stats = (
-            Packet.objects.filter(timestamp__gte=cutoff_time)
-            .values("src_ip")
-            .annotate(packet_count=Count("id"), total_bytes=Sum("size"))
-        )
+        ip_stats = None
+        if time_window_hours * 3600 == HEAVY_HITTER_WINDOW:
+            ip_stats = get_heavy_hitters("source_ip", limit=None)
+        if ip_stats is None:
+            cutoff_time = timezone.now() - timezone.timedelta(hours=time_window_hours)
+            ip_stats = rollup_totals("source_ip", since=cutoff_time)
 
         anomalies = []
         for ip_stat in ip_stats:
             # High packet count anomaly
-            if ip_stat["packet_count"] > 1000:
+            if ip_stat["packets"] > 1000:
                 anomalies.append(
                     {
                         "type": "IP Behavior",
-                        "description": f"High packet count from {ip_stat['src_ip']}: {ip_stat['packet_count']} packets",
-                        "severity": "HIGH",
+                        "description": (
+                            f"High packet count from {ip_stat['key']}: "
+                            f"{ip_stat['packets']} packets"
+                        ),
+                        "severity": "high",
                     }
                 )
 
             # Large data transfer anomaly
-            if ip_stat["total_bytes"] > 100 * 1024 * 1024:  # 100 MB
+            if ip_stat["bytes"] > 100 * 1024 * 1024:  # 100 MB
                 anomalies.append(
                     {
                         "type": "IP Behavior",
-                        "description": f"Large data transfer from {ip_stat['src_ip']}: {ip_stat['total_bytes']} bytes",
-                        "severity": "MEDIUM",
+                        "description": (
+                            f"Large data transfer from {ip_stat['key']}: "
+                            f"{ip_stat['bytes']} bytes"
+                        ),
+                        "severity": "medium",
                     }
                 )
 
@@ -188,24 +213,180 @@ class AdvancedAnomalyDetector:
             List of port scan anomalies
         """
         cutoff_time = timezone.now() - timezone.timedelta(hours=time_window_hours)
-        port_stats = (
-            Packet.objects.filter(timestamp__gte=cutoff_time, dst_port__isnull=False)
-            .values("src_ip", "dst_port")
-            .annotate(connection_count=Count("id"))
+        # Distinct ports and hosts each source probed, as in ``is_probe``:
+        # TCP packets with known flags count when they open a connection,
+        # other packets unless they are replies from service ports
+        tcp_known = Q(protocol="TCP", tcp_flags__isnull=False)
+        source_stats = (
+            Packet.objects.filter(
+                timestamp__gte=cutoff_time, destination_port__isnull=False
+            )
+            .annotate(syn_ack=F("tcp_flags").bitand(TCP_SYN | TCP_ACK))
+            .filter(
+                (tcp_known & Q(syn_ack=TCP_SYN))
+                | (
+                    ~tcp_known
+                    & ~Q(
+                        source_port__lt=SERVICE_PORT_LIMIT,
+                        destination_port__gte=SERVICE_PORT_LIMIT,
+                    )
+                )
+            )
+            .values("source_ip")
+            .annotate(
+                ports=Count("destination_port", distinct=True),
+                hosts=Count("destination_ip", distinct=True),
+            )
+            .filter(Q(ports__gte=100) | Q(hosts__gte=50))
         )
 
         anomalies = []
-        for stat in port_stats:
-            # Potential port scan: many connections to different ports from same IP
-            if stat["connection_count"] > 50:
+        for stat in source_stats:
+            kind = classify_scan(stat["ports"], stat["hosts"], 100, 50)
+            anomalies.append(
+                {
+                    "type": "Port Scan",
+                    "description": describe_scan(
+                        kind, stat["source_ip"], stat["ports"], stat["hosts"]
+                    ),
+                    "severity": "high",
+                }
+            )
+
+        return anomalies
+
+    @classmethod
+    def _detect_vectorized(
+        cls, time_window_hours: int, chunk_size: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Run every detector on the window loaded as NumPy columns
+
+        The same checks as the per-detector path, computed from one pass
+        over the packet table with array operations instead of per-row
+        Python code.
+
+        Args:
+            time_window_hours (int): Hours to analyze
+            chunk_size (int): Rows fetched per chunk
+
+        Returns:
+            List of detected anomalies
+        """
+        cutoff_time = timezone.now() - timezone.timedelta(hours=time_window_hours)
+        columns, labels = load_packet_columns(
+            Packet.objects.filter(timestamp__gte=cutoff_time),
+            numeric_fields=(
+                "packet_size",
+                "sample_rate",
+                "source_port",
+                "destination_port",
+                "tcp_flags",
+            ),
+            categorical_fields=("protocol", "source_ip", "destination_ip"),
+            chunk_size=chunk_size,
+        )
+        sizes = columns["packet_size"]
+        weights = columns["sample_rate"].astype(np.float64)
+        anomalies = []
+
+        # Protocol distribution, weighted by sample rate
+        protocol_counts = np.bincount(columns["protocol"], weights=weights)
+        total_packets = protocol_counts.sum()
+        for protocol, count in zip(labels["protocol"], protocol_counts):
+            percentage = count / total_packets * 100
+            if protocol == "TCP" and percentage > 90:
+                anomalies.append(
+                    {
+                        "type": "Protocol Distribution",
+                        "description": f"Unusually high TCP traffic: {percentage:.2f}%",
+                        "severity": "medium",
+                    }
+                )
+            if protocol == "UDP" and percentage > 50:
                 anomalies.append(
                     {
-                        "type": "Port Scan",
-                        "description": f"Potential port scan from {stat['src_ip']} to port {stat['dst_port']}",
-                        "severity": "HIGH",
+                        "type": "Protocol Distribution",
+                        "description": f"Unusually high UDP traffic: {percentage:.2f}%",
+                        "severity": "low",
                     }
                 )
 
+        # Packet size z-scores
+        if len(sizes) > 10:
+            std = sizes.std()
+            if std > 0:
+                outliers = np.count_nonzero(np.abs(sizes - sizes.mean()) > 3 * std)
+                if outliers:
+                    anomalies.append(
+                        {
+                            "type": "Traffic Volume",
+                            "description": f"Detected {outliers} unusual packet sizes",
+                            "severity": "high",
+                        }
+                    )
+
+        # Per source IP totals, weighted by sample rate
+        ip_packets = np.bincount(columns["source_ip"], weights=weights)
+        ip_bytes = np.bincount(columns["source_ip"], weights=sizes * weights)
+        for index in np.flatnonzero(ip_packets > 1000):
+            anomalies.append(
+                {
+                    "type": "IP Behavior",
+                    "description": (
+                        f"High packet count from {labels['source_ip'][index]}: "
+                        f"{int(ip_packets[index])} packets"
+                    ),
+                    "severity": "high",
+                }
+            )
+        for index in np.flatnonzero(ip_bytes > 100 * 1024 * 1024):
+            anomalies.append(
+                {
+                    "type": "IP Behavior",
+                    "description": (
+                        f"Large data transfer from {labels['source_ip'][index]}: "
+                        f"{int(ip_bytes[index])} bytes"
+                    ),
+                    "severity": "medium",
+                }
+            )
+
+        # Distinct ports and hosts each source probed, as in ``is_probe``
+        source_ports = columns["source_port"]
+        ports = columns["destination_port"]
+        flags = columns["tcp_flags"]
+        tcp = labels["protocol"].index("TCP") if "TCP" in labels["protocol"] else -1
+        tcp_known = (columns["protocol"] == tcp) & (flags >= 0)
+        not_reply = ~(
+            (source_ports >= 0)
+            & (source_ports < SERVICE_PORT_LIMIT)
+            & (ports >= SERVICE_PORT_LIMIT)
+        )
+        syn_only = flags & (TCP_SYN | TCP_ACK) == TCP_SYN
+        probes = (ports >= 0) & np.where(tcp_known, syn_only, not_reply)
+        sources = columns["source_ip"][probes].astype(np.int64)
+        source_count = len(labels["source_ip"])
+        host_count = max(len(labels["destination_ip"]), 1)
+        port_pairs = np.unique(sources * 65536 + ports[probes])
+        distinct_ports = np.bincount(port_pairs // 65536, minlength=source_count)
+        host_pairs = np.unique(sources * host_count + columns["destination_ip"][probes])
+        distinct_hosts = np.bincount(host_pairs // host_count, minlength=source_count)
+        for index in np.flatnonzero((distinct_ports >= 100) | (distinct_hosts >= 50)):
+            kind = classify_scan(distinct_ports[index], distinct_hosts[index], 100, 50)
+            anomalies.append(
+                {
+                    "type": "Port Scan",
+                    "description": describe_scan(
+                        kind,
+                        labels["source_ip"][index],
+                        distinct_ports[index],
+                        distinct_hosts[index],
+                    ),
+                    "severity": "high",
+                }
+            )
+
         return anomalies
 
     @classmethod
@@ -213,27 +394,38 @@ class AdvancedAnomalyDetector:
         """
         Save detected anomalies to database
 
+        Anomalies without an ``interface`` span every interface and are
+        saved without one.
+
         Args:
             anomalies (List[Dict]): List of anomaly dictionaries
         """
+        interfaces = {None: None}
         for anomaly in anomalies:
+            name = anomaly.get("interface")
+            if name not in interfaces:
+                interfaces[name], _ = NetworkInterface.objects.get_or_create(name=name)
             NetworkAnomaly.objects.create(
-                type=anomaly["type"],
+                interface=interfaces[name],
+                anomaly_type=anomaly["type"],
                 description=anomaly["description"],
                 severity=anomaly["severity"],
             )
 
 
-def run_anomaly_detection(time_window_hours: int = 1):
+def run_anomaly_detection(time_window_hours: int = 1, vectorized: bool = True):
     """
     Run comprehensive anomaly detection
 
     Args:
         time_window_hours (int): Hours to analyze for anomalies
+        vectorized (bool): Use the NumPy batch path
     """
     try:
         detector = AdvancedAnomalyDetector()
-        anomalies = detector.detect_network_anomalies(time_window_hours)
+        anomalies = detector.detect_network_anomalies(
+            time_window_hours, vectorized=vectorized
+        )
         detector.save_anomalies(anomalies)
 
         logger.info(f"Detected {len(anomalies)} network anomalies")
@@ -0,0 +1,91 @@
+import ctypes
+import socket
+import struct
+from typing import List, Optional, Tuple
+
+# Linux socket options not exported by the socket module
+SO_ATTACH_FILTER = 26
+SO_RCVBUFFORCE = 33
+
+# Classic BPF "return constant" opcode (BPF_RET | BPF_K)
+BPF_RET_K = 0x06
+
+# Largest snapshot length accepted by libpcap
+MAX_SNAPLEN = 262144
+
+BpfInstruction = Tuple[int, int, int, int]
+
+
+def compile_filter(
+    expression: Optional[str] = None,
+    snaplen: Optional[int] = None,
+    interface: Optional[str] = None,
+) -> List[BpfInstruction]:
+    """
+    Compile a BPF filter expression into classic BPF instructions.
+
+    The returned program both filters and truncates: every accepting
+    ``ret`` instruction is clamped to ``snaplen`` so the kernel only copies
+    the first ``snaplen`` bytes of each matching frame.
+
+    Args:
+        expression (str): tcpdump-style filter expression, None to accept all
+        snaplen (int): Maximum number of bytes copied per frame
+        interface (str): Interface used to pick the link type when compiling
+
+    Returns:
+        List of (code, jt, jf, k) instructions
+    """
+    if expression:
+        # libpcap does the parsing; scapy wraps it through ctypes
+        from scapy.arch.common import compile_filter as pcap_compile_filter
+
+        program = pcap_compile_filter(expression, iface=interface)
+        instructions = [
+            (insn.code, insn.jt, insn.jf, insn.k & 0xFFFFFFFF)
+            for insn in program.bf_insns[: program.bf_len]
+        ]
+    else:
+        instructions = [(BPF_RET_K, 0, 0, MAX_SNAPLEN)]
+
+    if snaplen:
+        instructions = [
+            (code, jt, jf, min(k, snaplen))
+            if code == BPF_RET_K and k
+            else (code, jt, jf, k)
+            for code, jt, jf, k in instructions
+        ]
+    return instructions
+
+
+def attach_filter(sock: socket.socket, instructions: List[BpfInstruction]):
+    """
+    Attach a compiled BPF program to a packet socket.
+
+    Args:
+        sock (socket.socket): AF_PACKET socket
+        instructions (List): Program returned by ``compile_filter``
+    """
+    program = ctypes.create_string_buffer(
+        b"".join(struct.pack("HBBI", *insn) for insn in instructions)
+    )
+    # struct sock_fprog { unsigned short len; struct sock_filter *filter; }
+    fprog = struct.pack("HL", len(instructions), ctypes.addressof(program))
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+
+
+def set_receive_buffer(sock: socket.socket, size: int):
+    """
+    Set the kernel receive buffer of a capture socket.
+
+    SO_RCVBUFFORCE lets a capture process with CAP_NET_ADMIN go beyond
+    ``net.core.rmem_max``; SO_RCVBUF is used when that is not permitted.
+
+    Args:
+        sock (socket.socket): Capture socket
+        size (int): Buffer size in bytes
+    """
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, SO_RCVBUFFORCE, size)
+    except OSError:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
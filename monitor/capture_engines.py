@@ -0,0 +1,267 @@
+import mmap
+import select
+import socket
+import struct
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .bpf import attach_filter, compile_filter, set_receive_buffer
+from .packet_decoder import LINKTYPE_ETHERNET, LINKTYPE_RAW
+
+ETH_P_ALL = 0x0003
+
+# PACKET_MMAP constants from <linux/if_packet.h>
+SOL_PACKET = 263
+PACKET_RX_RING = 5
+PACKET_VERSION = 10
+TPACKET_V3 = 2
+PACKET_FANOUT = 18
+PACKET_STATISTICS = 6
+
+# PACKET_FANOUT modes, selecting which group member receives a frame
+FANOUT_MODES = {"hash": 0, "roundrobin": 1, "cpu": 2}
+PACKET_FANOUT_FLAG_DEFRAG = 0x8000
+TP_STATUS_KERNEL = 0
+TP_STATUS_USER = 1
+
+# Default ring geometry: 64 blocks of 1 MiB, retired after 100 ms
+DEFAULT_RING_BLOCK_SIZE = 1 << 20
+DEFAULT_RING_BLOCK_COUNT = 64
+DEFAULT_RING_BLOCK_TIMEOUT = 100
+RING_FRAME_SIZE = 2048
+
+# Largest frame read when no snaplen is configured
+DEFAULT_SNAPLEN = 65535
+
+# ARPHRD_* hardware types mapped to pcap link types
+ARPHRD_TO_LINKTYPE = {
+    1: LINKTYPE_ETHERNET,  # ARPHRD_ETHER
+    772: LINKTYPE_ETHERNET,  # ARPHRD_LOOPBACK
+    65534: LINKTYPE_RAW,  # ARPHRD_NONE (tun devices)
+}
+
+# struct tpacket_req3
+_TPACKET_REQ3 = struct.Struct("7I")
+# tpacket_block_desc: block_status, num_pkts, offset_to_first_pkt
+_BLOCK_HEADER = struct.Struct("III")
+_BLOCK_HEADER_OFFSET = 8
+_BLOCK_STATUS = struct.Struct("I")
+# struct tpacket_stats: tp_packets, tp_drops (TPACKET_V3 appends a counter)
+_TPACKET_STATS = struct.Struct("II")
+# tpacket3_hdr: next_offset, sec, nsec, snaplen, len, status, mac, net
+_TPACKET3_HEADER = struct.Struct("IIIIIIHH")
+
+FrameHandler = Callable[[memoryview, int, Optional[float]], None]
+
+
+def open_packet_socket(interface: str, options: Dict[str, Any]) -> socket.socket:
+    """
+    Open an AF_PACKET socket bound to an interface with its filter attached.
+
+    The socket is created for no protocol and only bound to ETH_P_ALL once
+    the filter is attached, so no unfiltered frame is ever queued.
+
+    Args:
+        interface (str): Network interface to capture packets on
+        options (Dict): Capture options with ``filter``, ``snaplen`` and
+            ``buffer_size`` keys
+
+    Returns:
+        Bound AF_PACKET socket
+    """
+    sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, 0)
+    try:
+        if options.get("filter") or options.get("snaplen"):
+            attach_filter(
+                sock,
+                compile_filter(
+                    options.get("filter"), options.get("snaplen"), interface
+                ),
+            )
+        if options.get("buffer_size"):
+            set_receive_buffer(sock, options["buffer_size"])
+        sock.bind((interface, ETH_P_ALL))
+    except Exception:
+        sock.close()
+        raise
+    return sock
+
+
+def join_fanout(sock: socket.socket, group_id: int, mode: str = "hash"):
+    """
+    Add a bound AF_PACKET socket to a PACKET_FANOUT group.
+
+    The kernel spreads the interface's frames over all sockets in the group:
+    by flow hash (fragments are reassembled first so they hash alike), by
+    the CPU that received the frame, or round-robin.
+
+    Args:
+        sock (socket.socket): Bound AF_PACKET socket
+        group_id (int): 16-bit fanout group id shared by the group members
+        mode (str): One of ``FANOUT_MODES``
+    """
+    fanout_type = FANOUT_MODES[mode]
+    if mode == "hash":
+        fanout_type |= PACKET_FANOUT_FLAG_DEFRAG
+    # Packed unsigned: the defrag flag sets the top bit of the int
+    sock.setsockopt(
+        SOL_PACKET,
+        PACKET_FANOUT,
+        struct.pack("I", (fanout_type << 16) | (group_id & 0xFFFF)),
+    )
+
+
+def get_link_type(sock: socket.socket) -> int:
+    """
+    Get the pcap link type of a bound AF_PACKET socket.
+
+    Args:
+        sock (socket.socket): Bound AF_PACKET socket
+
+    Returns:
+        pcap link-layer header type
+    """
+    return ARPHRD_TO_LINKTYPE.get(sock.getsockname()[3], LINKTYPE_ETHERNET)
+
+
+def read_socket_statistics(sock: socket.socket) -> Tuple[int, int]:
+    """
+    Read and reset the kernel counters of an AF_PACKET socket.
+
+    Args:
+        sock (socket.socket): Bound AF_PACKET socket
+
+    Returns:
+        Frames received and frames dropped for lack of buffer space since
+        the previous read; received includes the dropped frames
+    """
+    statistics = sock.getsockopt(SOL_PACKET, PACKET_STATISTICS, 12)
+    return _TPACKET_STATS.unpack_from(statistics)
+
+
+def raw_socket_capture(
+    sock: socket.socket,
+    handle_frame: FrameHandler,
+    stop_event: Any,
+    snaplen: int = DEFAULT_SNAPLEN,
+    poll_timeout: float = 1.0,
+):
+    """
+    Read frames from an AF_PACKET socket into one reusable buffer.
+
+    Each frame is passed to ``handle_frame`` as a memoryview over the shared
+    buffer together with its original length on the wire, so the handler
+    must finish with the frame before returning.
+
+    Args:
+        sock (socket.socket): Bound AF_PACKET socket
+        handle_frame (Callable): Called with (frame, wire_length, None)
+        stop_event (Event): Capture stops once this event is set
+        snaplen (int): Maximum number of bytes read per frame
+        poll_timeout (float): Seconds between checks of ``stop_event``
+    """
+    buffer = bytearray(snaplen)
+    view = memoryview(buffer)
+    sock.settimeout(poll_timeout)
+
+    while not stop_event.is_set():
+        try:
+            # MSG_TRUNC makes recv report the full length of truncated frames
+            wire_length = sock.recv_into(buffer, snaplen, socket.MSG_TRUNC)
+        except socket.timeout:
+            continue
+        handle_frame(view[: min(wire_length, snaplen)], wire_length, None)
+
+
+def mmap_ring_capture(
+    sock: socket.socket,
+    handle_frame: FrameHandler,
+    stop_event: Any,
+    block_size: int = DEFAULT_RING_BLOCK_SIZE,
+    block_count: int = DEFAULT_RING_BLOCK_COUNT,
+    block_timeout: int = DEFAULT_RING_BLOCK_TIMEOUT,
+    poll_timeout: float = 1.0,
+):
+    """
+    Read frames from a TPACKET_V3 memory-mapped receive ring.
+
+    The kernel fills whole blocks of frames in memory shared with this
+    process and hands a block over once it is full or ``block_timeout``
+    expires. Every frame of the block is passed to ``handle_frame`` as a
+    memoryview into the ring, without copying, and the block is returned to
+    the kernel afterwards, so the handler must finish with the frame before
+    returning.
+
+    Args:
+        sock (socket.socket): Bound AF_PACKET socket
+        handle_frame (Callable): Called with (frame, wire_length, timestamp),
+            the timestamp in seconds since the epoch
+        stop_event (Event): Capture stops once this event is set
+        block_size (int): Ring block size in bytes, a multiple of the page size
+        block_count (int): Number of blocks in the ring
+        block_timeout (int): Milliseconds before a partly filled block is
+            handed to user space
+        poll_timeout (float): Seconds between checks of ``stop_event``
+    """
+    sock.setsockopt(SOL_PACKET, PACKET_VERSION, TPACKET_V3)
+    sock.setsockopt(
+        SOL_PACKET,
+        PACKET_RX_RING,
+        _TPACKET_REQ3.pack(
+            block_size,
+            block_count,
+            RING_FRAME_SIZE,
+            block_size // RING_FRAME_SIZE * block_count,
+            block_timeout,
+            0,
+            0,
+        ),
+    )
+    ring = mmap.mmap(
+        sock.fileno(),
+        block_size * block_count,
+        mmap.MAP_SHARED,
+        mmap.PROT_READ | mmap.PROT_WRITE,
+    )
+    view = memoryview(ring)
+    poller = select.poll()
+    poller.register(sock.fileno(), select.POLLIN | select.POLLERR)
+
+    try:
+        block_index = 0
+        while not stop_event.is_set():
+            block = block_index * block_size
+            status, packet_count, offset = _BLOCK_HEADER.unpack_from(
+                ring, block + _BLOCK_HEADER_OFFSET
+            )
+            if not status & TP_STATUS_USER:
+                poller.poll(poll_timeout * 1000)
+                continue
+
+            frame_offset = block + offset
+            for _ in range(packet_count):
+                (
+                    next_offset,
+                    seconds,
+                    nanoseconds,
+                    captured_length,
+                    wire_length,
+                    _,
+                    mac_offset,
+                    _,
+                ) = _TPACKET3_HEADER.unpack_from(ring, frame_offset)
+                start = frame_offset + mac_offset
+                handle_frame(
+                    view[start : start + captured_length],
+                    wire_length,
+                    seconds + nanoseconds / 1e9,
+                )
+                frame_offset += next_offset
+
+            # Hand the block back to the kernel
+            _BLOCK_STATUS.pack_into(
+                ring, block + _BLOCK_HEADER_OFFSET, TP_STATUS_KERNEL
+            )
+            block_index = (block_index + 1) % block_count
+    finally:
+        view.release()
+        ring.close()
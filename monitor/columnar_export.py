@@ -0,0 +1,278 @@
+import logging
+from itertools import islice
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+import pandas as pd
+from django.db import models
+from django.db.models import QuerySet
+
+from .models import Flow, Packet
+from .packet_columns import COLUMN_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Exported tables: model, time field filtered and ordered on, columns
+EXPORT_TABLES = {
+    "packets": (
+        Packet,
+        "timestamp",
+        (
+            "timestamp",
+            "interface__name",
+            "protocol",
+            "source_ip",
+            "source_port",
+            "destination_ip",
+            "destination_port",
+            "packet_size",
+            "sample_rate",
+            "tcp_flags",
+        ),
+    ),
+    "flows": (
+        Flow,
+        "first_seen",
+        (
+            "first_seen",
+            "last_seen",
+            "interface__name",
+            "protocol",
+            "source_ip",
+            "source_port",
+            "destination_ip",
+            "destination_port",
+            "packets",
+            "bytes",
+            "reverse_packets",
+            "reverse_bytes",
+            "tcp_flags",
+        ),
+    ),
+}
+
+# "npz" only needs NumPy; "parquet" needs pyarrow, which is not a dependency
+COLUMNAR_FORMATS = ("npz", "parquet")
+
+
+def column_kinds(model, fields: Sequence[str]) -> Dict[str, str]:
+    """
+    Classify exported columns by how they are stored.
+
+    Args:
+        model: Model the fields belong to
+        fields (Sequence[str]): Field names, possibly spanning relations
+
+    Returns:
+        "time", "integer" or "text" by field name
+    """
+    kinds = {}
+    for name in fields:
+        if "__" in name:
+            kinds[name] = "text"
+            continue
+        field = model._meta.get_field(name)
+        if isinstance(field, models.DateTimeField):
+            kinds[name] = "time"
+        elif isinstance(field, (models.IntegerField, models.BigIntegerField)):
+            kinds[name] = "integer"
+        else:
+            kinds[name] = "text"
+    return kinds
+
+
+def column_name(field: str) -> str:
+    """Column name of a field, ``interface__name`` becoming ``interface``."""
+    return field.split("__")[0]
+
+
+def export_frames(
+    queryset: QuerySet,
+    fields: Sequence[str],
+    kinds: Dict[str, str],
+    chunk_size: int = COLUMN_CHUNK_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read rows in chunks as DataFrames with typed columns.
+
+    Rows are streamed with ``values_list``, so no model instances are built
+    and one chunk is held at a time. Times become UTC datetime64 columns,
+    integer columns use pandas' nullable Int64 and text columns its string
+    dtype, so NULLs stay missing values.
+
+    Args:
+        queryset (QuerySet): Rows to export
+        fields (Sequence[str]): Fields to read
+        kinds (Dict): Column kinds from ``column_kinds``
+        chunk_size (int): Rows per DataFrame
+
+    Returns:
+        Iterator of DataFrames
+    """
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    columns = [column_name(field) for field in fields]
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        frame = pd.DataFrame.from_records(chunk, columns=columns)
+        for field, column in zip(fields, columns):
+            if kinds[field] == "time":
+                frame[column] = pd.to_datetime(frame[column], utc=True)
+            elif kinds[field] == "integer":
+                frame[column] = frame[column].astype("Int64")
+            else:
+                frame[column] = frame[column].astype("string")
+        yield frame
+
+
+def write_parquet(frames: Iterator[pd.DataFrame], path: str, compression: str) -> int:
+    """
+    Write DataFrames to a Parquet file, one row group per frame.
+
+    Args:
+        frames (Iterator): DataFrames with the same columns
+        path (str): Output file
+        compression (str): Parquet codec, such as "zstd" or "snappy"
+
+    Returns:
+        Number of rows written
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "Parquet export requires pyarrow; install it or use the npz format"
+        ) from e
+
+    rows = 0
+    writer = None
+    try:
+        for frame in frames:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression=compression)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(frame)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def write_npz(frames: Iterator[pd.DataFrame], path: str) -> int:
+    """
+    Write DataFrames to a compressed NumPy archive, one array per column.
+
+    Times are stored as int64 nanoseconds since the epoch and NULL integers
+    as -1. Text columns are stored as int32 codes with their distinct values
+    in a ``<column>_labels`` array, as in ``load_packet_columns``; NULL text
+    is stored as code -1. Each frame is encoded as it arrives, but an archive
+    cannot be appended to, so the encoded columns are held in memory until
+    written: 8 bytes per time or integer value and 4 per text value, about
+    64 bytes per packet row. Bound large exports with a time range or use
+    Parquet, which is written a frame at a time.
+
+    Args:
+        frames (Iterator): DataFrames with the same columns
+        path (str): Output file
+
+    Returns:
+        Number of rows written
+    """
+    chunks: Dict[str, List[np.ndarray]] = {}
+    labels: Dict[str, pd.Index] = {}
+    rows = 0
+    for frame in frames:
+        for column in frame.columns:
+            series = frame[column]
+            if isinstance(series.dtype, pd.DatetimeTZDtype):
+                array = series.to_numpy(dtype="datetime64[ns]").view(np.int64)
+            elif isinstance(series.dtype, pd.Int64Dtype):
+                array = series.fillna(-1).to_numpy(dtype=np.int64)
+            else:
+                array = _encode_text(series, labels, column)
+            chunks.setdefault(column, []).append(array)
+        rows += len(frame)
+
+    # Join one column at a time, freeing its chunks as it goes
+    arrays = {column: np.concatenate(chunks.pop(column)) for column in list(chunks)}
+    for column, column_labels in labels.items():
+        arrays[f"{column}_labels"] = column_labels.to_numpy(dtype=str)
+    np.savez_compressed(path, **arrays)
+    return rows
+
+
+def _encode_text(
+    series: pd.Series, labels: Dict[str, pd.Index], column: str
+) -> np.ndarray:
+    """
+    Encode a text column as codes into labels shared across frames.
+
+    Args:
+        series (pd.Series): Text values of one frame
+        labels (Dict): Labels seen so far by column, extended in place
+        column (str): Column name
+
+    Returns:
+        int32 codes, -1 for NULL
+    """
+    codes, uniques = pd.factorize(series)
+    known = labels.get(column, pd.Index([], dtype=object))
+    positions = known.get_indexer(uniques)
+    new = positions < 0
+    positions[new] = np.arange(len(known), len(known) + new.sum())
+    labels[column] = known.append(pd.Index(uniques[new], dtype=object))
+    return np.where(codes >= 0, positions[codes], -1).astype(np.int32)
+
+
+def export_columnar(
+    table: str,
+    path: str,
+    export_format: str = "npz",
+    start=None,
+    end=None,
+    chunk_size: int = COLUMN_CHUNK_SIZE,
+    compression: str = "zstd",
+) -> int:
+    """
+    Export a table to a compressed columnar file.
+
+    Args:
+        table (str): One of ``EXPORT_TABLES``
+        path (str): Output file
+        export_format (str): One of ``COLUMNAR_FORMATS``
+        start (datetime): Only rows from this time on, None for all
+        end (datetime): Only rows before this time, None for all
+        chunk_size (int): Rows read and converted per batch
+        compression (str): Parquet codec
+
+    Returns:
+        Number of rows written
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(
+            f"Unknown table {table!r}, expected one of {tuple(EXPORT_TABLES)}"
+        )
+    if export_format not in COLUMNAR_FORMATS:
+        raise ValueError(
+            f"Unknown format {export_format!r}, expected one of {COLUMNAR_FORMATS}"
+        )
+
+    model, time_field, fields = EXPORT_TABLES[table]
+    queryset = model.objects.all()
+    if start is not None:
+        queryset = queryset.filter(**{f"{time_field}__gte": start})
+    if end is not None:
+        queryset = queryset.filter(**{f"{time_field}__lt": end})
+    frames = export_frames(
+        queryset.order_by(time_field), fields, column_kinds(model, fields), chunk_size
+    )
+
+    if export_format == "parquet":
+        rows = write_parquet(frames, path, compression)
+    else:
+        rows = write_npz(frames, path)
+    logger.info(f"Exported {rows} {table} to {path}")
+    return rows
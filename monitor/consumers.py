@@ -1,14 +1,25 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from .dashboard_publisher import publisher
 from .models import SystemStat, Packet
+from .telemetry import get_published_telemetry
 
 class DashboardConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         await self.channel_layer.group_add("dashboard", self.channel_name)
         await self.accept()
+        # Later changes arrive from the publisher through the group
+        state = await database_sync_to_async(publisher.current_state)()
+        if state:
+            await self.send(text_data=json.dumps({
+                "type": "dashboard_update",
+                "data": state
+            }))
+        publisher.viewer_joined()
 
     async def disconnect(self, close_code):
+        publisher.viewer_left()
         await self.channel_layer.group_discard("dashboard", self.channel_name)
 
     async def receive(self, text_data):
@@ -27,6 +38,12 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                 "type": "recent_packets",
                 "data": packets
             }))
+        elif message_type == "get_telemetry":
+            telemetry = await self.get_capture_telemetry()
+            await self.send(text_data=json.dumps({
+                "type": "capture_telemetry",
+                "data": telemetry
+            }))
 
     async def dashboard_update(self, event):
         await self.send(text_data=json.dumps(event))
@@ -46,6 +63,10 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         except SystemStat.DoesNotExist:
             return None
 
+    @database_sync_to_async
+    def get_capture_telemetry(self):
+        return get_published_telemetry()
+
     @database_sync_to_async
     def get_recent_packets(self):
         packets = Packet.objects.all().order_by("-timestamp")[:10]
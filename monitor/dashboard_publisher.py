@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from channels.db import database_sync_to_async
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Packet
+from .system_monitor import get_system_stats
+from .telemetry import get_published_telemetry
+from .utils import abroadcast_update, broadcast_update
+
+logger = logging.getLogger(__name__)
+
+# Held by the one process publishing to a channel layer shared by several
+DASHBOARD_LEASE_KEY = "netcreep:dashboard_publisher"
+# Full dashboard state of the lease holder, sent to new connections elsewhere
+DASHBOARD_STATE_CACHE_KEY = "netcreep:dashboard_state"
+
+
+def get_recent_packets(limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Most recently captured packets, formatted for the dashboard.
+
+    Args:
+        limit (int): Number of packets
+
+    Returns:
+        List of packet dictionaries, newest first
+    """
+    packets = Packet.objects.order_by("-timestamp")[:limit]
+    return [
+        {
+            "timestamp": packet.timestamp.isoformat(),
+            "protocol": packet.protocol,
+            "source": f"{packet.source_ip}:{packet.source_port}",
+            "destination": f"{packet.destination_ip}:{packet.destination_port}",
+            "size": packet.packet_size,
+        }
+        for packet in packets
+    ]
+
+
+class DashboardPublisher:
+    """
+    Push dashboard updates to the "dashboard" group on a fixed tick.
+
+    Each tick reads the system stats snapshot, the capture telemetry and
+    the recent packets once, and broadcasts only the sections that changed
+    since the previous tick, so database load does not depend on how many
+    dashboards are open. The publisher runs in the web server's event loop
+    while at least one dashboard is connected.
+
+    When the channel layer is shared by several web processes, every
+    process runs a publisher but only the holder of a cache lease sends,
+    so each dashboard gets one update per tick whatever the worker count.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        """
+        Initialize the publisher.
+
+        Args:
+            interval (float): Seconds between ticks
+        """
+        self.interval = interval
+        self.state: Dict[str, Any] = {}
+        self._viewers = 0
+        self._task: Optional[asyncio.Task] = None
+        self._network: Optional[Dict[str, float]] = None
+        self._system_stats_shown: Dict[str, Any] = {}
+        self._token = uuid.uuid4().hex
+        self._leader = False
+
+    @property
+    def shared(self) -> bool:
+        """Whether the channel layer reaches other processes."""
+        return not isinstance(get_channel_layer(), InMemoryChannelLayer)
+
+    def viewer_joined(self):
+        """Count a connected dashboard, starting the ticks if needed."""
+        self._viewers += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    def viewer_left(self):
+        """Count a disconnected dashboard; ticks stop after the last one."""
+        self._viewers = max(0, self._viewers - 1)
+
+    def build_update(self) -> Dict[str, Any]:
+        """
+        Read the dashboard state and keep the sections that changed.
+
+        Returns:
+            Changed sections by name, empty if nothing changed
+        """
+        state = {
+            "system_stats": self._system_stats(),
+            "capture_telemetry": get_published_telemetry(),
+            "recent_packets": get_recent_packets(),
+        }
+        update = {
+            section: value
+            for section, value in state.items()
+            if section not in self.state or self.state[section] != value
+        }
+        self.state = state
+        return update
+
+    def current_state(self) -> Dict[str, Any]:
+        """
+        Full dashboard state for a new connection.
+
+        Returns:
+            Sections by name, empty before the first tick
+        """
+        if self.shared and not self._leader:
+            try:
+                return cache.get(DASHBOARD_STATE_CACHE_KEY) or {}
+            except Exception as e:
+                logger.debug(f"Could not read dashboard state: {e}")
+        return self.state
+
+    def tick(self) -> Dict[str, Any]:
+        """
+        Build one tick's update if this process is the one publishing.
+
+        Returns:
+            Changed sections by name, empty if nothing changed or another
+            process publishes
+        """
+        if self.shared:
+            if not self._acquire_lease():
+                self._leader = False
+                return {}
+            if not self._leader:
+                # Dashboards hold another publisher's state, start afresh
+                self.state = {}
+                self._leader = True
+
+        update = self.build_update()
+        if self.shared:
+            try:
+                cache.set(DASHBOARD_STATE_CACHE_KEY, self.state, self._lease_timeout)
+            except Exception as e:
+                logger.debug(f"Could not publish dashboard state: {e}")
+        return update
+
+    def publish(self):
+        """Broadcast one tick's changes, if any, from synchronous code."""
+        update = self.tick()
+        if update:
+            broadcast_update(update)
+
+    async def apublish(self):
+        """Broadcast one tick's changes, if any, from the event loop."""
+        update = await database_sync_to_async(self.tick)()
+        if update:
+            await abroadcast_update(update)
+
+    @property
+    def _lease_timeout(self) -> float:
+        """Seconds before a lease of a stopped publisher is taken over."""
+        return max(5.0, self.interval * 3)
+
+    def _acquire_lease(self) -> bool:
+        """
+        Take or renew the publisher lease.
+
+        Returns:
+            True if this process holds the lease
+        """
+        try:
+            if cache.add(DASHBOARD_LEASE_KEY, self._token, self._lease_timeout):
+                return True
+            if cache.get(DASHBOARD_LEASE_KEY) == self._token:
+                cache.touch(DASHBOARD_LEASE_KEY, self._lease_timeout)
+                return True
+            return False
+        except Exception as e:
+            # Without the cache there is no way to agree, so publish
+            logger.debug(f"Could not take the dashboard publisher lease: {e}")
+            return True
+
+    def release_lease(self):
+        """Give up the publisher lease so another process takes over now."""
+        if not self._leader:
+            return
+        self._leader = False
+        try:
+            if cache.get(DASHBOARD_LEASE_KEY) == self._token:
+                cache.delete(DASHBOARD_LEASE_KEY)
+        except Exception as e:
+            logger.debug(f"Could not release the dashboard publisher lease: {e}")
+
+    def _system_stats(self) -> Dict[str, Any]:
+        """
+        System stats with network counters turned into bytes per second.
+
+        Returns:
+            Dictionary in the format of the dashboard's system stats
+        """
+        stats = get_system_stats()
+        previous = self._network
+        if previous is not None and stats["timestamp"] <= previous["timestamp"]:
+            # Same snapshot as the last tick, keep the rates it was shown with
+            return self._system_stats_shown
+
+        network_in = network_out = 0.0
+        if previous is not None:
+            elapsed = stats["timestamp"] - previous["timestamp"]
+            network_in = (
+                stats["network_io"]["bytes_recv"] - previous["bytes_recv"]
+            ) / elapsed
+            network_out = (
+                stats["network_io"]["bytes_sent"] - previous["bytes_sent"]
+            ) / elapsed
+        self._network = {"timestamp": stats["timestamp"], **stats["network_io"]}
+        self._system_stats_shown = {
+            "cpu_usage": stats["cpu_usage"],
+            "memory_usage": stats["memory_usage"],
+            "disk_usage": stats["disk_usage"],
+            "network_in": network_in,
+            "network_out": network_out,
+            "timestamp": stats["timestamp"],
+        }
+        return self._system_stats_shown
+
+    async def _run(self):
+        """Publish a tick every ``interval`` seconds while dashboards are open."""
+        while self._viewers > 0:
+            started = time.monotonic()
+            try:
+                await self.apublish()
+            except Exception as e:
+                logger.error(f"Dashboard publisher error: {e}")
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        await database_sync_to_async(self.release_lease)()
+
+
+publisher = DashboardPublisher(interval=settings.DASHBOARD_PUSH_INTERVAL)
@@ -0,0 +1,300 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, time
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q, QuerySet
+from django.http import QueryDict, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Packet
+
+# Rows read from the database per fetch
+EXPORT_CHUNK_SIZE = 5000
+# Rows encoded into each chunk of the response
+ROWS_PER_WRITE = 1000
+
+EXPORT_FIELDS = (
+    "timestamp",
+    "protocol",
+    "source_ip",
+    "source_port",
+    "destination_ip",
+    "destination_port",
+    "packet_size",
+)
+CSV_HEADER = [
+    "Timestamp",
+    "Protocol",
+    "Source IP",
+    "Source Port",
+    "Destination IP",
+    "Destination Port",
+    "Size",
+    "Summary",
+]
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "json": ("application/json", "json"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+
+def parse_time(value: str, name: str) -> datetime:
+    """
+    Parse a time filter given as an ISO date or datetime.
+
+    Args:
+        value (str): Query parameter value
+        name (str): Parameter name, for the error message
+
+    Returns:
+        Aware datetime
+
+    Raises:
+        ValueError: If the value is not a date or datetime
+    """
+    parsed = parse_datetime(value)
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f"Invalid {name}: {value!r}")
+        parsed = datetime.combine(date, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def filter_packets(params: QueryDict) -> QuerySet:
+    """
+    Packets to export, newest first, filtered by the request parameters.
+
+    Args:
+        params (QueryDict): ``start`` and ``end`` as ISO dates or datetimes,
+            ``protocol`` as one or more comma-separated protocols
+
+    Returns:
+        Packet queryset
+
+    Raises:
+        ValueError: If a time filter cannot be parsed
+    """
+    packets = Packet.objects.order_by("-timestamp")
+    if params.get("start"):
+        packets = packets.filter(timestamp__gte=parse_time(params["start"], "start"))
+    if params.get("end"):
+        packets = packets.filter(timestamp__lt=parse_time(params["end"], "end"))
+    if params.get("protocol"):
+        protocols = [p.strip().upper() for p in params["protocol"].split(",")]
+        packets = packets.filter(protocol__in=[p for p in protocols if p])
+    return packets
+
+
+def packet_rows(packets: QuerySet, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator:
+    """
+    Stream packet field tuples, newest first, without building model instances.
+
+    Rows are read in keyset-paginated batches, each a query of its own
+    starting after the last row of the previous one, so no cursor stays open
+    between batches and each can be fetched from a different thread.
+
+    Args:
+        packets (QuerySet): Packets to export
+        chunk_size (int): Rows fetched from the database at a time
+
+    Returns:
+        Iterator of tuples of ``EXPORT_FIELDS``
+    """
+    packets = packets.order_by("-timestamp", "-id")
+    page = packets
+    while True:
+        rows = list(page.values_list("id", *EXPORT_FIELDS)[:chunk_size])
+        for row in rows:
+            yield row[1:]
+        if len(rows) < chunk_size:
+            return
+        last_id, last_timestamp = rows[-1][:2]
+        page = packets.filter(
+            Q(timestamp__lt=last_timestamp)
+            | Q(timestamp=last_timestamp, id__lt=last_id)
+        )
+
+
+def packet_record(row: Tuple) -> Dict[str, Any]:
+    """
+    Export record of a packet row, as in the JSON exports.
+
+    Args:
+        row (Tuple): Values of ``EXPORT_FIELDS``
+
+    Returns:
+        Dictionary of the packet's exported fields
+    """
+    timestamp, protocol, source_ip, source_port, destination_ip, port, size = row
+    return {
+        "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+        "protocol": protocol,
+        "source_ip": source_ip,
+        "source_port": source_port,
+        "destination_ip": destination_ip,
+        "destination_port": port,
+        "size": size,
+        "summary": f"{protocol} packet from {source_ip}:{source_port}",
+    }
+
+
+def batched(rows: Iterable, size: Optional[int] = None) -> Iterator[list]:
+    """
+    Group rows so each response chunk carries many of them.
+
+    Args:
+        rows (Iterable): Rows to group
+        size (int): Rows per group, ``ROWS_PER_WRITE`` by default
+
+    Returns:
+        Iterator of lists of rows
+    """
+    size = size or ROWS_PER_WRITE
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def csv_chunks(rows: Iterable) -> Iterator[str]:
+    """
+    Encode packet rows as CSV with a header row.
+
+    Args:
+        rows (Iterable): Tuples of ``EXPORT_FIELDS``
+
+    Returns:
+        Iterator of CSV text chunks
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    for batch in batched(rows):
+        for row in batch:
+            record = packet_record(row)
+            writer.writerow(list(record.values()))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def json_chunks(rows: Iterable) -> Iterator[str]:
+    """
+    Encode packet rows as a JSON array.
+
+    Args:
+        rows (Iterable): Tuples of ``EXPORT_FIELDS``
+
+    Returns:
+        Iterator of JSON text chunks
+    """
+    separator = "[\n"
+    for batch in batched(rows):
+        yield separator + ",\n".join(json.dumps(packet_record(row)) for row in batch)
+        separator = ",\n"
+    yield "[]\n" if separator == "[\n" else "\n]\n"
+
+
+def ndjson_chunks(rows: Iterable) -> Iterator[str]:
+    """
+    Encode packet rows as newline-delimited JSON, one packet per line.
+
+    Args:
+        rows (Iterable): Tuples of ``EXPORT_FIELDS``
+
+    Returns:
+        Iterator of NDJSON text chunks
+    """
+    for batch in batched(rows):
+        yield "".join(json.dumps(packet_record(row)) + "\n" for row in batch)
+
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """
+    Compress text chunks into a gzip stream as they are produced.
+
+    Args:
+        chunks (Iterable): Text chunks
+
+    Returns:
+        Iterator of gzip data
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def async_chunks(chunks: Iterator) -> AsyncIterator:
+    """
+    Serve a synchronous chunk iterator to an ASGI server.
+
+    Django buffers a synchronous iterator whole before an ASGI response
+    starts, so each chunk, with the database reads behind it, is pulled
+    separately in the sync thread instead.
+
+    Args:
+        chunks (Iterator): Response chunks
+
+    Returns:
+        Async iterator of the same chunks
+    """
+    next_chunk = sync_to_async(next)
+    while True:
+        chunk = await next_chunk(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+ENCODERS = {"csv": csv_chunks, "json": json_chunks, "ndjson": ndjson_chunks}
+
+
+def stream_packet_export(
+    params: QueryDict, export_format: str, asynchronous: bool = False
+) -> StreamingHttpResponse:
+    """
+    Stream filtered packets as a file download in constant memory.
+
+    Args:
+        params (QueryDict): Request parameters; see ``filter_packets``, plus
+            ``gzip=1`` to compress the file
+        export_format (str): One of ``EXPORT_FORMATS``
+        asynchronous (bool): Stream to an ASGI server, which needs an async
+            iterator to send chunks as they are produced
+
+    Returns:
+        Streaming response
+
+    Raises:
+        ValueError: If a filter cannot be parsed
+    """
+    content_type, extension = EXPORT_FORMATS[export_format]
+    chunks = ENCODERS[export_format](packet_rows(filter_packets(params)))
+    filename = f"packet_history_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    if params.get("gzip") in ("1", "true", "True"):
+        chunks = gzip_chunks(chunks)
+        content_type = "application/gzip"
+        filename += ".gz"
+
+    if asynchronous:
+        chunks = async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,193 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.utils import timezone
+
+# interface, protocol, then both (ip, port) endpoints in sorted order
+FlowKey = Tuple[str, str, Tuple[str, int], Tuple[str, int]]
+
+
+class _FlowState:
+    """Counters of one active flow, split by direction."""
+
+    __slots__ = (
+        "initiator",
+        "first_seen",
+        "last_seen",
+        "packets",
+        "bytes",
+        "reverse_packets",
+        "reverse_bytes",
+        "tcp_flags",
+        "packet_data",
+    )
+
+    def __init__(self, packet_data: Dict[str, Any], initiator: Tuple[str, int]):
+        self.initiator = initiator
+        self.first_seen = packet_data["timestamp"]
+        self.last_seen = packet_data["timestamp"]
+        self.packets = 0
+        self.bytes = 0
+        self.reverse_packets = 0
+        self.reverse_bytes = 0
+        self.tcp_flags = 0
+        # First packet, giving the flow's addresses as the initiator sent them
+        self.packet_data = packet_data
+
+
+class FlowTable:
+    """
+    Aggregate packets into bidirectional flows.
+
+    Packets are keyed by interface, protocol and both endpoints, so the two
+    directions of a connection update one flow; the side that sent the first
+    packet is recorded as the source. A flow is exported once no packet has
+    been seen for ``idle_timeout``, or when a packet arrives after it has
+    been open for ``active_timeout``, in which case that packet starts a new
+    flow record for the same connection.
+
+    Flows are kept in least recently seen order, so expiring idle flows only
+    looks at the flows that actually expire.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float = 60.0,
+        active_timeout: float = 300.0,
+        max_flows: int = 100000,
+    ):
+        """
+        Initialize the flow table.
+
+        Args:
+            idle_timeout (float): Seconds without packets before a flow ends
+            active_timeout (float): Maximum seconds covered by one flow record
+            max_flows (int): Flows kept before the least recently seen ones
+                are exported early
+        """
+        self.idle_timeout = timedelta(seconds=idle_timeout)
+        self.active_timeout = timedelta(seconds=active_timeout)
+        self.max_flows = max_flows
+        self._flows: "OrderedDict[FlowKey, _FlowState]" = OrderedDict()
+        self._expired: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        """Number of active flows."""
+        return len(self._flows)
+
+    def update(self, packets: Iterable[Dict[str, Any]]):
+        """
+        Add packets to their flows.
+
+        Args:
+            packets (Iterable[Dict]): Decoded packet data, in capture order
+        """
+        flows = self._flows
+        for packet_data in packets:
+            source = (packet_data["source_ip"], packet_data["source_port"] or 0)
+            destination = (
+                packet_data["destination_ip"],
+                packet_data["destination_port"] or 0,
+            )
+            if source <= destination:
+                key = (
+                    packet_data["interface"],
+                    packet_data["protocol"],
+                    source,
+                    destination,
+                )
+            else:
+                key = (
+                    packet_data["interface"],
+                    packet_data["protocol"],
+                    destination,
+                    source,
+                )
+
+            flow = flows.get(key)
+            timestamp = packet_data["timestamp"]
+            if flow is None:
+                flow = flows[key] = _FlowState(packet_data, source)
+                if len(flows) > self.max_flows:
+                    self._expired.append(self._export(flows.popitem(last=False)[1]))
+            elif timestamp - flow.first_seen >= self.active_timeout:
+                # Continue the connection in a new record, same initiator
+                self._expired.append(self._export(flows.pop(key)))
+                continued = flows[key] = _FlowState(flow.packet_data, flow.initiator)
+                continued.first_seen = continued.last_seen = timestamp
+                flow = continued
+            else:
+                flows.move_to_end(key)
+
+            sample_rate = packet_data.get("sample_rate", 1)
+            if source == flow.initiator:
+                flow.packets += sample_rate
+                flow.bytes += packet_data["packet_size"] * sample_rate
+            else:
+                flow.reverse_packets += sample_rate
+                flow.reverse_bytes += packet_data["packet_size"] * sample_rate
+            flow.tcp_flags |= packet_data.get("tcp_flags", 0)
+            if timestamp > flow.last_seen:
+                flow.last_seen = timestamp
+
+    def expire(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Remove and return the flows that have ended.
+
+        Args:
+            now (datetime): Current time, defaults to now
+
+        Returns:
+            Flow records of idle flows and of flows cut by the active timeout
+        """
+        cutoff = (now or timezone.now()) - self.idle_timeout
+        expired, self._expired = self._expired, []
+        flows = self._flows
+        while flows:
+            key, flow = next(iter(flows.items()))
+            if flow.last_seen >= cutoff:
+                break
+            del flows[key]
+            expired.append(self._export(flow))
+        return expired
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """
+        Remove and return every flow, ended or not.
+
+        Returns:
+            Flow records
+        """
+        expired, self._expired = self._expired, []
+        expired.extend(self._export(flow) for flow in self._flows.values())
+        self._flows.clear()
+        return expired
+
+    @staticmethod
+    def _export(flow: _FlowState) -> Dict[str, Any]:
+        """
+        Convert a flow into a flow record.
+
+        Args:
+            flow (_FlowState): Flow to export
+
+        Returns:
+            Flow record dictionary
+        """
+        packet_data = flow.packet_data
+        return {
+            "interface": packet_data["interface"],
+            "protocol": packet_data["protocol"],
+            "source_ip": packet_data["source_ip"],
+            "destination_ip": packet_data["destination_ip"],
+            "source_port": packet_data["source_port"],
+            "destination_port": packet_data["destination_port"],
+            "first_seen": flow.first_seen,
+            "last_seen": flow.last_seen,
+            "packets": flow.packets,
+            "bytes": flow.bytes,
+            "reverse_packets": flow.reverse_packets,
+            "reverse_bytes": flow.reverse_bytes,
+            "tcp_flags": flow.tcp_flags,
+        }
@@ -0,0 +1,167 @@
+import logging
+import math
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from django.core.cache import cache
+
+from .sketches import SpaceSaving
+
+logger = logging.getLogger(__name__)
+
+# Packet fields whose heaviest values are tracked
+HEAVY_HITTER_FIELDS = ("source_ip", "destination_ip", "destination_port")
+
+HEAVY_HITTERS_CACHE_KEY = "netcreep:heavy_hitters"
+HEAVY_HITTERS_CACHE_TIMEOUT = 60
+
+# Seconds for tracked counts to decay to 1/e, so they approximate the
+# traffic of about the last hour
+HEAVY_HITTER_WINDOW = 3600.0
+
+
+class HeavyHitters:
+    """
+    Top sources, destinations and ports of one writer's packets.
+
+    Every field in ``HEAVY_HITTER_FIELDS`` has a Space-Saving summary of
+    packets and bytes, updated once per batch. Counts decay exponentially
+    with ``window`` as their time constant. Summaries are published to the
+    cache every ``publish_interval`` seconds, one cache entry per writer,
+    and ``get_heavy_hitters`` merges the writers' entries.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        window: float = HEAVY_HITTER_WINDOW,
+        publish_interval: float = 5.0,
+    ):
+        """
+        Initialize the summaries.
+
+        Args:
+            capacity (int): Keys tracked per field
+            window (float): Time constant in seconds of the count decay
+            publish_interval (float): Minimum seconds between snapshots
+        """
+        self.window = window
+        self.publish_interval = publish_interval
+        self.summaries = {field: SpaceSaving(capacity) for field in HEAVY_HITTER_FIELDS}
+        self._last_decay = time.time()
+        self._last_publish = 0.0
+
+    def add(self, packets: List[Dict[str, Any]]):
+        """
+        Add a batch of packets to the summaries.
+
+        Args:
+            packets (List[Dict]): Decoded packet data
+        """
+        if not packets:
+            return
+        for field, summary in self.summaries.items():
+            amounts: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+            for packet_data in packets:
+                value = packet_data[field]
+                if value is None:
+                    continue
+                sample_rate = packet_data.get("sample_rate", 1)
+                amount = amounts[str(value)]
+                amount[0] += sample_rate
+                amount[1] += packet_data["packet_size"] * sample_rate
+            summary.update(amounts)
+
+    def snapshot(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Decay the counts to now and return the heaviest keys of each field.
+
+        Args:
+            limit (int): Maximum keys per field, None for all tracked
+
+        Returns:
+            Dictionary with ``timestamp`` and, by field, lists of
+            ``[key, packets, error, bytes]``
+        """
+        now = time.time()
+        factor = math.exp((self._last_decay - now) / self.window)
+        self._last_decay = now
+        fields = {}
+        for field, summary in self.summaries.items():
+            summary.scale(factor)
+            fields[field] = [list(entry) for entry in summary.top(limit)]
+        return {"timestamp": now, "fields": fields}
+
+    def maybe_publish(self, writer: int, num_writers: int):
+        """
+        Publish a snapshot to the cache if one is due.
+
+        Args:
+            writer (int): Index of this writer
+            num_writers (int): Number of writers publishing snapshots
+        """
+        if time.monotonic() - self._last_publish < self.publish_interval:
+            return
+        self._last_publish = time.monotonic()
+        snapshot = self.snapshot()
+        snapshot["num_writers"] = num_writers
+        try:
+            cache.set(
+                f"{HEAVY_HITTERS_CACHE_KEY}:{writer}",
+                snapshot,
+                HEAVY_HITTERS_CACHE_TIMEOUT,
+            )
+        except Exception as e:
+            logger.debug(f"Could not publish heavy hitters: {e}")
+
+
+def get_heavy_hitters(
+    field: str, limit: Optional[int] = 10
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Heaviest values of a field across all writers of a running capture.
+
+    Args:
+        field (str): One of ``HEAVY_HITTER_FIELDS``
+        limit (int): Maximum number of values, None for all tracked
+
+    Returns:
+        List of dictionaries with ``key``, ``packets``, ``bytes`` and
+        ``error``, busiest first; None if no capture published a snapshot
+        recently
+    """
+    try:
+        first = cache.get(f"{HEAVY_HITTERS_CACHE_KEY}:0")
+        if first is None:
+            return None
+        snapshots = [first]
+        if first["num_writers"] > 1:
+            others = cache.get_many(
+                [
+                    f"{HEAVY_HITTERS_CACHE_KEY}:{writer}"
+                    for writer in range(1, first["num_writers"])
+                ]
+            )
+            snapshots.extend(others.values())
+    except Exception as e:
+        logger.debug(f"Could not read heavy hitters: {e}")
+        return None
+
+    totals: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0, 0.0])
+    for snapshot in snapshots:
+        for key, packets, error, byte_count in snapshot["fields"][field]:
+            total = totals[key]
+            total[0] += packets
+            total[1] += byte_count
+            total[2] += error
+    ranked = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
+    return [
+        {
+            "key": key,
+            "packets": round(packets),
+            "bytes": round(byte_count),
+            "error": round(error),
+        }
+        for key, (packets, byte_count, error) in ranked[:limit]
+    ]
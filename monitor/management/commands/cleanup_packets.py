@@ -1,16 +1,53 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from monitor.models import Packet
+from monitor.models import Flow, Packet
+from monitor.retention import FlowRetention, PacketRetention
 
 
 class Command(BaseCommand):
-    help = "Cleanup old packets keeping only the latest 1000"
+    help = "Cleanup old packets and flows by count and age limits"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-packets",
+            type=int,
+            default=settings.MAX_PACKET_STORE,
+            help="Maximum number of packets to keep",
+        )
+        parser.add_argument(
+            "--max-age-hours",
+            type=float,
+            default=settings.PACKET_RETENTION_HOURS,
+            help="Delete packets older than this many hours",
+        )
+        parser.add_argument(
+            "--max-flows",
+            type=int,
+            default=settings.MAX_FLOW_STORE,
+            help="Maximum number of flows to keep",
+        )
+        parser.add_argument(
+            "--flow-max-age-hours",
+            type=float,
+            default=settings.FLOW_RETENTION_HOURS,
+            help="Delete flows last seen more than this many hours ago",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10000,
+            help="Maximum number of packets removed per DELETE statement",
+        )
 
     def handle(self, *args, **kwargs):
-        initial_count = Packet.objects.count()
-        Packet.cleanup_old_packets()
+        retention = PacketRetention(
+            max_packets=kwargs["max_packets"],
+            max_age_hours=kwargs["max_age_hours"],
+            eviction_chunk=kwargs["chunk_size"],
+        )
+        deleted_count = retention.enforce()
         final_count = Packet.objects.count()
-        deleted_count = initial_count - final_count
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -18,3 +55,17 @@ class Command(BaseCommand):
                 f"Current packet count: {final_count}"
             )
         )
+
+        if kwargs["max_flows"] or kwargs["flow_max_age_hours"]:
+            flow_retention = FlowRetention(
+                max_flows=kwargs["max_flows"],
+                max_age_hours=kwargs["flow_max_age_hours"],
+                eviction_chunk=kwargs["chunk_size"],
+            )
+            deleted_flows = flow_retention.enforce()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Deleted {deleted_flows} old flows. "
+                    f"Current flow count: {Flow.objects.count()}"
+                )
+            )
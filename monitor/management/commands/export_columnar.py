@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor.columnar_export import COLUMNAR_FORMATS, EXPORT_TABLES, export_columnar
+from monitor.exports import parse_time
+from monitor.packet_columns import COLUMN_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Export packets or flows to a compressed columnar file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="File to write")
+        parser.add_argument(
+            "--table",
+            choices=tuple(EXPORT_TABLES),
+            default="packets",
+            help="Table to export",
+        )
+        parser.add_argument(
+            "--format",
+            choices=COLUMNAR_FORMATS,
+            default="npz",
+            help="Compressed NumPy arrays, or Parquet (requires pyarrow)",
+        )
+        parser.add_argument(
+            "--start", help="Only rows from this ISO date or datetime on"
+        )
+        parser.add_argument("--end", help="Only rows before this ISO date or datetime")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=COLUMN_CHUNK_SIZE,
+            help="Rows read and converted per batch",
+        )
+        parser.add_argument(
+            "--compression",
+            default="zstd",
+            help="Parquet compression codec",
+        )
+
+    def handle(self, *args, **kwargs):
+        try:
+            start = parse_time(kwargs["start"], "start") if kwargs["start"] else None
+            end = parse_time(kwargs["end"], "end") if kwargs["end"] else None
+            rows = export_columnar(
+                kwargs["table"],
+                kwargs["output"],
+                export_format=kwargs["format"],
+                start=start,
+                end=end,
+                chunk_size=kwargs["chunk_size"],
+                compression=kwargs["compression"],
+            )
+        except (ImportError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Exported {rows} {kwargs['table']} to {kwargs['output']}"
+            )
+        )
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor.partitions import PARTITION_AHEAD_DAYS, PacketPartitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Partition the packet table by time on PostgreSQL, or create the "
+        "upcoming partitions of an already partitioned table"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.PACKET_PARTITION_DAYS or 1,
+            help="Days of packets per partition",
+        )
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=PARTITION_AHEAD_DAYS,
+            help="Create partitions for this many days after today",
+        )
+
+    def handle(self, *args, **kwargs):
+        partitions = PacketPartitions(days=kwargs["days"])
+        if not partitions.supported:
+            raise CommandError("Packet partitioning requires PostgreSQL")
+
+        if partitions.is_partitioned():
+            created = partitions.ensure(ahead_days=kwargs["ahead"])
+            self.stdout.write(
+                self.style.SUCCESS(f"Created {created} packet partitions")
+            )
+            return
+
+        self.stdout.write("Partitioning the packet table, this locks it until done")
+        partitions.partition_table(ahead_days=kwargs["ahead"])
+        count = len(partitions.partitions())
+        self.stdout.write(
+            self.style.SUCCESS(f"Packet table partitioned into {count} partitions")
+        )
@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from monitor.rollups import BUCKET_SIZES, bucket_start, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild traffic rollups from the stored packets"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=float,
+            default=48,
+            help="Rebuild the rollups of this many most recent hours",
+        )
+
+    def handle(self, *args, **kwargs):
+        now = timezone.now()
+        end = now + BUCKET_SIZES["minute"]
+        start = bucket_start(now - timedelta(hours=kwargs["hours"]), "hour")
+
+        minute_rows, hour_rows, day_rows = rebuild_rollups(start, end)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt rollups since {start:%Y-%m-%d %H:%M} UTC: {minute_rows} "
+                f"minute, {hour_rows} hour and {day_rows} day rows"
+            )
+        )
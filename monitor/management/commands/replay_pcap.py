@@ -0,0 +1,122 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor.pcap_replay import PcapReplayManager
+from monitor.sampling import SAMPLING_MODES
+from monitor.sniffer import SHARD_KEYS, STORAGE_MODES, TRANSPORTS
+
+
+class Command(BaseCommand):
+    help = "Replay pcap files through the capture pipeline and report throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+", help="pcap files to replay")
+        parser.add_argument(
+            "--interface",
+            default="pcap",
+            help="Interface name the packets are stored under",
+        )
+        parser.add_argument(
+            "--parallel",
+            action="store_true",
+            help="Replay every file in its own capture worker",
+        )
+        parser.add_argument(
+            "--speed",
+            type=float,
+            default=0.0,
+            help="Multiple of the original timing, 0 for as fast as possible",
+        )
+        parser.add_argument(
+            "--drop-on-full",
+            action="store_true",
+            help="Drop packets when a writer queue is full instead of waiting",
+        )
+        parser.add_argument(
+            "--writers",
+            type=int,
+            default=int(os.environ.get("NETCREEP_WRITERS", 1)),
+            help="Database writer processes",
+        )
+        parser.add_argument(
+            "--transport",
+            choices=TRANSPORTS,
+            default=os.environ.get("NETCREEP_TRANSPORT", "queue"),
+            help="How packets reach the writers",
+        )
+        parser.add_argument(
+            "--shard-by",
+            choices=SHARD_KEYS,
+            default="flow",
+            help="How packets are routed to writers",
+        )
+        parser.add_argument(
+            "--storage",
+            choices=STORAGE_MODES,
+            default=os.environ.get("NETCREEP_STORAGE", "packets"),
+            help="Store packets, flows or both",
+        )
+        parser.add_argument(
+            "--sampling",
+            choices=SAMPLING_MODES,
+            help="Load shedding applied as writer queues fill up",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=int(os.environ.get("NETCREEP_BATCH_SIZE", 500)),
+            help="Packets written per transaction",
+        )
+        parser.add_argument(
+            "--max-packets",
+            type=int,
+            default=0,
+            help="Packets kept by retention, 0 to keep every replayed packet",
+        )
+        parser.add_argument(
+            "--no-stream-detection",
+            action="store_true",
+            help="Skip streaming anomaly detection of the replayed packets",
+        )
+
+    def handle(self, *args, **kwargs):
+        try:
+            manager = PcapReplayManager(
+                kwargs["files"],
+                interface=kwargs["interface"],
+                parallel=kwargs["parallel"],
+                speed=kwargs["speed"],
+                drop_on_full=kwargs["drop_on_full"],
+                num_writers=kwargs["writers"],
+                transport=kwargs["transport"],
+                shard_by=kwargs["shard_by"],
+                storage=kwargs["storage"],
+                sampling=kwargs["sampling"],
+                batch_size=kwargs["batch_size"],
+                max_packet_store=kwargs["max_packets"] or None,
+                stream_detection=not kwargs["no_stream_detection"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        stats = manager.replay()
+        self.stdout.write(
+            f"Read {stats['frames']} frames in {stats['seconds']:.2f}s "
+            f"({stats['frames_per_second']:.0f} frames/s)"
+        )
+        self.stdout.write(
+            f"Queued {stats['packets']} IP packets, dropped {stats['dropped']}, "
+            f"shed {stats['sampled_out']} by sampling"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Committed {stats['committed']} rows "
+                f"({stats['committed_per_second']:.0f} rows/s)"
+            )
+        )
+        minute_rows, hour_rows, day_rows = stats["rollups"]
+        self.stdout.write(
+            f"Rebuilt {minute_rows} minute, {hour_rows} hour and {day_rows} day "
+            f"rollups over the replayed span"
+        )
@@ -0,0 +1,64 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitor.scheduler import Scheduler
+from monitor.tasks import register_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run anomaly detection, system stats sampling and packet cleanup on a schedule"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--jobs",
+            nargs="+",
+            help="Only run these jobs",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Maximum number of jobs running at the same time",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=None,
+            help="Stop after this many seconds instead of running until interrupted",
+        )
+
+    def handle(self, *args, **kwargs):
+        scheduler = Scheduler(max_workers=kwargs["workers"])
+        register_jobs(scheduler)
+        if kwargs["jobs"]:
+            unknown = set(kwargs["jobs"]) - set(scheduler.jobs)
+            if unknown:
+                raise CommandError(f"Unknown jobs: {', '.join(sorted(unknown))}")
+            scheduler.jobs = {
+                name: job
+                for name, job in scheduler.jobs.items()
+                if name in kwargs["jobs"]
+            }
+
+        signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
+        self.stdout.write(
+            "Running jobs: "
+            + ", ".join(
+                f"{name} every {job.interval:g}s"
+                for name, job in scheduler.jobs.items()
+            )
+        )
+        try:
+            scheduler.run(duration=kwargs["duration"])
+        except KeyboardInterrupt:
+            scheduler.stop()
+
+        for name, metrics in scheduler.get_metrics().items():
+            self.stdout.write(
+                f"{name}: {metrics['runs']} runs, {metrics['failures']} failed, "
+                f"{metrics['skipped']} skipped"
+            )
+        self.stdout.write(self.style.SUCCESS("Scheduler stopped"))
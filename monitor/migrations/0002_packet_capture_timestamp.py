@@ -0,0 +1,29 @@
+# Generated by Django 5.0 on 2026-10-18 08:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="packet",
+            name="destination_port",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="packet",
+            name="source_port",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="packet",
+            name="timestamp",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
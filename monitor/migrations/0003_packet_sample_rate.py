@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 08:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0002_packet_capture_timestamp"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="packet",
+            name="sample_rate",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
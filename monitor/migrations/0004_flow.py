@@ -0,0 +1,72 @@
+# Generated by Django 5.0 on 2026-10-18 08:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0003_packet_sample_rate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Flow",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("protocol", models.CharField(max_length=20)),
+                ("source_ip", models.GenericIPAddressField()),
+                ("destination_ip", models.GenericIPAddressField()),
+                ("source_port", models.IntegerField(blank=True, null=True)),
+                ("destination_port", models.IntegerField(blank=True, null=True)),
+                ("first_seen", models.DateTimeField()),
+                ("last_seen", models.DateTimeField()),
+                (
+                    "packets",
+                    models.BigIntegerField(
+                        help_text="Packets from source to destination"
+                    ),
+                ),
+                (
+                    "bytes",
+                    models.BigIntegerField(
+                        help_text="Bytes from source to destination"
+                    ),
+                ),
+                (
+                    "reverse_packets",
+                    models.BigIntegerField(
+                        help_text="Packets from destination to source"
+                    ),
+                ),
+                (
+                    "reverse_bytes",
+                    models.BigIntegerField(
+                        help_text="Bytes from destination to source"
+                    ),
+                ),
+                (
+                    "tcp_flags",
+                    models.PositiveSmallIntegerField(
+                        default=0, help_text="TCP flags seen in either direction"
+                    ),
+                ),
+                (
+                    "interface",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="monitor.networkinterface",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.0 on 2026-10-18 08:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0004_flow"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrafficRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "resolution",
+                    models.CharField(
+                        choices=[
+                            ("minute", "Minute"),
+                            ("hour", "Hour"),
+                            ("day", "Day"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("bucket_start", models.DateTimeField()),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[
+                            ("protocol", "Protocol"),
+                            ("source_ip", "Source IP"),
+                            ("destination_port", "Destination port"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("key", models.CharField(max_length=45)),
+                ("packets", models.BigIntegerField(default=0)),
+                ("bytes", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("resolution", "dimension", "bucket_start", "key"),
+                        name="unique_traffic_rollup_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
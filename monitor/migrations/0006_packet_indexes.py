@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0005_trafficrollup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="packet",
+            index=models.Index(fields=["timestamp"], name="packet_timestamp_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="packet",
+            index=models.Index(
+                fields=["source_ip", "timestamp"], name="packet_source_ip_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="packet",
+            index=models.Index(
+                fields=["destination_port", "timestamp"],
+                name="packet_dst_port_time_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0006_packet_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="packet",
+            name="tcp_flags",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
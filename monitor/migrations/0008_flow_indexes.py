@@ -0,0 +1,21 @@
+# Generated by Django 5.0 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0007_packet_tcp_flags"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flow",
+            index=models.Index(fields=["first_seen"], name="flow_first_seen_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="flow",
+            index=models.Index(fields=["last_seen"], name="flow_last_seen_idx"),
+        ),
+    ]
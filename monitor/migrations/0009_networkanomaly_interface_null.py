@@ -0,0 +1,24 @@
+# Generated by Django 5.0 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitor", "0008_flow_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="networkanomaly",
+            name="interface",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="monitor.networkinterface",
+            ),
+        ),
+    ]
@@ -94,7 +94,10 @@ class NetworkPerformanceMetric(models.Model):
 
 class NetworkAnomaly(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
-    interface = models.ForeignKey(NetworkInterface, on_delete=models.CASCADE)
+    # NULL for anomalies across every interface
+    interface = models.ForeignKey(
+        NetworkInterface, on_delete=models.CASCADE, blank=True, null=True
+    )
     anomaly_type = models.CharField(
         max_length=50, 
         default='unknown', 
@@ -118,24 +121,111 @@ class NetworkAnomaly(models.Model):
     is_resolved = models.BooleanField(default=False)
 
     def __str__(self):
-        return f"{self.anomaly_type} anomaly on {self.interface.name}"
+        scope = self.interface.name if self.interface else "all interfaces"
+        return f"{self.anomaly_type} anomaly on {scope}"
 
 
 class Packet(models.Model):
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set from the capture time, so batched inserts keep per-packet timestamps
+    timestamp = models.DateTimeField(default=timezone.now)
     interface = models.ForeignKey(NetworkInterface, on_delete=models.CASCADE)
     protocol = models.CharField(max_length=20)
     source_ip = models.GenericIPAddressField()
     destination_ip = models.GenericIPAddressField()
-    source_port = models.IntegerField()
-    destination_port = models.IntegerField()
+    source_port = models.IntegerField(blank=True, null=True)
+    destination_port = models.IntegerField(blank=True, null=True)
     packet_size = models.IntegerField()
     payload = models.TextField(blank=True, null=True)
+    # 1 in sample_rate packets was kept when this one was captured; weight
+    # counts by it to estimate the traffic seen
+    sample_rate = models.PositiveIntegerField(default=1)
+    # TCP flags of the packet; NULL for packets stored before they were kept
+    tcp_flags = models.PositiveSmallIntegerField(blank=True, null=True)
+
+    class Meta:
+        # Analysis filters by time and groups by source or destination port
+        indexes = [
+            models.Index(fields=["timestamp"], name="packet_timestamp_idx"),
+            models.Index(
+                fields=["source_ip", "timestamp"], name="packet_source_ip_time_idx"
+            ),
+            models.Index(
+                fields=["destination_port", "timestamp"],
+                name="packet_dst_port_time_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.protocol} packet from {self.source_ip}:{self.source_port}"
 
 
+class Flow(models.Model):
+    # Both directions of a connection; source is the side that sent first.
+    # Counts are scaled by each packet's sample rate
+    interface = models.ForeignKey(NetworkInterface, on_delete=models.CASCADE)
+    protocol = models.CharField(max_length=20)
+    source_ip = models.GenericIPAddressField()
+    destination_ip = models.GenericIPAddressField()
+    source_port = models.IntegerField(blank=True, null=True)
+    destination_port = models.IntegerField(blank=True, null=True)
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+    packets = models.BigIntegerField(help_text="Packets from source to destination")
+    bytes = models.BigIntegerField(help_text="Bytes from source to destination")
+    reverse_packets = models.BigIntegerField(
+        help_text="Packets from destination to source"
+    )
+    reverse_bytes = models.BigIntegerField(help_text="Bytes from destination to source")
+    tcp_flags = models.PositiveSmallIntegerField(
+        default=0, help_text="TCP flags seen in either direction"
+    )
+
+    class Meta:
+        # Exports order and filter by first_seen; retention ages by last_seen
+        indexes = [
+            models.Index(fields=["first_seen"], name="flow_first_seen_idx"),
+            models.Index(fields=["last_seen"], name="flow_last_seen_idx"),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.protocol} flow {self.source_ip}:{self.source_port} -> "
+            f"{self.destination_ip}:{self.destination_port}"
+        )
+
+
+class TrafficRollup(models.Model):
+    # Traffic totals per time bucket, maintained by the packet writers so
+    # analysis does not have to group the raw packet table
+    RESOLUTIONS = [("minute", "Minute"), ("hour", "Hour"), ("day", "Day")]
+    DIMENSIONS = [
+        ("protocol", "Protocol"),
+        ("source_ip", "Source IP"),
+        ("destination_port", "Destination port"),
+    ]
+
+    resolution = models.CharField(max_length=10, choices=RESOLUTIONS)
+    bucket_start = models.DateTimeField()
+    dimension = models.CharField(max_length=20, choices=DIMENSIONS)
+    key = models.CharField(max_length=45)
+    packets = models.BigIntegerField(default=0)
+    bytes = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["resolution", "dimension", "bucket_start", "key"],
+                name="unique_traffic_rollup_bucket",
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.dimension}={self.key} per {self.resolution} "
+            f"at {self.bucket_start}"
+        )
+
+
 class SystemStat(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     cpu_usage = models.FloatField()
@@ -0,0 +1,72 @@
+from itertools import islice
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from django.db.models import QuerySet
+
+# Rows fetched from the database per chunk
+COLUMN_CHUNK_SIZE = 100000
+
+
+def load_packet_columns(
+    packets: QuerySet,
+    numeric_fields: Sequence[str] = (),
+    categorical_fields: Sequence[str] = (),
+    chunk_size: int = COLUMN_CHUNK_SIZE,
+) -> Tuple[Dict[str, np.ndarray], Dict[str, List[str]]]:
+    """
+    Load packet fields as NumPy arrays, one per field.
+
+    Rows are streamed with ``values_list`` in chunks, so no model instances
+    are built and only one chunk of Python tuples is held at a time.
+    Numeric fields become int64 arrays with NULL stored as -1. Categorical
+    fields, such as protocols and IP addresses, become int32 codes indexing
+    a list of their distinct values.
+
+    Args:
+        packets (QuerySet): Packets to load
+        numeric_fields (Sequence[str]): Integer fields to load
+        categorical_fields (Sequence[str]): Text fields to load as codes
+        chunk_size (int): Rows fetched per chunk
+
+    Returns:
+        Tuple of arrays by field, and distinct values by categorical field
+    """
+    fields = list(numeric_fields) + list(categorical_fields)
+    chunks: Dict[str, List[np.ndarray]] = {field: [] for field in fields}
+    codes: Dict[str, Dict[str, int]] = {field: {} for field in categorical_fields}
+
+    rows = packets.values_list(*fields).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        for field, values in zip(fields, zip(*chunk)):
+            if field in codes:
+                field_codes = codes[field]
+                array = np.fromiter(
+                    (
+                        field_codes.setdefault(value, len(field_codes))
+                        for value in values
+                    ),
+                    dtype=np.int32,
+                    count=len(values),
+                )
+            else:
+                array = np.fromiter(
+                    (-1 if value is None else value for value in values),
+                    dtype=np.int64,
+                    count=len(values),
+                )
+            chunks[field].append(array)
+
+    columns = {
+        field: (
+            np.concatenate(arrays)
+            if arrays
+            else np.empty(0, dtype=np.int32 if field in codes else np.int64)
+        )
+        for field, arrays in chunks.items()
+    }
+    labels = {field: list(field_codes) for field, field_codes in codes.items()}
+    return columns, labels
@@ -0,0 +1,187 @@
+import socket
+import struct
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from typing import Any, Dict, Optional, Union
+
+from django.utils import timezone
+
+# pcap link-layer header types understood by the decoder
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LINUX_SLL = 113
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86DD
+VLAN_ETHERTYPES = (0x8100, 0x88A8, 0x9100)
+
+IPPROTO_ICMP = 1
+IPPROTO_TCP = 6
+IPPROTO_UDP = 17
+
+# Offset of the flags byte (CWR ... FIN) in the TCP header
+TCP_FLAGS_OFFSET = 13
+
+# IPv6 extension headers walked before the transport header
+IPV6_EXTENSION_HEADERS = (0, 43, 60)
+IPV6_FRAGMENT_HEADER = 44
+IPV6_AUTH_HEADER = 51
+
+_ETHERTYPE = struct.Struct("!H")
+# version/IHL, total length, flags/fragment offset, protocol, source, destination
+_IPV4_HEADER = struct.Struct("!BxHxxHxBxx4s4s")
+# payload length, next header, source, destination
+_IPV6_HEADER = struct.Struct("!4xHBx16s16s")
+_IPV6_EXTENSION = struct.Struct("!BB")
+_PORTS = struct.Struct("!HH")
+
+_PROTOCOL_NAMES = {IPPROTO_TCP: "TCP", IPPROTO_UDP: "UDP", IPPROTO_ICMP: "ICMP"}
+
+Frame = Union[bytes, bytearray, memoryview]
+
+
+def decode_frame(
+    frame: Frame,
+    interface: Optional[str] = None,
+    wire_length: Optional[int] = None,
+    timestamp: Union[datetime, float, None] = None,
+    link_type: int = LINKTYPE_ETHERNET,
+    compact: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """
+    Decode the link, IP and transport headers of a raw frame.
+
+    Only the fields stored for each packet are parsed, straight from the
+    frame buffer; the result has the same keys and values as
+    ``PacketCaptureManager._process_packet`` produces from a scapy dissection.
+
+    Args:
+        frame (bytes): Captured frame, possibly truncated to the snaplen
+        interface (str): Interface the frame was captured on
+        wire_length (int): Original frame length, if the frame was truncated
+        timestamp (datetime or float): Capture time, as a datetime or in
+            seconds since the epoch; defaults to now
+        link_type (int): pcap link-layer header type of the frame
+        compact (bool): Keep the timestamp in seconds since the epoch and
+            leave out the summary, for the shared-memory transport, which
+            packs packets into records holding neither
+
+    Returns:
+        Packet data dictionary, or None for non-IP traffic
+    """
+    try:
+        if link_type == LINKTYPE_ETHERNET:
+            offset = 12
+            (ethertype,) = _ETHERTYPE.unpack_from(frame, offset)
+            offset += 2
+            while ethertype in VLAN_ETHERTYPES:
+                (ethertype,) = _ETHERTYPE.unpack_from(frame, offset + 2)
+                offset += 4
+        elif link_type == LINKTYPE_LINUX_SLL:
+            (ethertype,) = _ETHERTYPE.unpack_from(frame, 14)
+            offset = 16
+        elif link_type == LINKTYPE_RAW:
+            offset = 0
+            version = frame[0] >> 4
+            ethertype = ETHERTYPE_IPV6 if version == 6 else ETHERTYPE_IPV4
+        else:
+            return None
+
+        if ethertype == ETHERTYPE_IPV4:
+            (
+                version_ihl,
+                ip_length,
+                fragment,
+                next_header,
+                src,
+                dst,
+            ) = _IPV4_HEADER.unpack_from(frame, offset)
+            source_ip = socket.inet_ntoa(src)
+            destination_ip = socket.inet_ntoa(dst)
+            transport_offset = offset + (version_ihl & 0x0F) * 4
+            # Later fragments carry no transport header
+            has_transport = not fragment & 0x1FFF
+        elif ethertype == ETHERTYPE_IPV6:
+            payload_length, next_header, src, dst = _IPV6_HEADER.unpack_from(
+                frame, offset
+            )
+            source_ip = socket.inet_ntop(socket.AF_INET6, src)
+            destination_ip = socket.inet_ntop(socket.AF_INET6, dst)
+            ip_length = payload_length + 40
+            transport_offset = offset + 40
+            has_transport = True
+            while has_transport:
+                if next_header in IPV6_EXTENSION_HEADERS:
+                    header, length = _IPV6_EXTENSION.unpack_from(
+                        frame, transport_offset
+                    )
+                    transport_offset += (length + 1) * 8
+                elif next_header == IPV6_AUTH_HEADER:
+                    header, length = _IPV6_EXTENSION.unpack_from(
+                        frame, transport_offset
+                    )
+                    transport_offset += (length + 2) * 4
+                elif next_header == IPV6_FRAGMENT_HEADER:
+                    header = frame[transport_offset]
+                    (fragment,) = _ETHERTYPE.unpack_from(frame, transport_offset + 2)
+                    has_transport = not fragment & 0xFFF8
+                    transport_offset += 8
+                else:
+                    break
+                next_header = header
+        else:
+            return None
+    except (struct.error, IndexError, ValueError, OSError):
+        return None
+
+    protocol = "OTHER"
+    src_port = None
+    dst_port = None
+    tcp_flags = 0
+    if has_transport:
+        if next_header == IPPROTO_TCP or next_header == IPPROTO_UDP:
+            try:
+                src_port, dst_port = _PORTS.unpack_from(frame, transport_offset)
+                protocol = _PROTOCOL_NAMES[next_header]
+                if next_header == IPPROTO_TCP:
+                    tcp_flags = frame[transport_offset + TCP_FLAGS_OFFSET]
+            except (struct.error, IndexError):
+                pass
+        elif next_header == IPPROTO_ICMP and ethertype == ETHERTYPE_IPV4:
+            protocol = "ICMP"
+
+    packet_size = max(wire_length or len(frame), offset + ip_length)
+
+    if compact:
+        return {
+            "interface": interface,
+            "timestamp": time.time() if timestamp is None else timestamp,
+            "protocol": protocol,
+            "source_ip": source_ip,
+            "destination_ip": destination_ip,
+            "source_port": src_port,
+            "destination_port": dst_port,
+            "packet_size": packet_size,
+            "tcp_flags": tcp_flags,
+        }
+
+    if timestamp is None:
+        timestamp = timezone.now()
+    elif not isinstance(timestamp, datetime):
+        timestamp = datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+    return {
+        "interface": interface,
+        "timestamp": timestamp,
+        "summary": (
+            f"{protocol}: {source_ip}:{src_port or 'N/A'} -> "
+            f"{destination_ip}:{dst_port or 'N/A'}"
+        ),
+        "protocol": protocol,
+        "source_ip": source_ip,
+        "destination_ip": destination_ip,
+        "source_port": src_port,
+        "destination_port": dst_port,
+        "packet_size": packet_size,
+        "tcp_flags": tcp_flags,
+    }
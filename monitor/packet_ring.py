@@ -0,0 +1,199 @@
+import multiprocessing
+import socket
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# Fixed-width packet record: timestamp ns, address family, protocol number,
+# port flags, interface index, source port, destination port, packet size,
+# source address, destination address (IPv4 addresses use the first 4 bytes),
+# sampling rate, TCP flags
+RECORD = struct.Struct("<qBBBBHHI16s16sHBx")
+
+PROTOCOL_NUMBERS = {"OTHER": 0, "ICMP": 1, "TCP": 6, "UDP": 17}
+PROTOCOL_NAMES = {number: name for name, number in PROTOCOL_NUMBERS.items()}
+
+HAS_SOURCE_PORT = 0x01
+HAS_DESTINATION_PORT = 0x02
+
+_WRITE_INDEX = 0
+_READ_INDEX = 1
+
+
+class PacketRing:
+    """
+    Shared-memory ring of fixed-width packet records.
+
+    Capture processes append records under a lock; the single consumer
+    decodes every waiting record in one pass. Records are packed with
+    ``struct`` instead of pickled, so each queued packet costs
+    ``RECORD.size`` bytes and no per-packet serialization.
+    """
+
+    def __init__(self, capacity: int, interfaces: List[str]):
+        """
+        Initialize the ring.
+
+        Args:
+            capacity (int): Maximum number of records waiting in the ring
+            interfaces (List[str]): Interface names, records store their index
+        """
+        self.capacity = capacity
+        self.interfaces = list(interfaces)
+        self._interface_indexes = {
+            name: index for index, name in enumerate(self.interfaces)
+        }
+        self._buffer = multiprocessing.RawArray("B", capacity * RECORD.size)
+        # Total records ever written and read; slots are index % capacity
+        self._indexes = multiprocessing.RawArray("q", 2)
+        self._lock = multiprocessing.Lock()
+
+    def __len__(self) -> int:
+        """Number of records waiting to be read."""
+        with self._lock:
+            return self._indexes[_WRITE_INDEX] - self._indexes[_READ_INDEX]
+
+    def put(self, packet_data: Dict[str, Any]) -> bool:
+        """
+        Append a packet record without blocking.
+
+        Args:
+            packet_data (Dict): Decoded packet data; the timestamp may be a
+                datetime or seconds since the epoch
+
+        Returns:
+            False if the ring is full and the packet was dropped
+
+        Raises:
+            ValueError: If the packet's interface is not one of the ring's
+        """
+        interface_index = self._interface_indexes.get(packet_data["interface"])
+        if interface_index is None:
+            raise ValueError(
+                f"Interface {packet_data['interface']!r} is not in the packet ring"
+            )
+        source_ip = packet_data["source_ip"]
+        if ":" in source_ip:
+            family = 6
+            source = socket.inet_pton(socket.AF_INET6, source_ip)
+            destination = socket.inet_pton(
+                socket.AF_INET6, packet_data["destination_ip"]
+            )
+        else:
+            family = 4
+            source = socket.inet_aton(source_ip)
+            destination = socket.inet_aton(packet_data["destination_ip"])
+
+        source_port = packet_data["source_port"]
+        destination_port = packet_data["destination_port"]
+        flags = (HAS_SOURCE_PORT if source_port is not None else 0) | (
+            HAS_DESTINATION_PORT if destination_port is not None else 0
+        )
+        timestamp = packet_data["timestamp"]
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+
+        with self._lock:
+            write_index = self._indexes[_WRITE_INDEX]
+            if write_index - self._indexes[_READ_INDEX] >= self.capacity:
+                return False
+            RECORD.pack_into(
+                self._buffer,
+                (write_index % self.capacity) * RECORD.size,
+                int(timestamp * 1_000_000) * 1000,
+                family,
+                PROTOCOL_NUMBERS.get(packet_data["protocol"], 0),
+                flags,
+                interface_index,
+                source_port or 0,
+                destination_port or 0,
+                packet_data["packet_size"],
+                source,
+                destination,
+                min(packet_data.get("sample_rate", 1), 0xFFFF),
+                packet_data.get("tcp_flags", 0),
+            )
+            self._indexes[_WRITE_INDEX] = write_index + 1
+        return True
+
+    def get_batch(self, max_records: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Remove and decode every waiting record, up to ``max_records``.
+
+        Args:
+            max_records (int): Maximum number of records to read
+
+        Returns:
+            List of packet data dictionaries, oldest first
+        """
+        with self._lock:
+            read_index = self._indexes[_READ_INDEX]
+            write_index = self._indexes[_WRITE_INDEX]
+        if max_records is not None:
+            write_index = min(write_index, read_index + max_records)
+        if write_index == read_index:
+            return []
+
+        # The waiting records span at most two contiguous slot ranges
+        view = memoryview(self._buffer)
+        start = read_index % self.capacity
+        end = start + (write_index - read_index)
+        segments = [view[start * RECORD.size : min(end, self.capacity) * RECORD.size]]
+        if end > self.capacity:
+            segments.append(view[: (end - self.capacity) * RECORD.size])
+        packets = [
+            self._decode(record)
+            for segment in segments
+            for record in RECORD.iter_unpack(segment)
+        ]
+        view.release()
+
+        with self._lock:
+            self._indexes[_READ_INDEX] = write_index
+        return packets
+
+    def _decode(self, record: tuple) -> Dict[str, Any]:
+        """
+        Convert an unpacked record back into packet data.
+
+        Args:
+            record (tuple): Fields unpacked with ``RECORD``
+
+        Returns:
+            Packet data dictionary
+        """
+        (
+            timestamp_ns,
+            family,
+            protocol,
+            flags,
+            interface_index,
+            source_port,
+            destination_port,
+            packet_size,
+            source,
+            destination,
+            sample_rate,
+            tcp_flags,
+        ) = record
+        if family == 6:
+            source_ip = socket.inet_ntop(socket.AF_INET6, source)
+            destination_ip = socket.inet_ntop(socket.AF_INET6, destination)
+        else:
+            source_ip = socket.inet_ntoa(source[:4])
+            destination_ip = socket.inet_ntoa(destination[:4])
+
+        return {
+            "interface": self.interfaces[interface_index],
+            "timestamp": datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc),
+            "protocol": PROTOCOL_NAMES.get(protocol, "OTHER"),
+            "source_ip": source_ip,
+            "destination_ip": destination_ip,
+            "source_port": source_port if flags & HAS_SOURCE_PORT else None,
+            "destination_port": (
+                destination_port if flags & HAS_DESTINATION_PORT else None
+            ),
+            "packet_size": packet_size,
+            "sample_rate": sample_rate,
+            "tcp_flags": tcp_flags,
+        }
@@ -0,0 +1,235 @@
+import logging
+import re
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import List, Tuple
+
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Packet
+
+logger = logging.getLogger(__name__)
+
+# Bounds of a range partition as printed by pg_get_expr
+RANGE_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+# Partitions are kept created this many days ahead
+PARTITION_AHEAD_DAYS = 7
+
+
+class PacketPartitions:
+    """
+    Time-range partitioning of the packet table on PostgreSQL.
+
+    The table is split into partitions of ``days`` days each on the packet
+    timestamp, plus a default partition for rows outside every range.
+    Retention then drops whole expired partitions instead of deleting their
+    rows, and partitions are created ahead of time by a scheduler job.
+    Other databases keep the plain table and every method is a no-op.
+    """
+
+    def __init__(self, days: int = 1):
+        """
+        Initialize partition management.
+
+        Args:
+            days (int): Width of new partitions in days
+        """
+        self.days = max(1, days)
+        self.table = Packet._meta.db_table
+
+    @property
+    def supported(self) -> bool:
+        """Whether the database supports native partitioning."""
+        return connection.vendor == "postgresql"
+
+    def is_partitioned(self) -> bool:
+        """
+        Check whether the packet table is partitioned.
+
+        Returns:
+            True if the table is a partitioned table
+        """
+        if not self.supported:
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = %s::regclass)",
+                [self.table],
+            )
+            return cursor.fetchone()[0]
+
+    def partitions(self) -> List[Tuple[str, datetime, datetime]]:
+        """
+        Range partitions of the packet table.
+
+        Returns:
+            List of (name, start, end) tuples ordered by start; the default
+            partition is not included
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = %s::regclass",
+                [self.table],
+            )
+            rows = cursor.fetchall()
+
+        partitions = []
+        for name, bound in rows:
+            match = RANGE_BOUND.search(bound)
+            if match:
+                start, end = (parse_datetime(value) for value in match.groups())
+                partitions.append((name, start, end))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    def partition_table(self, ahead_days: int = PARTITION_AHEAD_DAYS):
+        """
+        Convert the packet table into a partitioned table, keeping its rows.
+
+        The table is locked while rows are copied, so run this during
+        maintenance. The primary key becomes (id, timestamp), as PostgreSQL
+        requires the partition key in unique constraints.
+
+        Args:
+            ahead_days (int): Days after today to create partitions for
+        """
+        if not self.supported:
+            raise DatabaseError("Packet partitioning requires PostgreSQL")
+        if self.is_partitioned():
+            return
+
+        table = connection.ops.quote_name(self.table)
+        old = connection.ops.quote_name(f"{self.table}_unpartitioned")
+        interfaces = connection.ops.quote_name(
+            Packet._meta.get_field("interface").related_model._meta.db_table
+        )
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE tablename = %s AND indexdef NOT LIKE 'CREATE UNIQUE%%'",
+                [self.table],
+            )
+            indexes = cursor.fetchall()
+            cursor.execute(f"SELECT MIN(timestamp) FROM {table}")
+            oldest = cursor.fetchone()[0]
+
+            cursor.execute(f"ALTER TABLE {table} RENAME TO {old}")
+            cursor.execute(
+                f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS "
+                f"INCLUDING IDENTITY INCLUDING CONSTRAINTS) "
+                f"PARTITION BY RANGE (timestamp)"
+            )
+            cursor.execute(
+                f"CREATE TABLE {connection.ops.quote_name(self.table + '_default')} "
+                f"PARTITION OF {table} DEFAULT"
+            )
+            self._create_range(cursor, oldest or timezone.now(), ahead_days)
+
+            cursor.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+            cursor.execute(
+                "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {old}), false)",
+                [self.table],
+            )
+            cursor.execute(f"DROP TABLE {old}")
+
+            # Constraint and index names are freed by the drop; indexes on the
+            # parent are created on every partition
+            cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, timestamp)")
+            cursor.execute(
+                f"ALTER TABLE {table} ADD FOREIGN KEY (interface_id) "
+                f"REFERENCES {interfaces} (id) DEFERRABLE INITIALLY DEFERRED"
+            )
+            for _, definition in indexes:
+                cursor.execute(definition)
+        logger.info(f"Partitioned {self.table} into {self.days}-day ranges")
+
+    def ensure(self, ahead_days: int = PARTITION_AHEAD_DAYS) -> int:
+        """
+        Create the partitions up to ``ahead_days`` days from now.
+
+        Args:
+            ahead_days (int): Days after today to create partitions for
+
+        Returns:
+            Number of partitions created
+        """
+        if not self.is_partitioned():
+            return 0
+        partitions = self.partitions()
+        start = partitions[-1][2] if partitions else timezone.now()
+        with connection.cursor() as cursor:
+            return self._create_range(cursor, start, ahead_days)
+
+    def drop_before(self, cutoff: datetime) -> int:
+        """
+        Drop the partitions holding only packets older than ``cutoff``.
+
+        Args:
+            cutoff (datetime): Packets before this time may be dropped
+
+        Returns:
+            Estimated number of packets dropped
+        """
+        if not self.is_partitioned():
+            return 0
+
+        dropped = 0
+        with connection.cursor() as cursor:
+            for name, _, end in self.partitions():
+                if end > cutoff:
+                    break
+                # Counting the rows would read the whole partition
+                cursor.execute(
+                    "SELECT GREATEST(reltuples, 0)::bigint FROM pg_class "
+                    "WHERE oid = %s::regclass",
+                    [name],
+                )
+                rows = cursor.fetchone()[0]
+                cursor.execute(f"DROP TABLE {connection.ops.quote_name(name)}")
+                dropped += rows
+                logger.info(f"Dropped packet partition {name} (~{rows} packets)")
+        return dropped
+
+    def _create_range(self, cursor, start: datetime, ahead_days: int) -> int:
+        """
+        Create consecutive partitions from ``start`` to ``ahead_days`` ahead.
+
+        Args:
+            cursor: Database cursor
+            start (datetime): Start of the first partition, rounded down to
+                midnight UTC
+            ahead_days (int): Days after today the last partition reaches
+
+        Returns:
+            Number of partitions created
+        """
+        start = start.astimezone(dt_timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        until = timezone.now() + timedelta(days=ahead_days)
+        width = timedelta(days=self.days)
+        table = connection.ops.quote_name(self.table)
+
+        created = 0
+        while start < until:
+            end = start + width
+            name = connection.ops.quote_name(f"{self.table}_p{start:%Y%m%d}")
+            try:
+                with transaction.atomic():
+                    cursor.execute(
+                        f"CREATE TABLE {name} PARTITION OF {table} "
+                        f"FOR VALUES FROM (%s) TO (%s)",
+                        [start, end],
+                    )
+                created += 1
+            except DatabaseError as e:
+                # Rows for the range already sit in the default partition
+                logger.warning(f"Could not create packet partition {name}: {e}")
+            start = end
+        return created
@@ -0,0 +1,307 @@
+import logging
+import multiprocessing
+import os
+import struct
+import time
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from .packet_decoder import decode_frame
+from .pcap_ring import PCAP_MAGIC
+from .rollups import BUCKET_SIZES, rebuild_rollups
+from .sampling import LoadShedder
+from .sniffer import PacketCaptureManager
+
+logger = logging.getLogger(__name__)
+
+# pcap files with nanosecond timestamps
+PCAP_NSEC_MAGIC = 0xA1B23C4D
+
+# Read buffer per replayed file
+READ_BUFFER_SIZE = 1024 * 1024
+
+
+class PcapReader:
+    """
+    Reader of classic pcap files, as written by tcpdump or ``PcapRing``.
+
+    Both byte orders and microsecond or nanosecond timestamps are handled;
+    pcapng files are not.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a pcap file and read its global header.
+
+        Args:
+            path (str): pcap file to read
+
+        Raises:
+            ValueError: If the file is not a pcap file
+        """
+        self.path = path
+        self._file: BinaryIO = open(path, "rb", buffering=READ_BUFFER_SIZE)
+        header = self._file.read(24)
+        if len(header) < 24:
+            self._file.close()
+            raise ValueError(f"{path} is too short to be a pcap file")
+
+        for byte_order in ("<", ">"):
+            (magic,) = struct.unpack_from(f"{byte_order}I", header)
+            if magic in (PCAP_MAGIC, PCAP_NSEC_MAGIC):
+                break
+        else:
+            self._file.close()
+            raise ValueError(f"{path} is not a pcap file (pcapng is not supported)")
+
+        self.fraction = 1e-9 if magic == PCAP_NSEC_MAGIC else 1e-6
+        self.snaplen, link_type = struct.unpack_from(f"{byte_order}II", header, 16)
+        # The upper bits of the link type field carry FCS flags
+        self.link_type = link_type & 0x0FFFFFFF
+        self._record_header = struct.Struct(f"{byte_order}IIII")
+
+    def __iter__(self) -> Iterator[Tuple[bytes, int, float]]:
+        """
+        Read the file's frames in order.
+
+        Returns:
+            Iterator of (frame, wire length, timestamp in seconds since the
+            epoch) tuples; a truncated last record ends the iteration
+        """
+        record_header = self._record_header
+        while True:
+            header = self._file.read(record_header.size)
+            if len(header) < record_header.size:
+                return
+            seconds, fraction, captured, wire_length = record_header.unpack(header)
+            frame = self._file.read(captured)
+            if len(frame) < captured:
+                logger.warning(f"Truncated last frame in {self.path}")
+                return
+            yield frame, wire_length, seconds + fraction * self.fraction
+
+    def close(self):
+        """Close the file."""
+        self._file.close()
+
+    def __enter__(self) -> "PcapReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PcapReplayManager(PacketCaptureManager):
+    """
+    Capture manager that reads pcap files instead of a network interface.
+
+    Frames go through the same decode, queue and writer pipeline as live
+    capture, so replays give reproducible load tests and backfill stored
+    traffic without root or a network. Packets keep the capture times
+    recorded in the files and are stored as seen on ``interface``.
+
+    Files are read one after the other by a single capture worker, or with
+    ``parallel`` by one worker per file. With a ``speed`` of 0 frames are
+    read as fast as the pipeline takes them; otherwise the gaps between
+    frames are replayed, divided by ``speed``. Full writer queues hold the
+    capture workers back unless ``drop_on_full`` is set, in which case
+    packets are dropped as in live capture.
+
+    The rollups the writers maintain only derive the current hour and day,
+    so once the files are replayed the rollups of the replayed time span are
+    rebuilt, letting old captures show up at every resolution.
+    """
+
+    uses_fanout = False
+
+    def __init__(
+        self,
+        files: List[str],
+        interface: str = "pcap",
+        parallel: bool = False,
+        speed: float = 0.0,
+        drop_on_full: bool = False,
+        **kwargs,
+    ):
+        """
+        Initialize the replay.
+
+        Args:
+            files (List[str]): pcap files, replayed in the given order
+            interface (str): Interface name the packets are stored under
+            parallel (bool): Replay every file in its own capture worker
+            speed (float): Multiple of the original timing to replay at, 0
+                for as fast as possible
+            drop_on_full (bool): Drop packets when a writer queue is full
+                instead of waiting for room
+            **kwargs: Further ``PacketCaptureManager`` options
+        """
+        if not files:
+            raise ValueError("No pcap files to replay")
+        if speed < 0:
+            raise ValueError(f"Replay speed must not be negative, got {speed}")
+        missing = [path for path in files if not os.path.isfile(path)]
+        if missing:
+            raise ValueError(f"pcap files not found: {', '.join(missing)}")
+
+        kwargs["workers_per_interface"] = len(files) if parallel else 1
+        super().__init__(interfaces=[interface], **kwargs)
+        self.files = list(files)
+        self.speed = speed
+        self.block_on_full = not drop_on_full
+        # First and last capture time replayed by each worker, 0 until set
+        self.replay_span = multiprocessing.RawArray("d", 2 * len(files))
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def _replay_file(self, path: str, interface: str, pace: List[float]):
+        """
+        Decode and enqueue the frames of one pcap file.
+
+        Frames read are counted as received in the worker's kernel counters,
+        and their capture times widen the worker's replayed span.
+
+        Args:
+            path (str): pcap file to replay
+            interface (str): Interface name the packets are stored under
+            pace (List[float]): Capture time of the worker's first frame and
+                the monotonic time it was replayed at, filled in on the first
+                frame when replaying at the original timing
+        """
+        slot = self._counter_slot
+        row = slot // 2
+        compact = self.packet_rings is not None
+        first = last = None
+        try:
+            with PcapReader(path) as reader:
+                logger.info(
+                    f"Replaying {path} (link type {reader.link_type}) on {interface}"
+                )
+                for frame, wire_length, timestamp in reader:
+                    if self.stop_event.is_set():
+                        return
+                    if self.speed:
+                        if not pace:
+                            pace.extend((timestamp, time.monotonic()))
+                        due = pace[1] + (timestamp - pace[0]) / self.speed
+                        delay = due - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                    self.kernel_counters[slot] += 1
+                    if first is None or timestamp < first:
+                        first = timestamp
+                    if last is None or timestamp > last:
+                        last = timestamp
+                    try:
+                        started = time.perf_counter_ns()
+                        packet_data = decode_frame(
+                            frame,
+                            interface,
+                            wire_length,
+                            timestamp,
+                            reader.link_type,
+                            compact,
+                        )
+                        self.decode_time.record(row, time.perf_counter_ns() - started)
+                        if packet_data is not None:
+                            self._enqueue_packet(packet_data, interface)
+                    except Exception as e:
+                        logger.error(f"Packet processing error in {path}: {e}")
+        finally:
+            if first is not None:
+                span = self.replay_span
+                if not span[slot] or first < span[slot]:
+                    span[slot] = first
+                span[slot + 1] = max(span[slot + 1], last)
+
+    def _packet_capture_worker(self, interface: str, worker: int = 0):
+        """
+        Replay this worker's share of the pcap files.
+
+        Args:
+            interface (str): Interface name the packets are stored under
+            worker (int): Index of this worker
+        """
+        self._counter_slot = 2 * worker
+        if self.sampling is not None:
+            self._load_shedder = LoadShedder(
+                self.num_writers, self.max_queue_size, mode=self.sampling
+            )
+
+        pace: List[float] = []
+        for path in self.files[worker :: self.workers_per_interface]:
+            try:
+                self._replay_file(path, interface, pace)
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not replay {path}: {e}")
+
+    def replay(self) -> Dict[str, Any]:
+        """
+        Replay the files to the end and wait for the writers to commit them.
+
+        Returns:
+            Replay statistics; see ``replay_statistics``
+        """
+        self.started = time.monotonic()
+        self.start_capture()
+        try:
+            for process in self.capture_processes:
+                process.join()
+        finally:
+            self.stop_capture()
+        self.finished = time.monotonic()
+        stats = self.replay_statistics()
+        stats["rollups"] = self.rebuild_replayed_rollups()
+        return stats
+
+    def rebuild_replayed_rollups(self) -> Tuple[int, int, int]:
+        """
+        Rebuild the rollups of the replayed time span.
+
+        With packets stored, every resolution is recomputed from them;
+        without, hour and day rollups are derived from the minute rollups
+        the writers kept, which they prune once older than two days.
+
+        Returns:
+            Numbers of minute, hour and day rows written
+        """
+        span = self.replay_span
+        firsts = [span[i] for i in range(0, len(span), 2) if span[i]]
+        if not firsts:
+            return 0, 0, 0
+        start = datetime.fromtimestamp(min(firsts), tz=timezone.utc)
+        end = datetime.fromtimestamp(max(span), tz=timezone.utc)
+        end += BUCKET_SIZES["minute"]
+
+        rows = rebuild_rollups(start, end, from_packets=self.storage != "flows")
+        logger.info(
+            f"Rebuilt rollups from {start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M} "
+            f"UTC: {rows[0]} minute, {rows[1]} hour and {rows[2]} day rows"
+        )
+        return rows
+
+    def replay_statistics(self) -> Dict[str, Any]:
+        """
+        Summarize the replay's throughput.
+
+        Returns:
+            Seconds taken, frames read from the files, packets decoded and
+            queued, dropped and shed by sampling, rows committed, and frames
+            read and rows committed per second
+        """
+        counters = self.get_capture_counters()
+        elapsed = 0.0
+        if self.started is not None:
+            elapsed = (self.finished or time.monotonic()) - self.started
+        committed = sum(self.writer_counters)
+        rate = 1 / elapsed if elapsed else 0.0
+        return {
+            "seconds": elapsed,
+            "frames": counters["kernel_received"],
+            "packets": counters["captured"],
+            "dropped": counters["dropped"],
+            "sampled_out": counters["sampled_out"],
+            "committed": committed,
+            "frames_per_second": counters["kernel_received"] * rate,
+            "committed_per_second": committed * rate,
+        }
@@ -0,0 +1,136 @@
+import logging
+import os
+import re
+import struct
+import time
+from typing import BinaryIO, Optional
+
+from .packet_decoder import LINKTYPE_ETHERNET, Frame
+
+logger = logging.getLogger(__name__)
+
+# Microsecond resolution pcap files, readable by every pcap tool
+PCAP_MAGIC = 0xA1B2C3D4
+PCAP_VERSION = (2, 4)
+
+DEFAULT_PCAP_FILE_SIZE = 64 * 1024 * 1024
+DEFAULT_PCAP_FILE_COUNT = 8
+
+# magic, version major, version minor, thiszone, sigfigs, snaplen, link type
+_GLOBAL_HEADER = struct.Struct("<IHHiIII")
+# seconds, microseconds, captured length, original length
+_RECORD_HEADER = struct.Struct("<IIII")
+
+# Write buffer per ring file; frames reach the disk a buffer at a time
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+class PcapRing:
+    """
+    Rotating set of pcap files holding the latest captured frames.
+
+    Frames are appended to the current file until it reaches ``file_size``
+    bytes, then a new file is started and the oldest files beyond
+    ``file_count`` are deleted, so disk use stays bounded while the most
+    recent traffic is kept for forensic replay. Each capture worker writes
+    its own ring, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        name: str,
+        link_type: int = LINKTYPE_ETHERNET,
+        snaplen: int = 65535,
+        file_size: int = DEFAULT_PCAP_FILE_SIZE,
+        file_count: int = DEFAULT_PCAP_FILE_COUNT,
+    ):
+        """
+        Initialize the ring; the first file is opened on the first frame.
+
+        Args:
+            directory (str): Directory the pcap files are written to
+            name (str): File name prefix, unique per capture worker
+            link_type (int): pcap link-layer header type of the frames
+            snaplen (int): Maximum bytes per frame recorded in the header
+            file_size (int): Bytes after which a new file is started
+            file_count (int): Files kept, including the one being written
+        """
+        self.directory = directory
+        self.name = re.sub(r"[^\w.-]", "_", name)
+        self.link_type = link_type
+        self.snaplen = snaplen
+        self.file_size = max(file_size, _GLOBAL_HEADER.size + 1)
+        self.file_count = max(1, file_count)
+        self.frames = 0
+        self._file: Optional[BinaryIO] = None
+        self._written = 0
+        self._sequence = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write(
+        self,
+        frame: Frame,
+        wire_length: Optional[int] = None,
+        timestamp: Optional[float] = None,
+    ):
+        """
+        Append a frame to the ring.
+
+        Args:
+            frame (Frame): Captured bytes, possibly truncated
+            wire_length (int): Original length of the frame on the wire
+            timestamp (float): Capture time in seconds since the epoch, now
+                if None
+        """
+        if self._file is None or self._written >= self.file_size:
+            self._rotate()
+        if timestamp is None:
+            timestamp = time.time()
+        seconds = int(timestamp)
+        captured = len(frame)
+        self._file.write(
+            _RECORD_HEADER.pack(
+                seconds,
+                int((timestamp - seconds) * 1000000),
+                captured,
+                wire_length or captured,
+            )
+        )
+        self._file.write(frame)
+        self._written += _RECORD_HEADER.size + captured
+        self.frames += 1
+
+    def close(self):
+        """Flush and close the current file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate(self):
+        """Start a new file and delete the oldest files beyond the limit."""
+        self.close()
+        self._sequence += 1
+        started = time.strftime("%Y%m%d%H%M%S", time.gmtime())
+        path = os.path.join(
+            self.directory, f"{self.name}-{started}-{self._sequence:06d}.pcap"
+        )
+        self._file = open(path, "wb", buffering=WRITE_BUFFER_SIZE)
+        self._file.write(
+            _GLOBAL_HEADER.pack(
+                PCAP_MAGIC, *PCAP_VERSION, 0, 0, self.snaplen, self.link_type
+            )
+        )
+        self._written = _GLOBAL_HEADER.size
+
+        # Names sort by start time, then sequence
+        files = sorted(
+            entry
+            for entry in os.listdir(self.directory)
+            if entry.startswith(f"{self.name}-") and entry.endswith(".pcap")
+        )
+        for entry in files[: -self.file_count]:
+            try:
+                os.remove(os.path.join(self.directory, entry))
+            except OSError as e:
+                logger.warning(f"Could not remove old pcap file {entry}: {e}")
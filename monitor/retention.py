@@ -0,0 +1,270 @@
+import logging
+import multiprocessing
+import time
+from datetime import timedelta
+from typing import Optional
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Flow, Packet
+from .partitions import PacketPartitions
+
+logger = logging.getLogger(__name__)
+
+# Set while a capture enforces retention, per row label
+RETENTION_CACHE_KEY = "netcreep:retention_enforced"
+RETENTION_CACHE_TIMEOUT = 60
+
+
+def retention_enforced_by_capture(label: str = "packet") -> bool:
+    """
+    Whether a running capture enforces the retention of a table.
+
+    Args:
+        label (str): Row label of the retention, "packet" or "flow"
+
+    Returns:
+        True if a capture writer ran a retention check recently
+    """
+    try:
+        return bool(cache.get(f"{RETENTION_CACHE_KEY}:{label}"))
+    except Exception as e:
+        logger.debug(f"Could not read {label} retention state: {e}")
+        return False
+
+
+class PacketRetention:
+    """
+    Amortized retention for the packet table.
+
+    Keeps an in-memory estimate of the number of stored packets so that the
+    storage cap costs a counter increment per insert. Eviction runs on a
+    schedule and removes the oldest rows in large primary-key ranges instead
+    of counting and sorting the table on every insert.
+
+    The counter lives in shared memory: when several writer processes insert
+    packets, each records its inserts and a single process enforces limits.
+
+    When the table is partitioned by time, expired partitions are dropped
+    whole and only the rows of the partition spanning the cutoff are
+    deleted.
+
+    Scheduled checks through ``maybe_enforce`` are announced in the cache,
+    so the cleanup job leaves the table to a running capture.
+    """
+
+    model = Packet
+    # Field the age limit applies to
+    time_field = "timestamp"
+    # Row name used in log messages
+    label = "packet"
+
+    def __init__(
+        self,
+        max_packets: Optional[int] = None,
+        max_age_hours: Optional[float] = None,
+        eviction_chunk: int = 10000,
+        check_interval: float = 5.0,
+        resync_interval: float = 600.0,
+    ):
+        """
+        Initialize packet retention.
+
+        Args:
+            max_packets (int): Maximum number of packets to keep, None for no cap
+            max_age_hours (float): Maximum packet age in hours, None to keep
+                packets regardless of age
+            eviction_chunk (int): Maximum number of rows removed per DELETE
+            check_interval (float): Minimum seconds between eviction passes
+            resync_interval (float): Seconds between exact re-counts of the
+                table, correcting drift from other writers
+        """
+        self.max_packets = max_packets
+        self.max_age_hours = max_age_hours
+        self.eviction_chunk = max(1, eviction_chunk)
+        self.check_interval = check_interval
+        self.resync_interval = resync_interval
+
+        # -1 until the table has been counted
+        self._packet_count = multiprocessing.Value("q", -1)
+        self._last_check = 0.0
+        self._last_resync = 0.0
+        self._partitions = PacketPartitions()
+        # Checked on the first age eviction
+        self._partitioned: Optional[bool] = None
+
+    def sync(self) -> int:
+        """
+        Re-count the packet table and reset the in-process counter.
+
+        Returns:
+            Current number of stored packets
+        """
+        packet_count = self.model.objects.count()
+        self._packet_count.value = packet_count
+        self._last_resync = time.monotonic()
+        return packet_count
+
+    def record_inserted(self, count: int):
+        """
+        Account for newly inserted packets.
+
+        Args:
+            count (int): Number of rows just written
+        """
+        with self._packet_count.get_lock():
+            if self._packet_count.value >= 0:
+                self._packet_count.value += count
+
+    def maybe_enforce(self) -> int:
+        """
+        Run an eviction pass if one is due.
+
+        Returns:
+            Number of packets deleted
+        """
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return 0
+        self._last_check = now
+        try:
+            cache.set(
+                f"{RETENTION_CACHE_KEY}:{self.label}", True, RETENTION_CACHE_TIMEOUT
+            )
+        except Exception as e:
+            logger.debug(f"Could not publish {self.label} retention state: {e}")
+
+        if (
+            self._packet_count.value < 0
+            or now - self._last_resync >= self.resync_interval
+        ):
+            self.sync()
+
+        over_capacity = (
+            self.max_packets is not None and self._packet_count.value > self.max_packets
+        )
+        if not over_capacity and not self.max_age_hours:
+            return 0
+        return self.enforce()
+
+    def enforce(self) -> int:
+        """
+        Apply the age and count limits immediately.
+
+        Returns:
+            Number of packets deleted
+        """
+        if self._packet_count.value < 0:
+            self.sync()
+
+        deleted = 0
+        if self.max_age_hours:
+            deleted += self._evict_expired()
+        if self.max_packets is not None:
+            deleted += self._evict_over_capacity()
+
+        if deleted:
+            logger.info(
+                f"{self.label.capitalize()} retention deleted {deleted} "
+                f"{self.label}s"
+            )
+        return deleted
+
+    def _delete_id_range(self, first_id: int, last_id: int, **filters) -> int:
+        """
+        Delete packets whose primary key falls within a range, in chunks.
+
+        Args:
+            first_id (int): Lowest primary key to delete
+            last_id (int): Highest primary key to delete
+
+        Returns:
+            Number of packets deleted
+        """
+        deleted = 0
+        lower = first_id
+        while lower <= last_id:
+            upper = min(lower + self.eviction_chunk - 1, last_id)
+            count, _ = self.model.objects.filter(
+                id__gte=lower, id__lte=upper, **filters
+            ).delete()
+            deleted += count
+            lower = upper + 1
+
+        with self._packet_count.get_lock():
+            self._packet_count.value = max(0, self._packet_count.value - deleted)
+        return deleted
+
+    def _evict_over_capacity(self) -> int:
+        """
+        Delete the oldest packets beyond ``max_packets``.
+
+        Returns:
+            Number of packets deleted
+        """
+        excess = self._packet_count.value - self.max_packets
+        if excess <= 0:
+            return 0
+
+        ids = self.model.objects.order_by("id").values_list("id", flat=True)
+        first_id = ids.first()
+        last_id = ids[excess - 1 : excess].first()
+        if first_id is None or last_id is None:
+            return 0
+        return self._delete_id_range(first_id, last_id)
+
+    def _evict_expired(self) -> int:
+        """
+        Delete packets older than ``max_age_hours``.
+
+        Returns:
+            Number of packets deleted
+        """
+        cutoff = timezone.now() - timedelta(hours=self.max_age_hours)
+        dropped = 0
+        if self._partitioned is None:
+            self._partitioned = self._partitions.is_partitioned()
+        if self._partitioned:
+            dropped = self._partitions.drop_before(cutoff)
+            with self._packet_count.get_lock():
+                self._packet_count.value = max(0, self._packet_count.value - dropped)
+
+        expired_filter = {f"{self.time_field}__lt": cutoff}
+        expired = self.model.objects.filter(**expired_filter).order_by("id")
+        first_id = expired.values_list("id", flat=True).first()
+        if first_id is None:
+            return dropped
+        last_id = expired.values_list("id", flat=True).last()
+        return dropped + self._delete_id_range(first_id, last_id, **expired_filter)
+
+
+class FlowRetention(PacketRetention):
+    """
+    Amortized retention for the flow table.
+
+    Works like ``PacketRetention``, ageing flows out by when they were last
+    seen. The flow table is never partitioned.
+    """
+
+    model = Flow
+    time_field = "last_seen"
+    label = "flow"
+
+    def __init__(
+        self,
+        max_flows: Optional[int] = None,
+        max_age_hours: Optional[float] = None,
+        **kwargs,
+    ):
+        """
+        Initialize flow retention.
+
+        Args:
+            max_flows (int): Maximum number of flows to keep, None for no cap
+            max_age_hours (float): Maximum hours since a flow was last seen,
+                None to keep flows regardless of age
+            **kwargs: Further ``PacketRetention`` options
+        """
+        super().__init__(max_packets=max_flows, max_age_hours=max_age_hours, **kwargs)
+        self._partitioned = False
@@ -0,0 +1,375 @@
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .models import Packet, TrafficRollup
+
+logger = logging.getLogger(__name__)
+
+# Packet fields rolled up, by rollup dimension
+DIMENSION_FIELDS = {
+    "protocol": "protocol",
+    "source_ip": "source_ip",
+    "destination_port": "destination_port",
+}
+
+BUCKET_SIZES = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# How long each resolution is kept; day rollups are kept indefinitely
+ROLLUP_RETENTION = {"minute": timedelta(days=2), "hour": timedelta(days=90)}
+
+# Longest query window answered from each resolution
+QUERY_WINDOWS = {"minute": timedelta(hours=2), "hour": timedelta(days=2)}
+
+# Rows per INSERT statement when upserting minute rollups
+UPSERT_CHUNK = 500
+
+RollupKey = Tuple[datetime, str, str]
+
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    """
+    Start of the UTC bucket holding a timestamp.
+
+    Args:
+        timestamp (datetime): Aware timestamp
+        resolution (str): One of ``BUCKET_SIZES``
+
+    Returns:
+        Aware UTC bucket start
+    """
+    timestamp = timestamp.astimezone(dt_timezone.utc)
+    if resolution == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if resolution == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def upsert_rollups(resolution: str, totals: Dict[RollupKey, List[int]]) -> int:
+    """
+    Add packet and byte totals to rollup rows, creating missing rows.
+
+    Totals are added in the database with ``INSERT ... ON CONFLICT DO
+    UPDATE`` (PostgreSQL and SQLite), so concurrent writers can update the
+    same bucket without reading it first.
+
+    Args:
+        resolution (str): Resolution of the rows
+        totals (Dict): [packets, bytes] by (bucket start, dimension, key)
+
+    Returns:
+        Number of rows inserted or updated
+    """
+    if not totals:
+        return 0
+
+    quote = connection.ops.quote_name
+    table = quote(TrafficRollup._meta.db_table)
+    columns = ["resolution", "bucket_start", "dimension", "key", "packets", "bytes"]
+    conflict = ["resolution", "dimension", "bucket_start", "key"]
+    bucket_field = TrafficRollup._meta.get_field("bucket_start")
+
+    rows = [
+        (
+            resolution,
+            bucket_field.get_db_prep_value(start, connection),
+            dimension,
+            key,
+            packets,
+            byte_count,
+        )
+        for (start, dimension, key), (packets, byte_count) in totals.items()
+    ]
+    with connection.cursor() as cursor:
+        for offset in range(0, len(rows), UPSERT_CHUNK):
+            chunk = rows[offset : offset + UPSERT_CHUNK]
+            placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(chunk))
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(quote(c) for c in columns)}) "
+                f"VALUES {placeholders} "
+                f"ON CONFLICT ({', '.join(quote(c) for c in conflict)}) DO UPDATE SET "
+                f"{quote('packets')} = {table}.{quote('packets')} "
+                f"+ EXCLUDED.{quote('packets')}, "
+                f"{quote('bytes')} = {table}.{quote('bytes')} "
+                f"+ EXCLUDED.{quote('bytes')}",
+                [value for row in chunk for value in row],
+            )
+    return len(rows)
+
+
+def derive_rollups(source: str, target: str, start: datetime, end: datetime) -> int:
+    """
+    Recompute coarser rollups from finer ones over a time range.
+
+    Target buckets starting within the range are replaced, so deriving the
+    same range again is harmless.
+
+    Args:
+        source (str): Resolution summed, e.g. "minute"
+        target (str): Resolution written, e.g. "hour"
+        start (datetime): Start of the range, aligned to a target bucket
+        end (datetime): End of the range (exclusive)
+
+    Returns:
+        Number of target rows written
+    """
+    totals = (
+        TrafficRollup.objects.filter(
+            resolution=source, bucket_start__gte=start, bucket_start__lt=end
+        )
+        .annotate(bucket=Trunc("bucket_start", target, tzinfo=dt_timezone.utc))
+        .values("bucket", "dimension", "key")
+        .annotate(total_packets=Sum("packets"), total_bytes=Sum("bytes"))
+    )
+    rollups = [
+        TrafficRollup(
+            resolution=target,
+            bucket_start=row["bucket"],
+            dimension=row["dimension"],
+            key=row["key"],
+            packets=row["total_packets"],
+            bytes=row["total_bytes"],
+        )
+        for row in totals
+    ]
+    with transaction.atomic():
+        TrafficRollup.objects.filter(
+            resolution=target, bucket_start__gte=start, bucket_start__lt=end
+        ).delete()
+        TrafficRollup.objects.bulk_create(rollups, batch_size=UPSERT_CHUNK)
+    return len(rollups)
+
+
+def rollup_totals(
+    dimension: str, since: Optional[datetime] = None, limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Total packets and bytes per key of a dimension.
+
+    The finest resolution still kept for the whole window is used: minute
+    rollups for the last two hours, hour rollups for the last two days and
+    day rollups beyond, so the window is rounded down to its bucket.
+
+    Args:
+        dimension (str): One of ``DIMENSION_FIELDS``
+        since (datetime): Start of the window, None for all time
+        limit (int): Maximum number of keys, busiest first
+
+    Returns:
+        List of dictionaries with ``key``, ``packets`` and ``bytes``
+    """
+    resolution = "day"
+    if since is not None:
+        window = timezone.now() - since
+        for candidate in ("minute", "hour"):
+            if window <= QUERY_WINDOWS[candidate]:
+                resolution = candidate
+                break
+
+    rollups = TrafficRollup.objects.filter(resolution=resolution, dimension=dimension)
+    if since is not None:
+        rollups = rollups.filter(bucket_start__gte=bucket_start(since, resolution))
+    totals = (
+        rollups.values("key")
+        .annotate(total_packets=Sum("packets"), total_bytes=Sum("bytes"))
+        .order_by("-total_packets")
+    )
+    if limit is not None:
+        totals = totals[:limit]
+    return [
+        {
+            "key": row["key"],
+            "packets": row["total_packets"],
+            "bytes": row["total_bytes"],
+        }
+        for row in totals
+    ]
+
+
+def rebuild_minute_rollups(start: datetime, end: datetime) -> int:
+    """
+    Recompute minute rollups from the stored packets over a time range.
+
+    Args:
+        start (datetime): Start of the range, aligned to a minute
+        end (datetime): End of the range (exclusive)
+
+    Returns:
+        Number of minute rows written
+    """
+    packets = Packet.objects.filter(timestamp__gte=start, timestamp__lt=end)
+    rollups = []
+    for dimension, field in DIMENSION_FIELDS.items():
+        totals = (
+            packets.exclude(**{f"{field}__isnull": True})
+            .annotate(bucket=Trunc("timestamp", "minute", tzinfo=dt_timezone.utc))
+            .values("bucket", field)
+            .annotate(
+                total_packets=Sum("sample_rate"),
+                total_bytes=Sum(F("packet_size") * F("sample_rate")),
+            )
+        )
+        for row in totals:
+            rollups.append(
+                TrafficRollup(
+                    resolution="minute",
+                    bucket_start=row["bucket"],
+                    dimension=dimension,
+                    key=str(row[field]),
+                    packets=row["total_packets"],
+                    bytes=row["total_bytes"],
+                )
+            )
+
+    with transaction.atomic():
+        TrafficRollup.objects.filter(
+            resolution="minute", bucket_start__gte=start, bucket_start__lt=end
+        ).delete()
+        TrafficRollup.objects.bulk_create(rollups, batch_size=UPSERT_CHUNK)
+    return len(rollups)
+
+
+def _bucket_end(timestamp: datetime, resolution: str) -> datetime:
+    """End of the last bucket starting before an exclusive range end."""
+    return (
+        bucket_start(timestamp - timedelta(microseconds=1), resolution)
+        + BUCKET_SIZES[resolution]
+    )
+
+
+def rebuild_rollups(
+    start: datetime, end: datetime, from_packets: bool = True
+) -> Tuple[int, int, int]:
+    """
+    Rebuild the rollups of a time range.
+
+    Minute rollups are recomputed from the stored packets, then the hour and
+    day rollups of every hour and day the range touches from the finer ones.
+
+    Args:
+        start (datetime): Start of the range, widened to a whole hour
+        end (datetime): End of the range (exclusive)
+        from_packets (bool): Recompute the minute rollups from the packets;
+            when no packets are stored the existing minute rollups are kept
+
+    Returns:
+        Numbers of minute, hour and day rows written
+    """
+    start = bucket_start(start, "hour")
+    minute_rows = rebuild_minute_rollups(start, end) if from_packets else 0
+    hour_rows = derive_rollups("minute", "hour", start, _bucket_end(end, "hour"))
+    day_rows = derive_rollups(
+        "hour", "day", bucket_start(start, "day"), _bucket_end(end, "day")
+    )
+    return minute_rows, hour_rows, day_rows
+
+
+class TrafficRollups:
+    """
+    Per-minute traffic rollups maintained from the ingest path.
+
+    Each writer adds its packets to in-memory minute totals and periodically
+    adds them to the database; one writer derives hour and day rollups from
+    the minute rollups and prunes expired buckets.
+    """
+
+    def __init__(self, derive_interval: float = 60.0):
+        """
+        Initialize the rollups.
+
+        Args:
+            derive_interval (float): Minimum seconds between derivation passes
+        """
+        self.derive_interval = derive_interval
+        self._totals: Dict[RollupKey, List[int]] = defaultdict(lambda: [0, 0])
+        self._last_derive = 0.0
+
+    def __len__(self) -> int:
+        """Number of minute rollup rows waiting to be written."""
+        return len(self._totals)
+
+    def add(self, packets: Iterable[Dict[str, Any]]):
+        """
+        Add packets to the minute totals.
+
+        Args:
+            packets (Iterable[Dict]): Decoded packet data
+        """
+        totals = self._totals
+        last_timestamp = None
+        for packet_data in packets:
+            timestamp = packet_data["timestamp"]
+            if timestamp is not last_timestamp:
+                minute = bucket_start(timestamp, "minute")
+                last_timestamp = timestamp
+            sample_rate = packet_data.get("sample_rate", 1)
+            size = packet_data["packet_size"] * sample_rate
+            for dimension, field in DIMENSION_FIELDS.items():
+                value = packet_data[field]
+                if value is None:
+                    continue
+                total = totals[(minute, dimension, str(value))]
+                total[0] += sample_rate
+                total[1] += size
+
+    def flush(self) -> int:
+        """
+        Add the pending minute totals to the database.
+
+        Returns:
+            Number of rows inserted or updated
+        """
+        totals, self._totals = self._totals, defaultdict(lambda: [0, 0])
+        return upsert_rollups("minute", totals)
+
+    def maybe_derive(self) -> int:
+        """
+        Run a derivation pass if one is due.
+
+        Returns:
+            Number of rows written
+        """
+        now = time.monotonic()
+        if now - self._last_derive < self.derive_interval:
+            return 0
+        self._last_derive = now
+        return self.derive()
+
+    def derive(self, now: Optional[datetime] = None) -> int:
+        """
+        Derive the current and previous hour and day rollups and prune
+        expired buckets.
+
+        Args:
+            now (datetime): Current time, defaults to now
+
+        Returns:
+            Number of rows written
+        """
+        now = now or timezone.now()
+        end = now + BUCKET_SIZES["minute"]
+        written = derive_rollups(
+            "minute", "hour", bucket_start(now, "hour") - BUCKET_SIZES["hour"], end
+        )
+        written += derive_rollups(
+            "hour", "day", bucket_start(now, "day") - BUCKET_SIZES["day"], end
+        )
+
+        for resolution, retention in ROLLUP_RETENTION.items():
+            TrafficRollup.objects.filter(
+                resolution=resolution, bucket_start__lt=now - retention
+            ).delete()
+        return written
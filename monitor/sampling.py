@@ -0,0 +1,127 @@
+import zlib
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# "count" keeps every N-th packet of a queue; "flow" keeps whole flows whose
+# hash falls in a 1-in-N slice
+SAMPLING_MODES = ("count", "flow")
+
+# Queue fill fractions; each one crossed doubles the sampling rate
+DEFAULT_SAMPLING_THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.9, 0.95)
+
+# Packets handed to a queue between two depth checks
+DEPTH_CHECK_INTERVAL = 256
+
+
+def flow_hash(packet_data: Dict[str, Any]) -> int:
+    """
+    Hash a packet's flow so that both directions hash alike.
+
+    Args:
+        packet_data (Dict): Decoded packet data
+
+    Returns:
+        Unsigned 32-bit hash of the protocol and the two endpoints
+    """
+    endpoints = sorted(
+        (
+            f"{packet_data['source_ip']}:{packet_data['source_port']}",
+            f"{packet_data['destination_ip']}:{packet_data['destination_port']}",
+        )
+    )
+    flow = f"{endpoints[0]}|{endpoints[1]}|{packet_data['protocol']}"
+    return zlib.crc32(flow.encode())
+
+
+class LoadShedder:
+    """
+    Queue-depth driven packet sampling for one capture worker.
+
+    Every packet is kept while a queue is less than half full. Each
+    threshold the queue fill crosses doubles the sampling rate N, and packets
+    are then kept 1-in-N, either deterministically by count or by flow hash.
+    Rates are powers of two, so the flows kept at rate 2N are a subset of
+    those kept at rate N and sampled flows stay complete as load rises.
+
+    The queue depth is only read every ``DEPTH_CHECK_INTERVAL`` packets, or
+    more often for small queues.
+    """
+
+    def __init__(
+        self,
+        queues: int,
+        capacity: int,
+        mode: str = "count",
+        thresholds: Sequence[float] = DEFAULT_SAMPLING_THRESHOLDS,
+    ):
+        """
+        Initialize the load shedder.
+
+        Args:
+            queues (int): Number of queues packets are handed to
+            capacity (int): Capacity of each queue
+            mode (str): One of ``SAMPLING_MODES``
+            thresholds (Sequence[float]): Ascending queue fill fractions at
+                which the sampling rate doubles
+        """
+        if mode not in SAMPLING_MODES:
+            raise ValueError(
+                f"Unknown sampling mode {mode!r}, expected one of {SAMPLING_MODES}"
+            )
+        self.mode = mode
+        self.capacity = capacity
+        self.thresholds = sorted(thresholds)
+        # Check small queues often enough to react before they fill up
+        self.check_interval = max(1, min(DEPTH_CHECK_INTERVAL, capacity // 16))
+        self.rates = [1] * queues
+        self._counters = [0] * queues
+        self._until_check = [0] * queues
+
+    def rate_for_depth(self, depth: int) -> int:
+        """
+        Sampling rate for a queue depth.
+
+        Args:
+            depth (int): Packets waiting in the queue
+
+        Returns:
+            Sampling rate N, keeping 1 packet in N
+        """
+        fill = depth / self.capacity
+        crossed = sum(1 for threshold in self.thresholds if fill >= threshold)
+        return 1 << crossed
+
+    def sample(
+        self,
+        queue_index: int,
+        packet_data: Dict[str, Any],
+        get_depth: Callable[[int], Optional[int]],
+    ) -> int:
+        """
+        Decide whether a packet is kept.
+
+        Args:
+            queue_index (int): Queue the packet is handed to
+            packet_data (Dict): Decoded packet data
+            get_depth (Callable): Returns the depth of a queue, or None where
+                it cannot be measured
+
+        Returns:
+            Sampling rate applied to the kept packet, 0 if it is shed
+        """
+        if self._until_check[queue_index] <= 0:
+            self._until_check[queue_index] = self.check_interval
+            depth = get_depth(queue_index)
+            if depth is not None:
+                self.rates[queue_index] = self.rate_for_depth(depth)
+        self._until_check[queue_index] -= 1
+
+        rate = self.rates[queue_index]
+        if rate == 1:
+            return 1
+        if self.mode == "flow":
+            # Upper bits, as the lower ones may already pick the writer
+            keep = (flow_hash(packet_data) >> 16) % rate == 0
+        else:
+            self._counters[queue_index] += 1
+            keep = self._counters[queue_index] % rate == 0
+        return rate if keep else 0
@@ -0,0 +1,216 @@
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .sketches import HyperLogLog
+
+# TCP flags telling a connection attempt from the rest of a connection
+TCP_SYN = 0x02
+TCP_ACK = 0x10
+
+# Ports below this are service ports; traffic from one to a higher port is
+# a reply and says nothing about what its destination is probing
+SERVICE_PORT_LIMIT = 1024
+
+SCAN_KINDS = ("vertical", "horizontal", "block")
+
+
+def is_probe(packet_data: Dict[str, Any]) -> bool:
+    """
+    Check whether a packet may be probing its destination port.
+
+    TCP packets count only when they open a connection (SYN without ACK).
+    Other packets count unless they are sent from a service port to a
+    higher one, which is how replies from servers look.
+
+    Args:
+        packet_data (Dict): Decoded packet data
+
+    Returns:
+        True if the packet should count towards scan detection
+    """
+    destination_port = packet_data["destination_port"]
+    if destination_port is None:
+        return False
+    if packet_data["protocol"] == "TCP" and "tcp_flags" in packet_data:
+        return packet_data["tcp_flags"] & (TCP_SYN | TCP_ACK) == TCP_SYN
+    source_port = packet_data["source_port"]
+    return not (
+        source_port is not None and source_port < SERVICE_PORT_LIMIT <= destination_port
+    )
+
+
+def classify_scan(
+    ports: int, hosts: int, port_threshold: int, host_threshold: int
+) -> Optional[str]:
+    """
+    Classify a source by how many destination ports and hosts it probed.
+
+    A vertical scan probes many ports on few hosts, a horizontal scan a few
+    ports across many hosts, and a block scan many of both.
+
+    Args:
+        ports (int): Distinct destination ports probed
+        hosts (int): Distinct destination hosts probed
+        port_threshold (int): Distinct ports making a vertical scan
+        host_threshold (int): Distinct hosts making a horizontal scan
+
+    Returns:
+        One of ``SCAN_KINDS``, or None for no scan
+    """
+    if ports >= port_threshold:
+        return "block" if hosts >= host_threshold else "vertical"
+    if hosts >= host_threshold:
+        return "horizontal"
+    return None
+
+
+def describe_scan(kind: str, source_ip: str, ports: int, hosts: int) -> str:
+    """
+    Describe a detected scan.
+
+    Args:
+        kind (str): One of ``SCAN_KINDS``
+        source_ip (str): Scanning source
+        ports (int): Distinct destination ports probed
+        hosts (int): Distinct destination hosts probed
+
+    Returns:
+        Human readable description
+    """
+    return (
+        f"{kind.capitalize()} port scan from {source_ip}: "
+        f"{ports} ports on {hosts} hosts"
+    )
+
+
+class _SourcePane:
+    """Distinct ports and hosts one source probed during one pane."""
+
+    __slots__ = ("index", "ports", "hosts")
+
+    def __init__(self, index: int, precision: int):
+        self.index = index
+        self.ports = HyperLogLog(precision)
+        self.hosts = HyperLogLog(precision)
+
+
+class ScanDetector:
+    """
+    Detect port scans on the packet stream with sliding windows.
+
+    For every source, the distinct destination ports and hosts it probes
+    are tracked in HyperLogLog sketches, one pair per pane of the window.
+    The window's counts are the merged sketches of its panes, so expired
+    panes are simply dropped. Memory is bounded by ``max_sources``, with
+    the least recently seen sources forgotten first, and by the sketch
+    precision; sources probing only a few ports keep small exact sets.
+    """
+
+    def __init__(
+        self,
+        window: float = 60.0,
+        panes: int = 6,
+        port_threshold: int = 100,
+        host_threshold: int = 50,
+        precision: int = 10,
+        max_sources: int = 10000,
+    ):
+        """
+        Initialize the scan detector.
+
+        Args:
+            window (float): Seconds of traffic the counts cover
+            panes (int): Intervals the window slides by
+            port_threshold (int): Distinct ports in the window making a
+                vertical scan
+            host_threshold (int): Distinct hosts in the window making a
+                horizontal scan
+            precision (int): HyperLogLog precision
+            max_sources (int): Sources tracked at once
+        """
+        self.pane_length = window / panes
+        self.panes = panes
+        self.port_threshold = port_threshold
+        self.host_threshold = host_threshold
+        self.precision = precision
+        self.max_sources = max_sources
+        self._sources: "OrderedDict[Tuple[str, str], Deque[_SourcePane]]" = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        """Number of sources tracked."""
+        return len(self._sources)
+
+    def update(
+        self, packets: Iterable[Dict[str, Any]], now: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Add packets to the sketches and check the sources they came from.
+
+        Args:
+            packets (Iterable[Dict]): Decoded packet data
+            now (float): Current time in seconds
+
+        Returns:
+            Scans found, as dictionaries with ``interface``, ``source_ip``,
+            ``kind``, ``ports`` and ``hosts``
+        """
+        pane_index = int(now // self.pane_length)
+        oldest = pane_index - self.panes + 1
+        sources = self._sources
+        touched = set()
+
+        for packet_data in packets:
+            if not is_probe(packet_data):
+                continue
+            key = (packet_data["interface"], packet_data["source_ip"])
+            panes = sources.get(key)
+            if panes is None:
+                panes = sources[key] = deque()
+                if len(sources) > self.max_sources:
+                    sources.popitem(last=False)
+            else:
+                sources.move_to_end(key)
+            if not panes or panes[-1].index != pane_index:
+                panes.append(_SourcePane(pane_index, self.precision))
+                while panes[0].index < oldest:
+                    panes.popleft()
+            pane = panes[-1]
+            pane.ports.add(str(packet_data["destination_port"]))
+            pane.hosts.add(packet_data["destination_ip"])
+            touched.add(key)
+
+        # Forget sources with nothing left in the window, oldest first
+        while sources:
+            key, panes = next(iter(sources.items()))
+            if panes[-1].index >= oldest:
+                break
+            del sources[key]
+
+        scans = []
+        for key in touched:
+            panes = sources.get(key)
+            if panes is None:
+                continue
+            ports = HyperLogLog(self.precision)
+            hosts = HyperLogLog(self.precision)
+            for pane in panes:
+                if pane.index >= oldest:
+                    ports.merge(pane.ports)
+                    hosts.merge(pane.hosts)
+            port_count, host_count = ports.count(), hosts.count()
+            kind = classify_scan(
+                port_count, host_count, self.port_threshold, self.host_threshold
+            )
+            if kind is not None:
+                scans.append(
+                    {
+                        "interface": key[0],
+                        "source_ip": key[1],
+                        "kind": kind,
+                        "ports": port_count,
+                        "hosts": host_count,
+                    }
+                )
+        return scans
@@ -0,0 +1,243 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from django.core.cache import cache
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_CACHE_KEY = "netcreep:scheduler_metrics"
+SCHEDULER_CACHE_TIMEOUT = 120
+
+
+class Job:
+    """A function run at an interval, with its timing metrics."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        interval: float,
+        jitter: float = 0.1,
+    ):
+        """
+        Initialize the job.
+
+        Args:
+            name (str): Unique job name
+            func (Callable): Function run without arguments
+            interval (float): Seconds between runs
+            jitter (float): Fraction of the interval each run is randomly
+                moved by, so jobs do not keep starting together
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.running = False
+        self.next_run = 0.0
+
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_started: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.last_error: Optional[str] = None
+
+    def schedule(self, now: float, first: bool = False):
+        """
+        Set the time of the next run.
+
+        Args:
+            now (float): Current monotonic time
+            first (bool): Spread the first run over the jitter range only,
+                instead of waiting a whole interval
+        """
+        spread = self.interval * self.jitter
+        if first:
+            self.next_run = now + random.uniform(0, spread)
+        else:
+            self.next_run = now + self.interval + random.uniform(-spread, spread)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Timing metrics of the job.
+
+        Returns:
+            Dictionary of run counts and durations in seconds
+        """
+        return {
+            "interval": self.interval,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_started": self.last_started,
+            "last_duration": self.last_duration,
+            "mean_duration": self.total_duration / self.runs if self.runs else None,
+            "max_duration": self.max_duration,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    """
+    Run periodic jobs on a thread pool.
+
+    A job due while its previous run is still going is skipped rather than
+    started twice, and is counted as skipped in its metrics. Each run gets
+    fresh database connections, as a run may happen on any pool thread.
+    Metrics of every job are published to the cache after each run.
+    """
+
+    def __init__(self, max_workers: int = 4, tick: float = 0.5):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_workers (int): Jobs run at the same time
+            tick (float): Seconds between checks for due jobs
+        """
+        self.max_workers = max_workers
+        self.tick = tick
+        self.jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        interval: float,
+        jitter: float = 0.1,
+    ) -> Job:
+        """
+        Register a job.
+
+        Args:
+            name (str): Unique job name
+            func (Callable): Function run without arguments
+            interval (float): Seconds between runs
+            jitter (float): Fraction of the interval runs are moved by
+
+        Returns:
+            The registered job
+        """
+        if name in self.jobs:
+            raise ValueError(f"Job {name!r} is already registered")
+        job = self.jobs[name] = Job(name, func, interval, jitter)
+        return job
+
+    def run(self, duration: Optional[float] = None):
+        """
+        Run jobs as they become due until stopped.
+
+        Args:
+            duration (float): Seconds to run for, None until ``stop``
+        """
+        self._stop_event.clear()
+        started = time.monotonic()
+        for job in self.jobs.values():
+            job.schedule(started, first=True)
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="netcreep-job"
+        ) as executor:
+            while not self._stop_event.is_set():
+                now = time.monotonic()
+                if duration is not None and now - started >= duration:
+                    break
+                for job in self.jobs.values():
+                    if now < job.next_run:
+                        continue
+                    job.schedule(now)
+                    with self._lock:
+                        if job.running:
+                            job.skipped += 1
+                            logger.warning(
+                                f"Job {job.name} is still running, skipping a run"
+                            )
+                            continue
+                        job.running = True
+                    executor.submit(self._run_job, job)
+                self._stop_event.wait(self.tick)
+
+    def stop(self):
+        """Stop scheduling; running jobs are allowed to finish."""
+        self._stop_event.set()
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Timing metrics of every job.
+
+        Returns:
+            Metrics by job name
+        """
+        with self._lock:
+            return {name: job.metrics() for name, job in self.jobs.items()}
+
+    def _run_job(self, job: Job):
+        """
+        Run a job once and record its timing.
+
+        Args:
+            job (Job): Job to run
+        """
+        close_old_connections()
+        job.last_started = time.time()
+        started = time.perf_counter()
+        try:
+            job.func()
+            job.last_error = None
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error(f"Job {job.name} failed: {e}", exc_info=True)
+        finally:
+            elapsed = time.perf_counter() - started
+            close_old_connections()
+            with self._lock:
+                job.running = False
+                job.runs += 1
+                job.last_duration = elapsed
+                job.total_duration += elapsed
+                job.max_duration = max(job.max_duration, elapsed)
+            if elapsed > job.interval:
+                logger.warning(
+                    f"Job {job.name} took {elapsed:.1f}s, longer than its "
+                    f"{job.interval:.0f}s interval"
+                )
+            publish_scheduler_metrics(self.get_metrics())
+
+
+def publish_scheduler_metrics(metrics: Dict[str, Dict[str, Any]]):
+    """
+    Share scheduler metrics with other processes through the cache.
+
+    Args:
+        metrics (Dict): Metrics from ``Scheduler.get_metrics``
+    """
+    try:
+        cache.set(SCHEDULER_CACHE_KEY, metrics, SCHEDULER_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.debug(f"Could not publish scheduler metrics: {e}")
+
+
+def get_scheduler_metrics() -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Get the latest metrics published by a running scheduler.
+
+    Returns:
+        Metrics by job name, None if no scheduler published any recently
+    """
+    try:
+        return cache.get(SCHEDULER_CACHE_KEY)
+    except Exception as e:
+        logger.debug(f"Could not read scheduler metrics: {e}")
+        return None
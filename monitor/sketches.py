@@ -0,0 +1,223 @@
+import hashlib
+import heapq
+import math
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+def hash64(value: str) -> int:
+    """
+    Hash a value to 64 bits for use in sketches.
+
+    Args:
+        value (str): Value to hash
+
+    Returns:
+        Unsigned 64-bit hash
+    """
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+    )
+
+
+class HyperLogLog:
+    """
+    Estimate the number of distinct values added, in bounded memory.
+
+    Small sets are kept as exact hashes; once they grow past a quarter of the
+    register count they are converted to ``2 ** precision`` one-byte
+    registers, giving a standard error of about ``1.04 / sqrt(2 ** precision)``.
+    Sketches of the same precision can be merged, which is how sliding
+    windows are built from per-interval sketches.
+    """
+
+    __slots__ = ("precision", "_hashes", "_registers")
+
+    def __init__(self, precision: int = 10):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            precision (int): Bits of the hash indexing the registers, 4 to 16
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError(f"HyperLogLog precision must be 4 to 16, not {precision}")
+        self.precision = precision
+        self._hashes: Optional[Set[int]] = set()
+        self._registers: Optional[np.ndarray] = None
+
+    def add(self, value: str):
+        """
+        Add a value.
+
+        Args:
+            value (str): Value to add
+        """
+        hashed = hash64(value)
+        if self._hashes is not None:
+            self._hashes.add(hashed)
+            if len(self._hashes) > (1 << self.precision) // 4:
+                self._densify()
+        else:
+            self._add_hash(hashed)
+
+    def merge(self, other: "HyperLogLog"):
+        """
+        Add every value of another sketch of the same precision.
+
+        Args:
+            other (HyperLogLog): Sketch merged into this one
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+        if other._hashes is not None:
+            if self._hashes is not None:
+                self._hashes |= other._hashes
+                if len(self._hashes) > (1 << self.precision) // 4:
+                    self._densify()
+            else:
+                for hashed in other._hashes:
+                    self._add_hash(hashed)
+            return
+        if self._hashes is not None:
+            self._densify()
+        np.maximum(self._registers, other._registers, out=self._registers)
+
+    def count(self) -> int:
+        """
+        Estimate the number of distinct values added.
+
+        Returns:
+            Exact count while the sketch is small, an estimate after
+        """
+        if self._hashes is not None:
+            return len(self._hashes)
+
+        registers = 1 << self.precision
+        if registers >= 128:
+            alpha = 0.7213 / (1 + 1.079 / registers)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[registers]
+        estimate = alpha * registers**2 / np.sum(np.ldexp(1.0, -self._registers))
+        zeros = registers - np.count_nonzero(self._registers)
+        if estimate <= 2.5 * registers and zeros:
+            # Linear counting is more accurate while registers are empty
+            estimate = registers * math.log(registers / zeros)
+        return int(round(estimate))
+
+    def _densify(self):
+        """Convert the exact hashes to registers."""
+        hashes, self._hashes = self._hashes, None
+        self._registers = np.zeros(1 << self.precision, dtype=np.int8)
+        for hashed in hashes:
+            self._add_hash(hashed)
+
+    def _add_hash(self, hashed: int):
+        """
+        Update the register selected by a hash.
+
+        Args:
+            hashed (int): 64-bit hash
+        """
+        bits = 64 - self.precision
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+
+class SpaceSaving:
+    """
+    Track the heaviest keys of a weighted stream in bounded memory.
+
+    Space-Saving keeps at most ``capacity`` counters. A key that is not
+    tracked while the table is full takes over the smallest counter and
+    inherits its count as the key's error, so every key whose true count
+    exceeds the total divided by ``capacity`` is tracked, and a tracked
+    count overestimates the true count by at most its error. A secondary
+    amount, such as bytes, is summed alongside each count from the moment
+    its key is tracked.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Initialize an empty summary.
+
+        Args:
+            capacity (int): Maximum number of keys tracked
+        """
+        self.capacity = capacity
+        # [count, error, secondary] by key
+        self._counters: Dict[Hashable, List[float]] = {}
+
+    def __len__(self) -> int:
+        """Number of keys tracked."""
+        return len(self._counters)
+
+    def update(self, amounts: Dict[Hashable, Tuple[float, float]]):
+        """
+        Add a batch of amounts.
+
+        Args:
+            amounts (Dict): (count, secondary amount) by key, one entry per
+                key
+        """
+        counters = self._counters
+        untracked = []
+        for key, (count, secondary) in amounts.items():
+            counter = counters.get(key)
+            if counter is not None:
+                counter[0] += count
+                counter[2] += secondary
+            elif len(counters) < self.capacity:
+                counters[key] = [count, 0.0, secondary]
+            else:
+                untracked.append((key, count, secondary))
+        if not untracked:
+            return
+
+        # Heaviest keys first, so they are not displaced by the lighter ones
+        untracked.sort(key=lambda item: item[1], reverse=True)
+        smallest = [
+            (counter[0], i, key) for i, (key, counter) in enumerate(counters.items())
+        ]
+        heapq.heapify(smallest)
+        for order, (key, count, secondary) in enumerate(untracked, len(smallest)):
+            minimum, _, evicted = heapq.heappop(smallest)
+            del counters[evicted]
+            counters[key] = [minimum + count, minimum, secondary]
+            heapq.heappush(smallest, (minimum + count, order, key))
+
+    def scale(self, factor: float):
+        """
+        Multiply every count, error and secondary amount, e.g. to age them.
+
+        Args:
+            factor (float): Multiplier
+        """
+        for counter in self._counters.values():
+            counter[0] *= factor
+            counter[1] *= factor
+            counter[2] *= factor
+
+    def top(
+        self, limit: Optional[int] = None
+    ) -> List[Tuple[Hashable, float, float, float]]:
+        """
+        Heaviest keys tracked.
+
+        Args:
+            limit (int): Maximum number of keys, None for all
+
+        Returns:
+            (key, count, error, secondary) tuples, heaviest first
+        """
+        ranked = sorted(
+            self._counters.items(), key=lambda item: item[1][0], reverse=True
+        )
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [
+            (key, count, error, secondary) for key, (count, error, secondary) in ranked
+        ]
@@ -2,30 +2,124 @@ import logging
 import multiprocessing
 import os
 import queue
+import re
 import signal
+import sys
+import threading
 import time
 from typing import Any, Dict, List, Optional
 
 import psutil
 from django.conf import settings
+from django.db import connections, transaction
 from django.utils import timezone
-from scapy.all import ICMP, IP, TCP, UDP, sniff
+from scapy.all import ICMP, IP, TCP, UDP, conf, sniff
 from scapy.layers.inet6 import IPv6
 from scapy.packet import Packet as ScapyPacket
 
-from .models import Packet
+from .bpf import attach_filter, compile_filter, set_receive_buffer
+from .capture_engines import (
+    DEFAULT_RING_BLOCK_COUNT,
+    DEFAULT_RING_BLOCK_SIZE,
+    DEFAULT_RING_BLOCK_TIMEOUT,
+    DEFAULT_SNAPLEN,
+    FANOUT_MODES,
+    get_link_type,
+    join_fanout,
+    mmap_ring_capture,
+    open_packet_socket,
+    raw_socket_capture,
+    read_socket_statistics,
+)
+from .flow_table import FlowTable
+from .heavy_hitters import HeavyHitters
+from .models import Flow, NetworkInterface, Packet
+from .packet_decoder import decode_frame
+from .packet_ring import PacketRing
+from .pcap_ring import DEFAULT_PCAP_FILE_COUNT, DEFAULT_PCAP_FILE_SIZE, PcapRing
+from .retention import FlowRetention, PacketRetention
+from .rollups import TrafficRollups
+from .sampling import SAMPLING_MODES, LoadShedder, flow_hash
+from .stream_detector import StreamingAnomalyDetector
+from .telemetry import SharedHistogram, publish_telemetry
 
 logger = logging.getLogger(__name__)
 
+# "scapy" dissects every frame; "raw" decodes headers straight from the socket;
+# "mmap" decodes them in place from a TPACKET_V3 shared memory ring
+CAPTURE_ENGINES = ("scapy", "raw", "mmap")
+
+# "queue" pickles packet dicts through a multiprocessing.Queue; "shm" packs
+# them into fixed-width records in a shared memory ring
+TRANSPORTS = ("queue", "shm")
+
+# How packets are routed to writer processes: all packets of an interface,
+# or both directions of a flow, always reach the same writer
+SHARD_KEYS = ("interface", "flow")
+
+# What writers store: a row per packet, a row per flow, or both
+STORAGE_MODES = ("packets", "flows", "both")
+
+# Seconds between queue-full warnings from one capture worker
+DROP_WARNING_INTERVAL = 10.0
+
+# Seconds between reads of the kernel's per-socket counters
+KERNEL_STATISTICS_INTERVAL = 1.0
+
+# Packet fields handed to a shared streaming detector, and how many writer
+# batches may wait for it
+DETECTION_FIELDS = (
+    "interface",
+    "timestamp",
+    "protocol",
+    "source_ip",
+    "destination_ip",
+    "source_port",
+    "destination_port",
+    "packet_size",
+    "sample_rate",
+    "tcp_flags",
+)
+DETECTION_QUEUE_SIZE = 100
+
 
 class PacketCaptureManager:
     """Advanced packet capture management with multiprocessing."""
 
+    # Capture workers of an interface split its traffic with PACKET_FANOUT
+    uses_fanout = True
+
     def __init__(
         self,
         interfaces: List[str] = None,
         max_queue_size: int = 10000,
         max_packet_store: int = 50000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_packet_age_hours: Optional[float] = None,
+        packet_filter: Optional[str] = None,
+        snaplen: Optional[int] = None,
+        buffer_size: Optional[int] = None,
+        interface_options: Optional[Dict[str, Dict[str, Any]]] = None,
+        capture_engine: str = "scapy",
+        ring_block_size: int = DEFAULT_RING_BLOCK_SIZE,
+        ring_block_count: int = DEFAULT_RING_BLOCK_COUNT,
+        ring_block_timeout: int = DEFAULT_RING_BLOCK_TIMEOUT,
+        transport: str = "queue",
+        workers_per_interface: int = 1,
+        fanout_mode: str = "hash",
+        num_writers: int = 1,
+        shard_by: str = "interface",
+        sampling: Optional[str] = None,
+        storage: str = "packets",
+        flow_idle_timeout: float = 60.0,
+        flow_active_timeout: float = 300.0,
+        max_flow_store: Optional[int] = None,
+        max_flow_age_hours: Optional[float] = None,
+        stream_detection: bool = True,
+        pcap_ring_directory: Optional[str] = None,
+        pcap_ring_file_size: int = DEFAULT_PCAP_FILE_SIZE,
+        pcap_ring_file_count: int = DEFAULT_PCAP_FILE_COUNT,
     ):
         """
         Initialize packet capture manager.
@@ -34,13 +128,179 @@ class PacketCaptureManager:
             interfaces (List[str]): Network interfaces to capture
             max_queue_size (int): Maximum size of packet processing queue
             max_packet_store (int): Maximum number of packets to store in database
+            batch_size (int): Maximum number of packets written per database batch
+            flush_interval (float): Maximum seconds a partial batch is held
+                before it is written
+            max_packet_age_hours (float): Delete packets older than this many
+                hours, None to keep packets regardless of age
+            packet_filter (str): BPF filter expression applied in the kernel
+            snaplen (int): Maximum number of bytes copied per captured frame
+            buffer_size (int): Kernel receive buffer size in bytes per capture
+                socket
+            interface_options (Dict): Per-interface overrides of the
+                ``filter``, ``snaplen``, ``buffer_size`` and ``ring_*`` options
+            capture_engine (str): One of ``CAPTURE_ENGINES``
+            ring_block_size (int): Block size in bytes of the mmap capture ring
+            ring_block_count (int): Number of blocks in the mmap capture ring
+            ring_block_timeout (int): Milliseconds before the kernel hands a
+                partly filled ring block to the capture worker
+            transport (str): One of ``TRANSPORTS``, how packets travel from
+                capture workers to the consumer
+            workers_per_interface (int): Capture processes per interface,
+                sharing its traffic through a PACKET_FANOUT group
+            fanout_mode (str): How the kernel spreads frames over an
+                interface's workers, one of ``FANOUT_MODES``
+            num_writers (int): Database writer processes, each with its own
+                queue, connection and batching; at most one per interface
+                when sharded by interface
+            shard_by (str): How packets are routed to writers, one of
+                ``SHARD_KEYS``
+            sampling (str): Load shedding applied as writer queues fill up,
+                one of ``SAMPLING_MODES``, None to keep every packet until a
+                queue is full
+            storage (str): One of ``STORAGE_MODES``, whether writers store
+                packets, flows aggregated from them, or both
+            flow_idle_timeout (float): Seconds without packets before a flow
+                is written
+            flow_active_timeout (float): Maximum seconds covered by one flow
+                record
+            max_flow_store (int): Maximum number of flows to store, None for
+                no cap
+            max_flow_age_hours (float): Delete flows last seen more than this
+                many hours ago, None to keep them regardless of age
+            stream_detection (bool): Run streaming anomaly detection over
+                the packets each writer receives
+            pcap_ring_directory (str): Directory each capture worker writes
+                a rotating pcap ring of its raw frames to, None to disable
+            pcap_ring_file_size (int): Bytes per pcap ring file
+            pcap_ring_file_count (int): pcap files kept per capture worker
         """
+        if capture_engine not in CAPTURE_ENGINES:
+            raise ValueError(
+                f"Unknown capture engine {capture_engine!r}, "
+                f"expected one of {CAPTURE_ENGINES}"
+            )
+        if transport not in TRANSPORTS:
+            raise ValueError(
+                f"Unknown transport {transport!r}, expected one of {TRANSPORTS}"
+            )
+        if fanout_mode not in FANOUT_MODES:
+            raise ValueError(
+                f"Unknown fanout mode {fanout_mode!r}, "
+                f"expected one of {tuple(FANOUT_MODES)}"
+            )
+        if shard_by not in SHARD_KEYS:
+            raise ValueError(
+                f"Unknown shard key {shard_by!r}, expected one of {SHARD_KEYS}"
+            )
+        if sampling is not None and sampling not in SAMPLING_MODES:
+            raise ValueError(
+                f"Unknown sampling mode {sampling!r}, "
+                f"expected one of {SAMPLING_MODES}"
+            )
+        if storage not in STORAGE_MODES:
+            raise ValueError(
+                f"Unknown storage {storage!r}, expected one of {STORAGE_MODES}"
+            )
+
         self.interfaces = interfaces or self._get_network_interfaces()
-        self.packet_queue = multiprocessing.Queue(maxsize=max_queue_size)
+        self.num_writers = max(1, num_writers)
+        if shard_by == "interface" and self.num_writers > len(self.interfaces):
+            # Each interface goes to one writer, so the rest would sit idle
+            logger.warning(
+                f"Capping {self.num_writers} packet writers to the "
+                f"{len(self.interfaces)} interfaces they are sharded by; "
+                f"shard by flow to use more"
+            )
+            self.num_writers = len(self.interfaces)
+        self.shard_by = shard_by
+        # One queue (or ring) per writer
+        self.packet_queues = [
+            multiprocessing.Queue(maxsize=max_queue_size)
+            for _ in range(self.num_writers)
+        ]
+        self.packet_queue = self.packet_queues[0]
+        self.packet_rings = (
+            [
+                PacketRing(max_queue_size, self.interfaces)
+                for _ in range(self.num_writers)
+            ]
+            if transport == "shm"
+            else None
+        )
+        self.max_queue_size = max_queue_size
         self.max_packet_store = max_packet_store
+        self.retention = PacketRetention(
+            max_packets=max_packet_store, max_age_hours=max_packet_age_hours
+        )
+        self.rollups = TrafficRollups()
+        self.stream_detection = stream_detection
+        # Detection needs every packet of an interface and of a source IP in
+        # one detector. Writers sharded by flow each see part of them, so
+        # they hand their batches to a single detector process instead.
+        self.detection_queue: Optional[multiprocessing.Queue] = None
+        if stream_detection and self.num_writers > 1 and shard_by != "interface":
+            self.detection_queue = multiprocessing.Queue(maxsize=DETECTION_QUEUE_SIZE)
+        self.detection_process: Optional[multiprocessing.Process] = None
+        self.pcap_ring_directory = pcap_ring_directory
+        self.pcap_ring_file_size = pcap_ring_file_size
+        self.pcap_ring_file_count = pcap_ring_file_count
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.packet_filter = packet_filter
+        self.snaplen = snaplen
+        self.buffer_size = buffer_size
+        self.interface_options = interface_options or {}
+        self.capture_engine = capture_engine
+        self.ring_block_size = ring_block_size
+        self.ring_block_count = ring_block_count
+        self.ring_block_timeout = ring_block_timeout
+        self.workers_per_interface = max(1, workers_per_interface)
+        self.fanout_mode = fanout_mode
+        self.sampling = sampling
+        self.storage = storage
+        self.flow_idle_timeout = flow_idle_timeout
+        self.flow_active_timeout = flow_active_timeout
+        self.flow_retention = (
+            FlowRetention(max_flows=max_flow_store, max_age_hours=max_flow_age_hours)
+            if storage != "packets"
+            else None
+        )
+        capture_workers = len(self.interfaces) * self.workers_per_interface
+        # Packets captured and dropped by each capture worker, in
+        # (interface, worker) order
+        self.worker_counters = multiprocessing.RawArray("q", 2 * capture_workers)
+        # Frames received and dropped by the kernel for each capture worker
+        self.kernel_counters = multiprocessing.RawArray("q", 2 * capture_workers)
+        # Packets shed by sampling and the last sampling rate applied, per
+        # capture worker
+        self.sampling_counters = multiprocessing.RawArray("q", capture_workers)
+        self.sample_rates = multiprocessing.RawArray("q", capture_workers)
+        # Rows committed by each writer
+        self.writer_counters = multiprocessing.RawArray("q", self.num_writers)
+        # Active and written flows of each writer
+        self.flow_counters = multiprocessing.RawArray("q", 2 * self.num_writers)
+        # Pipeline timings in nanoseconds, one row per capture worker or writer
+        self.decode_time = SharedHistogram(capture_workers)
+        self.commit_latency = SharedHistogram(self.num_writers)
+        self.batch_time = SharedHistogram(self.num_writers)
+        self.queue_depth = SharedHistogram(self.num_writers)
+        self.telemetry_interval = 2.0
+        self._last_drop_warning = 0.0
+        # Set inside each capture process to its slot in worker_counters
+        self._counter_slot: Optional[int] = None
+        self._load_shedder: Optional[LoadShedder] = None
+        # Wait for room in a full writer queue instead of dropping the packet
+        self.block_on_full = False
+        self._fanout_group_base = os.getpid()
+        self.stats_interval = 10.0
+        self._interface_ids: Dict[str, int] = {}
         self.capture_processes: List[multiprocessing.Process] = []
+        self.consumer_processes: List[multiprocessing.Process] = []
         self.consumer_process: Optional[multiprocessing.Process] = None
         self.stop_event = multiprocessing.Event()
+        # Set once capture has stopped, so writers drain their queues last
+        self.writers_stop_event = multiprocessing.Event()
 
     @staticmethod
     def _get_network_interfaces() -> List[str]:
@@ -65,115 +325,913 @@ class PacketCaptureManager:
             logger.error(f"Interface detection error: {e}")
             return ["Wi-Fi"]  # Default to Wi-Fi on Windows
 
-    def _packet_capture_worker(self, interface: str):
+    def _get_capture_options(self, interface: str) -> Dict[str, Any]:
         """
-        Packet capture worker for a specific interface.
+        Resolve the capture options for an interface.
+
+        Args:
+            interface (str): Network interface name
+
+        Returns:
+            Dictionary with ``filter``, ``snaplen``, ``buffer_size`` and
+            ``ring_*`` keys
+        """
+        options = {
+            "filter": self.packet_filter,
+            "snaplen": self.snaplen,
+            "buffer_size": self.buffer_size,
+            "ring_block_size": self.ring_block_size,
+            "ring_block_count": self.ring_block_count,
+            "ring_block_timeout": self.ring_block_timeout,
+        }
+        overrides = self.interface_options.get(interface, {})
+        options.update(
+            {key: value for key, value in overrides.items() if value is not None}
+        )
+        return options
+
+    def _get_fanout_group(self, interface: str) -> int:
+        """
+        Get the PACKET_FANOUT group id shared by an interface's workers.
+
+        Args:
+            interface (str): Network interface name
+
+        Returns:
+            16-bit fanout group id, unique per manager and interface
+        """
+        return (self._fanout_group_base + self.interfaces.index(interface)) & 0xFFFF
+
+    def _join_fanout(self, sock, interface: str):
+        """
+        Join the interface's fanout group when it has several workers.
+
+        Args:
+            sock (socket.socket): Bound AF_PACKET socket
+            interface (str): Network interface the socket is bound to
+        """
+        if self.workers_per_interface > 1:
+            join_fanout(sock, self._get_fanout_group(interface), self.fanout_mode)
+
+    def _open_capture_socket(self, interface: str, options: Dict[str, Any]):
+        """
+        Open a layer 2 capture socket with the filter attached in the kernel.
 
         Args:
             interface (str): Network interface to capture packets on
+            options (Dict): Capture options from ``_get_capture_options``
+
+        Returns:
+            Scapy listen socket
         """
+        sock = conf.L2listen(iface=interface, nofilter=1)
+        try:
+            if options["filter"] or options["snaplen"]:
+                program = compile_filter(
+                    options["filter"], options["snaplen"], interface
+                )
+                attach_filter(sock.ins, program)
+            if options["buffer_size"]:
+                set_receive_buffer(sock.ins, options["buffer_size"])
+            self._join_fanout(sock.ins, interface)
+        except Exception:
+            sock.close()
+            raise
+        return sock
 
-        def safe_packet_callback(packet: ScapyPacket):
+    def _process_packet(
+        self, packet: ScapyPacket, interface: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Extract the stored fields from a captured packet.
+
+        Args:
+            packet (ScapyPacket): Captured packet
+            interface (str): Interface the packet was captured on
+
+        Returns:
+            Packet data dictionary, or None for non-IP traffic
+        """
+        if not packet.haslayer(IP) and not packet.haslayer(IPv6):
+            return None
+
+        ip_layer = packet.getlayer(IP) or packet.getlayer(IPv6)
+        protocol = "OTHER"
+        src_port = None
+        dst_port = None
+        tcp_flags = 0
+
+        if packet.haslayer(TCP):
+            protocol = "TCP"
+            tcp_layer = packet.getlayer(TCP)
+            src_port = tcp_layer.sport
+            dst_port = tcp_layer.dport
+            tcp_flags = int(tcp_layer.flags) & 0xFF
+        elif packet.haslayer(UDP):
+            protocol = "UDP"
+            udp_layer = packet.getlayer(UDP)
+            src_port = udp_layer.sport
+            dst_port = udp_layer.dport
+        elif packet.haslayer(ICMP):
+            protocol = "ICMP"
+
+        # Frames may be truncated to snaplen; the IP header keeps the real size
+        packet_size = len(packet)
+        ip_length = ip_layer.len if ip_layer.version == 4 else ip_layer.plen
+        if ip_length is not None:
+            if ip_layer.version == 6:
+                ip_length += 40
+            link_length = packet_size - len(ip_layer)
+            packet_size = max(packet_size, link_length + ip_length)
+
+        return {
+            "interface": interface,
+            "timestamp": timezone.now(),
+            "summary": f"{protocol}: {ip_layer.src}:{src_port or 'N/A'} -> {ip_layer.dst}:{dst_port or 'N/A'}",
+            "protocol": protocol,
+            "source_ip": str(ip_layer.src),
+            "destination_ip": str(ip_layer.dst),
+            "source_port": src_port,
+            "destination_port": dst_port,
+            "packet_size": packet_size,
+            "tcp_flags": tcp_flags,
+        }
+
+    def _get_writer(self, packet_data: Dict[str, Any], interface: str) -> int:
+        """
+        Pick the writer process responsible for a packet.
+
+        Args:
+            packet_data (Dict): Decoded packet data
+            interface (str): Interface the packet was captured on
+
+        Returns:
+            Writer index
+        """
+        if self.num_writers == 1:
+            return 0
+        if self.shard_by == "interface":
+            return self.interfaces.index(interface) % self.num_writers
+        return flow_hash(packet_data) % self.num_writers
+
+    def _enqueue_packet(self, packet_data: Dict[str, Any], interface: str):
+        """
+        Hand decoded packet data to its writer.
+
+        A full queue drops the packet, unless ``block_on_full`` is set, in
+        which case the packet waits for room until capture is stopped.
+
+        Args:
+            packet_data (Dict): Decoded packet data
+            interface (str): Interface the packet was captured on
+        """
+        slot = self._counter_slot
+        if slot is not None:
+            self.worker_counters[slot] += 1
+
+        writer = self._get_writer(packet_data, interface)
+        if self._load_shedder is not None:
+            rate = self._load_shedder.sample(writer, packet_data, self._get_queue_depth)
+            row = slot // 2
+            if not rate:
+                self.sampling_counters[row] += 1
+                return
+            self.sample_rates[row] = rate
+            packet_data["sample_rate"] = rate
+
+        if self.packet_rings is not None:
+            while not self.packet_rings[writer].put(packet_data):
+                if not self.block_on_full or self.stop_event.is_set():
+                    self._record_drop(interface)
+                    return
+                time.sleep(0.001)
+            return
+
+        while True:
             try:
-                if not packet.haslayer(IP) and not packet.haslayer(IPv6):
+                self.packet_queues[writer].put(
+                    packet_data, block=self.block_on_full, timeout=1.0
+                )
+                return
+            except queue.Full:
+                if not self.block_on_full or self.stop_event.is_set():
+                    self._record_drop(interface)
                     return
 
-                ip_layer = packet.getlayer(IP) or packet.getlayer(IPv6)
-                protocol = "OTHER"
-                src_port = None
-                dst_port = None
-
-                if packet.haslayer(TCP):
-                    protocol = "TCP"
-                    tcp_layer = packet.getlayer(TCP)
-                    src_port = tcp_layer.sport
-                    dst_port = tcp_layer.dport
-                elif packet.haslayer(UDP):
-                    protocol = "UDP"
-                    udp_layer = packet.getlayer(UDP)
-                    src_port = udp_layer.sport
-                    dst_port = udp_layer.dport
-                elif packet.haslayer(ICMP):
-                    protocol = "ICMP"
-
-                packet_data = {
-                    "timestamp": timezone.now(),
-                    "summary": f"{protocol}: {ip_layer.src}:{src_port or 'N/A'} -> {ip_layer.dst}:{dst_port or 'N/A'}",
-                    "protocol": protocol,
-                    "source_ip": str(ip_layer.src),
-                    "destination_ip": str(ip_layer.dst),
-                    "source_port": src_port,
-                    "destination_port": dst_port,
-                    "packet_size": len(packet),
-                }
+    def _record_drop(self, interface: str):
+        """
+        Count a packet dropped because its writer's queue was full.
 
-                try:
-                    self.packet_queue.put(packet_data, block=False)
-                except queue.Full:
-                    logger.warning(
-                        f"Packet queue full, dropping packet from {interface}"
-                    )
+        Warnings are rate limited, so a flood of drops costs a counter
+        increment per packet rather than a log line.
+
+        Args:
+            interface (str): Interface the packet was captured on
+        """
+        slot = self._counter_slot
+        if slot is not None:
+            self.worker_counters[slot + 1] += 1
+
+        now = time.monotonic()
+        if now - self._last_drop_warning >= DROP_WARNING_INTERVAL:
+            self._last_drop_warning = now
+            dropped = self.worker_counters[slot + 1] if slot is not None else 1
+            logger.warning(
+                f"Packet queue full, {dropped} packets from {interface} "
+                f"dropped by this worker so far"
+            )
+
+    def _record_kernel_statistics(self, sock):
+        """
+        Add the kernel's receive and drop counters to this worker's totals.
+
+        Args:
+            sock (socket.socket): Bound AF_PACKET socket of this worker
+        """
+        try:
+            received, dropped = read_socket_statistics(sock)
+        except OSError as e:
+            logger.debug(f"Could not read socket statistics: {e}")
+            return
+        slot = self._counter_slot
+        self.kernel_counters[slot] += received
+        self.kernel_counters[slot + 1] += dropped
+
+    def _start_kernel_statistics(self, sock, done: threading.Event):
+        """
+        Poll the kernel counters of a capture socket in the background.
 
+        Args:
+            sock (socket.socket): Bound AF_PACKET socket of this worker
+            done (threading.Event): Polling stops once this event is set
+
+        Returns:
+            Started polling thread
+        """
+
+        def poll():
+            while not done.wait(KERNEL_STATISTICS_INTERVAL):
+                self._record_kernel_statistics(sock)
+
+        thread = threading.Thread(target=poll, daemon=True)
+        thread.start()
+        return thread
+
+    def _stop_kernel_statistics(self, sock, done: threading.Event, thread):
+        """
+        Stop polling a capture socket and record its final counters.
+
+        Args:
+            sock (socket.socket): Bound AF_PACKET socket of this worker
+            done (threading.Event): Event passed to ``_start_kernel_statistics``
+            thread (threading.Thread): Polling thread
+        """
+        done.set()
+        thread.join()
+        self._record_kernel_statistics(sock)
+
+    def _open_pcap_ring(
+        self, interface: str, link_type: int, snaplen: Optional[int]
+    ) -> Optional[PcapRing]:
+        """
+        Open this capture worker's pcap ring, if one is configured.
+
+        Args:
+            interface (str): Network interface the worker captures on
+            link_type (int): pcap link-layer header type of the frames
+            snaplen (int): Maximum bytes captured per frame
+
+        Returns:
+            PcapRing, or None if pcap rings are disabled
+        """
+        if not self.pcap_ring_directory:
+            return None
+        return PcapRing(
+            self.pcap_ring_directory,
+            f"{interface}.{self._counter_slot // 2}",
+            link_type=link_type,
+            snaplen=snaplen or DEFAULT_SNAPLEN,
+            file_size=self.pcap_ring_file_size,
+            file_count=self.pcap_ring_file_count,
+        )
+
+    def _socket_capture(self, interface: str, options: Dict[str, Any]):
+        """
+        Capture from an AF_PACKET socket, decoding headers without scapy.
+
+        Frames are read one per syscall by the "raw" engine, or a block at a
+        time from a shared memory ring by the "mmap" engine.
+
+        Args:
+            interface (str): Network interface to capture packets on
+            options (Dict): Capture options from ``_get_capture_options``
+        """
+        sock = open_packet_socket(interface, options)
+        try:
+            self._join_fanout(sock, interface)
+        except Exception:
+            sock.close()
+            raise
+        link_type = get_link_type(sock)
+        row = self._counter_slot // 2
+        pcap_ring = self._open_pcap_ring(interface, link_type, options["snaplen"])
+
+        # Records in the shared-memory transport hold neither a summary nor a
+        # datetime, so capture workers skip building them
+        compact = self.packet_rings is not None
+
+        def handle_frame(
+            frame: memoryview, wire_length: int, timestamp: Optional[float]
+        ):
+            try:
+                if pcap_ring is not None:
+                    pcap_ring.write(frame, wire_length, timestamp)
+                started = time.perf_counter_ns()
+                packet_data = decode_frame(
+                    frame, interface, wire_length, timestamp, link_type, compact
+                )
+                self.decode_time.record(row, time.perf_counter_ns() - started)
+                if packet_data is not None:
+                    self._enqueue_packet(packet_data, interface)
+            except Exception as e:
+                logger.error(
+                    f"Packet processing error on {interface}: {e}", exc_info=True
+                )
+
+        done = threading.Event()
+        statistics_thread = self._start_kernel_statistics(sock, done)
+        try:
+            if self.capture_engine == "mmap":
+                mmap_ring_capture(
+                    sock,
+                    handle_frame,
+                    self.stop_event,
+                    block_size=options["ring_block_size"],
+                    block_count=options["ring_block_count"],
+                    block_timeout=options["ring_block_timeout"],
+                )
+            else:
+                raw_socket_capture(
+                    sock,
+                    handle_frame,
+                    self.stop_event,
+                    snaplen=options["snaplen"] or DEFAULT_SNAPLEN,
+                )
+        finally:
+            self._stop_kernel_statistics(sock, done, statistics_thread)
+            sock.close()
+            if pcap_ring is not None:
+                pcap_ring.close()
+
+    def _packet_capture_worker(self, interface: str, worker: int = 0):
+        """
+        Packet capture worker for a specific interface.
+
+        Args:
+            interface (str): Network interface to capture packets on
+            worker (int): Index of this worker among the interface's workers
+        """
+        self._counter_slot = 2 * (
+            self.interfaces.index(interface) * self.workers_per_interface + worker
+        )
+        if self.sampling is not None:
+            self._load_shedder = LoadShedder(
+                self.num_writers, self.max_queue_size, mode=self.sampling
+            )
+        if self.fanout_mode == "cpu" and self.workers_per_interface > 1:
+            # Keep each worker on the CPU whose frames it is handed
+            try:
+                os.sched_setaffinity(0, {worker % os.cpu_count()})
+            except (AttributeError, OSError) as e:
+                logger.debug(f"Could not pin capture worker {worker}: {e}")
+
+        row = self._counter_slot // 2
+        pcap_ring: Optional[PcapRing] = None
+
+        def safe_packet_callback(packet: ScapyPacket):
+            try:
+                if pcap_ring is not None:
+                    pcap_ring.write(bytes(packet), timestamp=float(packet.time))
+                started = time.perf_counter_ns()
+                packet_data = self._process_packet(packet, interface)
+                self.decode_time.record(row, time.perf_counter_ns() - started)
+                if packet_data is not None:
+                    self._enqueue_packet(packet_data, interface)
             except Exception as e:
                 logger.error(
                     f"Packet processing error on {interface}: {e}", exc_info=True
                 )
 
         try:
-            logger.info(f"Starting packet capture on {interface}")
-            sniff(
-                iface=interface,
-                prn=safe_packet_callback,
-                store=0,
-                stop_filter=lambda x: self.stop_event.is_set(),
+            options = self._get_capture_options(interface)
+            logger.info(
+                f"Starting {self.capture_engine} packet capture worker {worker} "
+                f"on {interface} with {options}"
             )
+            if self.capture_engine != "scapy":
+                self._socket_capture(interface, options)
+                return
+
+            if not sys.platform.startswith("linux"):
+                # libpcap applies the filter in the kernel on other platforms
+                sniff(
+                    prn=safe_packet_callback,
+                    store=0,
+                    stop_filter=lambda x: self.stop_event.is_set(),
+                    iface=interface,
+                    filter=options["filter"],
+                )
+                return
+
+            capture_socket = self._open_capture_socket(interface, options)
+            pcap_ring = self._open_pcap_ring(
+                interface, get_link_type(capture_socket.ins), options["snaplen"]
+            )
+            done = threading.Event()
+            statistics_thread = self._start_kernel_statistics(capture_socket.ins, done)
+            try:
+                sniff(
+                    prn=safe_packet_callback,
+                    store=0,
+                    stop_filter=lambda x: self.stop_event.is_set(),
+                    opened_socket=capture_socket,
+                )
+            finally:
+                self._stop_kernel_statistics(
+                    capture_socket.ins, done, statistics_thread
+                )
+                capture_socket.close()
+                if pcap_ring is not None:
+                    pcap_ring.close()
         except Exception as e:
             logger.error(f"Capture error on {interface}: {e}")
 
-    def _packet_consumer_worker(self):
+    def _resolve_interface_id(self, name: str) -> int:
+        """
+        Map an interface name to its NetworkInterface primary key.
+
+        Args:
+            name (str): Network interface name
+
+        Returns:
+            Primary key of the (possibly newly created) NetworkInterface
+        """
+        interface_id = self._interface_ids.get(name)
+        if interface_id is None:
+            interface, _ = NetworkInterface.objects.get_or_create(name=name)
+            interface_id = self._interface_ids[name] = interface.pk
+        return interface_id
+
+    def _build_packet(self, packet_data: Dict[str, Any]) -> Packet:
+        """
+        Build an unsaved Packet instance from captured packet data.
+
+        Args:
+            packet_data (Dict): Packet fields produced by a capture worker
+
+        Returns:
+            Unsaved Packet model instance
+        """
+        return Packet(
+            timestamp=packet_data["timestamp"],
+            interface_id=self._resolve_interface_id(packet_data["interface"]),
+            protocol=packet_data["protocol"],
+            source_ip=packet_data["source_ip"],
+            destination_ip=packet_data["destination_ip"],
+            source_port=packet_data["source_port"],
+            destination_port=packet_data["destination_port"],
+            packet_size=packet_data["packet_size"],
+            sample_rate=packet_data.get("sample_rate", 1),
+            tcp_flags=packet_data.get("tcp_flags"),
+        )
+
+    def _flush_batch(self, batch: List[Dict[str, Any]]) -> int:
+        """
+        Write a batch of packets with a single bulk insert.
+
+        Args:
+            batch (List[Dict]): Packet data collected from the queue
+
+        Returns:
+            Number of rows written
+        """
+        if not batch:
+            return 0
+
+        packets = [self._build_packet(packet_data) for packet_data in batch]
+
+        with transaction.atomic():
+            Packet.objects.bulk_create(packets, batch_size=self.batch_size)
+        self.retention.record_inserted(len(packets))
+
+        return len(packets)
+
+    def _build_flow(self, flow: Dict[str, Any]) -> Flow:
+        """
+        Build an unsaved Flow instance from a flow record.
+
+        Args:
+            flow (Dict): Flow record produced by a FlowTable
+
+        Returns:
+            Unsaved Flow model instance
+        """
+        return Flow(
+            interface_id=self._resolve_interface_id(flow["interface"]),
+            protocol=flow["protocol"],
+            source_ip=flow["source_ip"],
+            destination_ip=flow["destination_ip"],
+            source_port=flow["source_port"],
+            destination_port=flow["destination_port"],
+            first_seen=flow["first_seen"],
+            last_seen=flow["last_seen"],
+            packets=flow["packets"],
+            bytes=flow["bytes"],
+            reverse_packets=flow["reverse_packets"],
+            reverse_bytes=flow["reverse_bytes"],
+            tcp_flags=flow["tcp_flags"],
+        )
+
+    def _flush_flows(self, flows: List[Dict[str, Any]]) -> int:
+        """
+        Write finished flows with a single bulk insert.
+
+        Args:
+            flows (List[Dict]): Flow records expired from a FlowTable
+
+        Returns:
+            Number of rows written
         """
-        Consume packets from queue and save to database.
-        Implements intelligent packet storage management.
+        if not flows:
+            return 0
+
+        with transaction.atomic():
+            Flow.objects.bulk_create(
+                [self._build_flow(flow) for flow in flows], batch_size=self.batch_size
+            )
+        if self.flow_retention is not None:
+            self.flow_retention.record_inserted(len(flows))
+        return len(flows)
+
+    def _get_packets(
+        self, max_packets: int, timeout: float, writer: int = 0
+    ) -> List[Dict[str, Any]]:
         """
-        while not self.stop_event.is_set():
+        Take up to ``max_packets`` waiting packets from a writer's transport.
+
+        Args:
+            max_packets (int): Maximum number of packets to return
+            timeout (float): Seconds to wait for the first packet
+            writer (int): Writer whose queue or ring is read
+
+        Returns:
+            List of packet data dictionaries, empty if none arrived in time
+        """
+        if self.packet_rings is not None:
+            ring = self.packet_rings[writer]
+            deadline = time.monotonic() + timeout
+            while True:
+                packets = ring.get_batch(max_packets)
+                remaining = deadline - time.monotonic()
+                if packets or remaining <= 0:
+                    return packets
+                time.sleep(min(0.01, remaining))
+
+        packet_queue = self.packet_queues[writer]
+        try:
+            packets = [packet_queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(packets) < max_packets:
             try:
-                packet_data = self.packet_queue.get(timeout=1)
-
-                # Check total packet count before saving
-                total_packets = Packet.objects.count()
-                if total_packets >= self.max_packet_store:
-                    # Delete oldest packets first
-                    oldest_packets = Packet.objects.order_by("timestamp")[
-                        : total_packets - self.max_packet_store + 1
-                    ]
-                    oldest_packets.delete()
-
-                Packet.objects.create(**packet_data)
+                packets.append(packet_queue.get_nowait())
             except queue.Empty:
-                time.sleep(0.1)
+                break
+        return packets
+
+    def _get_queue_depth(self, writer: int) -> Optional[int]:
+        """
+        Number of packets waiting for a writer.
+
+        Args:
+            writer (int): Writer whose queue or ring is measured
+
+        Returns:
+            Queue depth, None where the platform cannot report it
+        """
+        if self.packet_rings is not None:
+            return len(self.packet_rings[writer])
+        try:
+            return self.packet_queues[writer].qsize()
+        except NotImplementedError:
+            return None
+
+    def _record_commit(self, writer: int, batch: List[Dict[str, Any]], elapsed: int):
+        """
+        Record the telemetry of a committed batch.
+
+        Args:
+            writer (int): Writer that committed the batch
+            batch (List[Dict]): Packet data just written
+            elapsed (int): Nanoseconds spent writing the batch
+        """
+        self.writer_counters[writer] += len(batch)
+        self.batch_time.record(writer, elapsed)
+        # Latency from capture, measured against each packet's timestamp
+        now = time.time()
+        for packet_data in batch:
+            latency = now - packet_data["timestamp"].timestamp()
+            self.commit_latency.record(writer, max(0, int(latency * 1e9)))
+
+    def _packet_consumer_worker(self, writer: int = 0):
+        """
+        Consume packets from a writer's queue and save to database.
+
+        Packets are collected until either ``batch_size`` packets are waiting
+        or ``flush_interval`` seconds have passed since the first packet of
+        the batch arrived; the batch is then written in one transaction.
+        Every packet also updates the writer's per-minute traffic rollups,
+        its heavy hitter summaries and, when flows are stored, its flow
+        table; rollups and finished flows are written every
+        ``flush_interval`` and heavy hitters published every few seconds.
+        With streaming detection on, every batch is also fed to the writer's
+        anomaly detector, or to the shared detector process when writers are
+        sharded by flow. Writer 0 also enforces packet retention and derives
+        hour and day rollups for all writers.
+
+        Args:
+            writer (int): Index of this writer
+        """
+        batch: List[Dict[str, Any]] = []
+        batch_deadline = None
+        rows_written = 0
+        stats_started = time.monotonic()
+        telemetry_published = 0.0
+        flow_table = None
+        if self.storage != "packets":
+            flow_table = FlowTable(self.flow_idle_timeout, self.flow_active_timeout)
+        detector = None
+        if self.stream_detection and self.detection_queue is None:
+            detector = StreamingAnomalyDetector()
+        detection_warning = 0.0
+        heavy_hitters = HeavyHitters()
+        aggregates_due = time.monotonic() + self.flush_interval
+
+        while True:
+            stopping = self.writers_stop_event.is_set()
+            if stopping:
+                # Drain whatever is left without waiting for more
+                timeout = 0.0
+            elif batch_deadline is not None:
+                timeout = max(0.0, batch_deadline - time.monotonic())
+            else:
+                timeout = 1.0
+
+            try:
+                packets = self._get_packets(
+                    self.batch_size - len(batch), timeout, writer
+                )
+            except Exception as e:
+                logger.error(f"Packet writer {writer} error: {e}")
+                packets = []
+            depth = self._get_queue_depth(writer)
+            if depth is not None:
+                self.queue_depth.record(writer, depth)
+            drained = stopping and not packets
+            self.rollups.add(packets)
+            heavy_hitters.add(packets)
+            heavy_hitters.maybe_publish(writer, self.num_writers)
+            if flow_table is not None:
+                flow_table.update(packets)
+            if detector is not None:
+                try:
+                    detector.process(packets)
+                except Exception as e:
+                    logger.error(f"Streaming detection error: {e}")
+            elif self.detection_queue is not None and packets:
+                records = [
+                    tuple(packet_data.get(field) for field in DETECTION_FIELDS)
+                    for packet_data in packets
+                ]
+                try:
+                    self.detection_queue.put(records, block=False)
+                except queue.Full:
+                    if time.monotonic() - detection_warning >= DROP_WARNING_INTERVAL:
+                        logger.warning(
+                            f"Packet writer {writer} skipped detection of "
+                            f"{len(packets)} packets: detector queue is full"
+                        )
+                        detection_warning = time.monotonic()
+            if self.storage != "flows":
+                if packets and not batch:
+                    batch_deadline = time.monotonic() + self.flush_interval
+                batch.extend(packets)
+
+            deadline_passed = (
+                batch_deadline is not None and time.monotonic() >= batch_deadline
+            )
+            if batch and (len(batch) >= self.batch_size or deadline_passed or drained):
+                try:
+                    started = time.perf_counter_ns()
+                    rows_written += self._flush_batch(batch)
+                    self._record_commit(writer, batch, time.perf_counter_ns() - started)
+                except Exception as e:
+                    logger.error(
+                        f"Packet writer {writer} failed to write {len(batch)} "
+                        f"packets: {e}"
+                    )
+                batch = []
+                batch_deadline = None
+
+            if drained or time.monotonic() >= aggregates_due:
+                try:
+                    self.rollups.flush()
+                except Exception as e:
+                    logger.error(f"Packet writer {writer} failed to write rollups: {e}")
+                if flow_table is not None:
+                    flows = flow_table.flush() if drained else flow_table.expire()
+                    try:
+                        rows_written += self._flush_flows(flows)
+                        self.flow_counters[2 * writer + 1] += len(flows)
+                    except Exception as e:
+                        logger.error(
+                            f"Packet writer {writer} failed to write {len(flows)} "
+                            f"flows: {e}"
+                        )
+                    self.flow_counters[2 * writer] = len(flow_table)
+                aggregates_due = time.monotonic() + self.flush_interval
+
+            if writer == 0:
+                try:
+                    self.retention.maybe_enforce()
+                except Exception as e:
+                    logger.error(f"Packet retention error: {e}")
+                if self.flow_retention is not None:
+                    try:
+                        self.flow_retention.maybe_enforce()
+                    except Exception as e:
+                        logger.error(f"Flow retention error: {e}")
+                try:
+                    self.rollups.maybe_derive()
+                except Exception as e:
+                    logger.error(f"Traffic rollup error: {e}")
+
+                if time.monotonic() - telemetry_published >= self.telemetry_interval:
+                    publish_telemetry(self.get_telemetry())
+                    telemetry_published = time.monotonic()
+
+            elapsed = time.monotonic() - stats_started
+            if elapsed >= self.stats_interval:
+                if rows_written:
+                    logger.info(
+                        f"Packet writer {writer} wrote {rows_written} rows in "
+                        f"{elapsed:.1f}s ({rows_written / elapsed:.0f} rows/s)"
+                    )
+                rows_written = 0
+                stats_started = time.monotonic()
+
+            if drained:
+                break
+
+    def _detection_worker(self):
+        """
+        Run streaming anomaly detection over the batches of every writer.
+
+        Runs until the writers have stopped and it receives None.
+        """
+        detector = StreamingAnomalyDetector()
+        while True:
+            try:
+                records = self.detection_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if records is None:
+                break
+            packets = [dict(zip(DETECTION_FIELDS, record)) for record in records]
+            try:
+                detector.process(packets)
             except Exception as e:
-                logger.error(f"Packet consumer error: {e}")
+                logger.error(f"Streaming detection error: {e}")
 
     def start_capture(self):
         """Start packet capture on multiple interfaces."""
         self.stop_event.clear()
+        self.writers_stop_event.clear()
+
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+
+        # Fanout group ids are derived from the manager's pid so that
+        # separate managers never join each other's groups
+        self._fanout_group_base = os.getpid()
+
+        # PACKET_FANOUT is Linux only; elsewhere extra workers would each
+        # see every packet
+        workers = self.workers_per_interface
+        linux = sys.platform.startswith("linux")
+        if workers > 1 and self.uses_fanout and not linux:
+            logger.warning("Multiple capture workers per interface need Linux")
+            workers = 1
 
         # Start capture processes for each interface
         for interface in self.interfaces:
+            for worker in range(workers):
+                process = multiprocessing.Process(
+                    target=self._packet_capture_worker, args=(interface, worker)
+                )
+                process.start()
+                self.capture_processes.append(process)
+
+        # Start writer processes, each draining its own queue
+        for writer in range(self.num_writers):
             process = multiprocessing.Process(
-                target=self._packet_capture_worker, args=(interface,)
+                target=self._packet_consumer_worker, args=(writer,)
             )
             process.start()
-            self.capture_processes.append(process)
+            self.consumer_processes.append(process)
+        self.consumer_process = self.consumer_processes[0]
 
-        # Start consumer process
-        self.consumer_process = multiprocessing.Process(
-            target=self._packet_consumer_worker
-        )
-        self.consumer_process.start()
+        if self.detection_queue is not None:
+            self.detection_process = multiprocessing.Process(
+                target=self._detection_worker
+            )
+            self.detection_process.start()
 
         logger.info(f"Packet capture started on interfaces: {self.interfaces}")
 
+    def get_capture_counters(self) -> Dict[str, Any]:
+        """
+        Merge the per-worker capture counters.
+
+        Returns:
+            Totals of captured packets, packets dropped on a full queue,
+            packets shed by sampling and frames received and dropped by the
+            kernel, overall and per interface, with the per-worker breakdown
+            including the last sampling rate applied
+        """
+        keys = (
+            "captured",
+            "dropped",
+            "sampled_out",
+            "kernel_received",
+            "kernel_dropped",
+        )
+        interfaces = {}
+        for index, interface in enumerate(self.interfaces):
+            workers = []
+            for worker in range(self.workers_per_interface):
+                slot = 2 * (index * self.workers_per_interface + worker)
+                workers.append(
+                    {
+                        "captured": self.worker_counters[slot],
+                        "dropped": self.worker_counters[slot + 1],
+                        "sampled_out": self.sampling_counters[slot // 2],
+                        "sample_rate": self.sample_rates[slot // 2] or 1,
+                        "kernel_received": self.kernel_counters[slot],
+                        "kernel_dropped": self.kernel_counters[slot + 1],
+                    }
+                )
+            interfaces[interface] = {
+                key: sum(worker[key] for worker in workers) for key in keys
+            }
+            interfaces[interface]["workers"] = workers
+
+        counters = {
+            key: sum(iface[key] for iface in interfaces.values()) for key in keys
+        }
+        counters["interfaces"] = interfaces
+        return counters
+
+    def get_telemetry(self) -> Dict[str, Any]:
+        """
+        Snapshot the capture pipeline counters and timings.
+
+        Returns:
+            Capture counters, packet rows committed, active and written
+            flows, current and observed queue depths, and summaries of decode
+            time (microseconds), capture to commit latency and batch write
+            time (milliseconds)
+        """
+        return {
+            "timestamp": time.time(),
+            "capture": self.get_capture_counters(),
+            "committed": sum(self.writer_counters),
+            "flows": {
+                "active": sum(self.flow_counters[0::2]),
+                "written": sum(self.flow_counters[1::2]),
+            },
+            "queue_depth": {
+                "capacity": self.max_queue_size,
+                "current": [
+                    self._get_queue_depth(writer) for writer in range(self.num_writers)
+                ],
+                "observed": self.queue_depth.summary(),
+            },
+            "decode_time_us": self.decode_time.summary(1e-3),
+            "commit_latency_ms": self.commit_latency.summary(1e-6),
+            "batch_time_ms": self.batch_time.summary(1e-6),
+        }
+
     def stop_capture(self):
         """Gracefully stop packet capture."""
         self.stop_event.set()
@@ -184,25 +1242,135 @@ class PacketCaptureManager:
             if process.is_alive():
                 process.terminate()
 
-        # Terminate consumer process
-        if self.consumer_process:
-            self.consumer_process.join(timeout=5)
-            if self.consumer_process.is_alive():
-                self.consumer_process.terminate()
+        # Let every writer drain and flush its queue, then terminate stragglers
+        self.writers_stop_event.set()
+        for process in self.consumer_processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+        # The detector finishes the batches the writers handed it last
+        if self.detection_process is not None:
+            self.detection_queue.put(None)
+            self.detection_process.join(timeout=10)
+            if self.detection_process.is_alive():
+                self.detection_process.terminate()
 
         logger.info("Packet capture stopped")
 
 
-def start_sniffing():
+# Integer capture options that can be overridden per interface, by the
+# environment variable setting them for every interface
+INTERFACE_INTEGER_OPTIONS = {
+    "snaplen": "NETCREEP_SNAPLEN",
+    "buffer_size": "NETCREEP_CAPTURE_BUFFER_SIZE",
+    "ring_block_size": "NETCREEP_RING_BLOCK_SIZE",
+    "ring_block_count": "NETCREEP_RING_BLOCK_COUNT",
+    "ring_block_timeout": "NETCREEP_RING_BLOCK_TIMEOUT",
+}
+
+
+def _get_interface_env(name: str, interface: str) -> Optional[str]:
+    """
+    Read a per-interface override of a capture environment variable.
+
+    ``NETCREEP_PACKET_FILTER_ETH0`` overrides ``NETCREEP_PACKET_FILTER`` for
+    ``eth0``; characters that are not valid in variable names become ``_``.
+
+    Args:
+        name (str): Global environment variable name
+        interface (str): Network interface name
+
+    Returns:
+        Override value, or None if unset
+    """
+    suffix = re.sub(r"\W", "_", interface).upper()
+    return os.environ.get(f"{name}_{suffix}") or None
+
+
+def start_sniffing(num_writers: Optional[int] = None):
     """
     Global function to start packet capture.
-    Uses environment variables for configuration.
+    Uses environment variables for configuration; the packet and flow
+    retention limits come from settings, shared with the cleanup job.
+
+    Args:
+        num_writers (int): Database writer processes, overriding
+            NETCREEP_WRITERS
     """
     interfaces = os.environ.get("NETCREEP_CAPTURE_INTERFACES", "eth0").split(",")
-    max_packets = int(os.environ.get("NETCREEP_MAX_PACKETS", 50000))
+    batch_size = int(os.environ.get("NETCREEP_BATCH_SIZE", 500))
+    flush_interval = float(os.environ.get("NETCREEP_FLUSH_INTERVAL", 1.0))
+    packet_filter = os.environ.get("NETCREEP_PACKET_FILTER") or None
+    snaplen = int(os.environ.get("NETCREEP_SNAPLEN", 0)) or None
+    buffer_size = int(os.environ.get("NETCREEP_CAPTURE_BUFFER_SIZE", 0)) or None
+
+    capture_engine = os.environ.get("NETCREEP_CAPTURE_ENGINE", "scapy")
+    transport = os.environ.get("NETCREEP_TRANSPORT", "queue")
+    workers_per_interface = int(os.environ.get("NETCREEP_WORKERS_PER_INTERFACE", 1))
+    fanout_mode = os.environ.get("NETCREEP_FANOUT_MODE", "hash")
+    if num_writers is None:
+        num_writers = int(os.environ.get("NETCREEP_WRITERS", 1))
+    shard_by = os.environ.get("NETCREEP_SHARD_BY", "interface")
+    sampling = os.environ.get("NETCREEP_SAMPLING") or None
+    storage = os.environ.get("NETCREEP_STORAGE", "packets")
+    flow_idle_timeout = float(os.environ.get("NETCREEP_FLOW_IDLE_TIMEOUT", 60.0))
+    flow_active_timeout = float(os.environ.get("NETCREEP_FLOW_ACTIVE_TIMEOUT", 300.0))
+    stream_detection = os.environ.get("NETCREEP_STREAM_DETECTION", "True") == "True"
+    pcap_ring_directory = os.environ.get("NETCREEP_PCAP_RING_DIR") or None
+    pcap_ring_file_size = int(
+        os.environ.get("NETCREEP_PCAP_RING_FILE_SIZE", DEFAULT_PCAP_FILE_SIZE)
+    )
+    pcap_ring_file_count = int(
+        os.environ.get("NETCREEP_PCAP_RING_FILES", DEFAULT_PCAP_FILE_COUNT)
+    )
+    ring_block_size = int(
+        os.environ.get("NETCREEP_RING_BLOCK_SIZE", DEFAULT_RING_BLOCK_SIZE)
+    )
+    ring_block_count = int(
+        os.environ.get("NETCREEP_RING_BLOCK_COUNT", DEFAULT_RING_BLOCK_COUNT)
+    )
+    ring_block_timeout = int(
+        os.environ.get("NETCREEP_RING_BLOCK_TIMEOUT", DEFAULT_RING_BLOCK_TIMEOUT)
+    )
+
+    interface_options = {}
+    for interface in interfaces:
+        options = {"filter": _get_interface_env("NETCREEP_PACKET_FILTER", interface)}
+        for key, name in INTERFACE_INTEGER_OPTIONS.items():
+            value = _get_interface_env(name, interface)
+            options[key] = int(value) if value else None
+        interface_options[interface] = options
 
     capture_manager = PacketCaptureManager(
-        interfaces=interfaces, max_packet_store=max_packets
+        interfaces=interfaces,
+        max_packet_store=settings.MAX_PACKET_STORE,
+        batch_size=batch_size,
+        flush_interval=flush_interval,
+        max_packet_age_hours=settings.PACKET_RETENTION_HOURS,
+        packet_filter=packet_filter,
+        snaplen=snaplen,
+        buffer_size=buffer_size,
+        interface_options=interface_options,
+        capture_engine=capture_engine,
+        ring_block_size=ring_block_size,
+        ring_block_count=ring_block_count,
+        ring_block_timeout=ring_block_timeout,
+        transport=transport,
+        workers_per_interface=workers_per_interface,
+        fanout_mode=fanout_mode,
+        num_writers=num_writers,
+        shard_by=shard_by,
+        sampling=sampling,
+        storage=storage,
+        flow_idle_timeout=flow_idle_timeout,
+        flow_active_timeout=flow_active_timeout,
+        max_flow_store=settings.MAX_FLOW_STORE,
+        max_flow_age_hours=settings.FLOW_RETENTION_HOURS,
+        stream_detection=stream_detection,
+        pcap_ring_directory=pcap_ring_directory,
+        pcap_ring_file_size=pcap_ring_file_size,
+        pcap_ring_file_count=pcap_ring_file_count,
     )
 
     try:
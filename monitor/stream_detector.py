@@ -0,0 +1,521 @@
+import logging
+import math
+from collections import defaultdict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from .models import NetworkAnomaly, NetworkInterface
+from .scan_detector import ScanDetector, describe_scan
+
+logger = logging.getLogger(__name__)
+
+
+class RunningStats:
+    """Mean and variance of a series, updated one value at a time (Welford)."""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value: float):
+        """
+        Add a value to the series.
+
+        Args:
+            value (float): New value
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the values seen so far."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def zscore(self, value: float) -> float:
+        """
+        Standard score of a value against the series.
+
+        Args:
+            value (float): Value to score
+
+        Returns:
+            Number of standard deviations from the mean, 0 without spread
+        """
+        std = math.sqrt(self.variance)
+        return (value - self.mean) / std if std else 0.0
+
+
+class Ewma:
+    """Exponentially weighted moving mean and variance of a series."""
+
+    __slots__ = ("alpha", "count", "mean", "variance")
+
+    def __init__(self, alpha: float = 0.1):
+        """
+        Initialize the moving average.
+
+        Args:
+            alpha (float): Weight of each new value, between 0 and 1
+        """
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self.variance = 0.0
+
+    def update(self, value: float, min_std: float = 0.0) -> float:
+        """
+        Score a value against the baseline, then add it to the baseline.
+
+        Args:
+            value (float): New value
+            min_std (float): Lower bound of the standard deviation used for
+                scoring, so a perfectly steady baseline does not score every
+                change as infinitely unusual or not at all
+
+        Returns:
+            Standard score of the value before it was added
+        """
+        std = max(math.sqrt(self.variance), min_std)
+        zscore = (value - self.mean) / std if std else 0.0
+        if self.count == 0:
+            self.mean = value
+        else:
+            delta = value - self.mean
+            self.mean += self.alpha * delta
+            self.variance = (1 - self.alpha) * (self.variance + self.alpha * delta**2)
+        self.count += 1
+        return zscore
+
+
+class DecayingCounter:
+    """
+    Per-key counters that decay exponentially with time.
+
+    A counter approximates the total added over the last ``time_constant``
+    seconds without keeping the individual events, so updating it costs the
+    same regardless of the window length.
+    """
+
+    def __init__(self, time_constant: float):
+        """
+        Initialize the counters.
+
+        Args:
+            time_constant (float): Seconds for a count to decay to 1/e
+        """
+        self.time_constant = time_constant
+        self._counters: Dict[Hashable, List[float]] = {}
+
+    def __len__(self) -> int:
+        """Number of keys tracked."""
+        return len(self._counters)
+
+    def add(self, key: Hashable, amount: float, now: float) -> float:
+        """
+        Add to a key's counter.
+
+        Args:
+            key (Hashable): Counter key
+            amount (float): Amount added
+            now (float): Current time in seconds
+
+        Returns:
+            Decayed counter value after the addition
+        """
+        counter = self._counters.get(key)
+        if counter is None:
+            self._counters[key] = [amount, now]
+            return amount
+        counter[0] = counter[0] * math.exp((counter[1] - now) / self.time_constant)
+        counter[0] += amount
+        counter[1] = now
+        return counter[0]
+
+    def get(self, key: Hashable, now: float) -> float:
+        """
+        Current value of a key's counter.
+
+        Args:
+            key (Hashable): Counter key
+            now (float): Current time in seconds
+
+        Returns:
+            Decayed counter value, 0 for unknown keys
+        """
+        counter = self._counters.get(key)
+        if counter is None:
+            return 0.0
+        return counter[0] * math.exp((counter[1] - now) / self.time_constant)
+
+    def keys(self) -> List[Hashable]:
+        """Keys tracked."""
+        return list(self._counters)
+
+    def prune(self, now: float, minimum: float = 1.0):
+        """
+        Forget keys whose counters decayed below a minimum.
+
+        Args:
+            now (float): Current time in seconds
+            minimum (float): Smallest value kept
+        """
+        self._counters = {
+            key: counter
+            for key, counter in self._counters.items()
+            if counter[0] * math.exp((counter[1] - now) / self.time_constant) >= minimum
+        }
+
+
+class StreamingAnomalyDetector:
+    """
+    Online anomaly detection over the live packet stream.
+
+    Packet batches are folded into rolling statistics as they are written:
+    an EWMA baseline of each interface's packet rate, a Welford baseline of
+    its packet sizes, time-decayed counters per protocol and per source IP,
+    and sliding-window sketches of the ports and hosts each source probes.
+    Checks run when a batch updates the statistics, so the cost follows
+    the traffic rather than the analysis window, and anomalies are raised
+    within a tick of the traffic that caused them. A raised anomaly is not
+    raised again for the same interface and key until ``cooldown`` expires.
+
+    Time is taken from the packets' capture timestamps rather than the
+    clock, so replayed traffic is judged at its original pace and results
+    do not depend on when batches are processed. Every packet of an
+    interface must reach the same detector; see
+    ``PacketCaptureManager.detection_queue``.
+    """
+
+    def __init__(
+        self,
+        tick_interval: float = 1.0,
+        window: float = 3600.0,
+        cooldown: float = 300.0,
+        warmup_ticks: int = 30,
+        warmup_packets: int = 1000,
+        spike_zscore: float = 4.0,
+        size_zscore: float = 4.0,
+        min_packet_rate: float = 100.0,
+        ip_packet_threshold: float = 1000,
+        ip_byte_threshold: float = 100 * 1024 * 1024,
+        scan_window: float = 60.0,
+        scan_port_threshold: int = 100,
+        scan_host_threshold: int = 50,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            tick_interval (float): Seconds between rate and share checks
+            window (float): Time constant in seconds of the decayed counters
+            cooldown (float): Seconds before an anomaly is raised again
+            warmup_ticks (int): Ticks of baseline before rate spikes count
+            warmup_packets (int): Packets of baseline before size outliers
+                count
+            spike_zscore (float): Packet rate z-score raising a spike
+            size_zscore (float): Packet size z-score counted as an outlier
+            min_packet_rate (float): Packets per second below which rate
+                spikes are ignored
+            ip_packet_threshold (float): Packets from one source IP within
+                the window raising an anomaly
+            ip_byte_threshold (float): Bytes from one source IP within the
+                window raising an anomaly
+            scan_window (float): Seconds of traffic port scans are counted
+                over
+            scan_port_threshold (int): Distinct ports one source probes
+                within the scan window making a vertical scan
+            scan_host_threshold (int): Distinct hosts one source probes
+                within the scan window making a horizontal scan
+        """
+        self.tick_interval = tick_interval
+        self.cooldown = cooldown
+        self.warmup_ticks = warmup_ticks
+        self.warmup_packets = warmup_packets
+        self.spike_zscore = spike_zscore
+        self.size_zscore = size_zscore
+        self.min_packet_rate = min_packet_rate
+        self.ip_packet_threshold = ip_packet_threshold
+        self.ip_byte_threshold = ip_byte_threshold
+
+        self._packet_rates: Dict[str, Ewma] = defaultdict(Ewma)
+        self._packet_sizes: Dict[str, RunningStats] = defaultdict(RunningStats)
+        self._protocols = DecayingCounter(window)
+        self._source_packets = DecayingCounter(window)
+        self._source_bytes = DecayingCounter(window)
+        self._scans = ScanDetector(
+            window=scan_window,
+            port_threshold=scan_port_threshold,
+            host_threshold=scan_host_threshold,
+        )
+
+        # Per-interface totals of the current tick, started by the first batch
+        self._tick_started: Optional[float] = None
+        self._tick_packets: Dict[str, int] = defaultdict(int)
+        self._tick_size_checks: Dict[str, int] = defaultdict(int)
+        self._tick_size_outliers: Dict[str, int] = defaultdict(int)
+
+        # Newest packet time seen, so the detector's clock never runs back
+        self._now: Optional[float] = None
+        self._last_raised: Dict[Tuple[str, str, str], float] = {}
+        self._last_prune = 0.0
+        self._interface_ids: Dict[str, int] = {}
+
+    def process(
+        self, packets: List[Dict[str, Any]], now: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fold a batch of packets into the statistics and raise anomalies.
+
+        Args:
+            packets (List[Dict]): Decoded packet data
+            now (float): Current time in seconds, defaults to the newest
+                packet timestamp of the batch
+
+        Returns:
+            Anomalies raised by this batch
+        """
+        if now is None:
+            if not packets:
+                # Ticks end with the next packet, which sees the whole gap
+                return []
+            now = max(packet_data["timestamp"] for packet_data in packets).timestamp()
+        # Batches from several writers may arrive slightly out of order
+        if self._now is not None and now < self._now:
+            now = self._now
+        self._now = now
+        if self._tick_started is None:
+            self._tick_started = self._last_prune = now
+        protocols: Dict[Tuple[str, str], int] = defaultdict(int)
+        sources: Dict[Tuple[str, str], List[int]] = defaultdict(lambda: [0, 0])
+
+        for packet_data in packets:
+            interface = packet_data["interface"]
+            sample_rate = packet_data.get("sample_rate", 1)
+            size = packet_data["packet_size"]
+            self._tick_packets[interface] += sample_rate
+
+            sizes = self._packet_sizes[interface]
+            if sizes.count >= self.warmup_packets:
+                self._tick_size_checks[interface] += 1
+                if abs(sizes.zscore(size)) > self.size_zscore:
+                    self._tick_size_outliers[interface] += 1
+            sizes.update(size)
+
+            protocols[(interface, packet_data["protocol"])] += sample_rate
+            source = sources[(interface, packet_data["source_ip"])]
+            source[0] += sample_rate
+            source[1] += size * sample_rate
+
+        anomalies = []
+        for key, count in protocols.items():
+            self._protocols.add(key, count, now)
+        for key, (count, byte_count) in sources.items():
+            interface, source_ip = key
+            packet_total = self._source_packets.add(key, count, now)
+            byte_total = self._source_bytes.add(key, byte_count, now)
+            if packet_total > self.ip_packet_threshold:
+                anomalies.append(
+                    self._anomaly(
+                        interface,
+                        "IP Behavior",
+                        f"High packet count from {source_ip}: "
+                        f"{packet_total:.0f} packets",
+                        "high",
+                        source_ip,
+                    )
+                )
+            if byte_total > self.ip_byte_threshold:
+                anomalies.append(
+                    self._anomaly(
+                        interface,
+                        "IP Behavior",
+                        f"Large data transfer from {source_ip}: "
+                        f"{byte_total:.0f} bytes",
+                        "medium",
+                        f"{source_ip} bytes",
+                    )
+                )
+
+        for scan in self._scans.update(packets, now):
+            anomalies.append(
+                self._anomaly(
+                    scan["interface"],
+                    "Port Scan",
+                    describe_scan(
+                        scan["kind"], scan["source_ip"], scan["ports"], scan["hosts"]
+                    ),
+                    "high",
+                    scan["source_ip"],
+                )
+            )
+
+        if now - self._tick_started >= self.tick_interval:
+            anomalies.extend(self._end_tick(now))
+
+        anomalies = [anomaly for anomaly in anomalies if self._due(anomaly, now)]
+        if anomalies:
+            self._save(anomalies)
+        return anomalies
+
+    def _end_tick(self, now: float) -> List[Dict[str, Any]]:
+        """
+        Check the rates and shares of the tick that just ended.
+
+        Args:
+            now (float): Current time in seconds
+
+        Returns:
+            Anomalies found
+        """
+        elapsed = now - self._tick_started
+        anomalies = []
+
+        for interface in set(self._packet_rates) | set(self._tick_packets):
+            rate = self._tick_packets.get(interface, 0) / elapsed
+            baseline = self._packet_rates[interface]
+            warmed_up = baseline.count >= self.warmup_ticks
+            # Packet counts vary at least like a Poisson process
+            zscore = baseline.update(rate, min_std=math.sqrt(max(baseline.mean, 1.0)))
+            if warmed_up and zscore > self.spike_zscore and rate > self.min_packet_rate:
+                anomalies.append(
+                    self._anomaly(
+                        interface,
+                        "Traffic Spike",
+                        f"Packet rate on {interface} rose to {rate:.0f}/s "
+                        f"against a baseline of {baseline.mean:.0f}/s",
+                        "critical" if zscore > 2 * self.spike_zscore else "high",
+                    )
+                )
+
+        for interface, checked in self._tick_size_checks.items():
+            outliers = self._tick_size_outliers.get(interface, 0)
+            if checked >= 100 and outliers / checked > 0.05:
+                anomalies.append(
+                    self._anomaly(
+                        interface,
+                        "Traffic Volume",
+                        f"Detected {outliers} unusual packet sizes on {interface}",
+                        "medium",
+                    )
+                )
+
+        totals: Dict[str, float] = defaultdict(float)
+        shares: Dict[Tuple[str, str], float] = {}
+        for key in self._protocols.keys():
+            shares[key] = self._protocols.get(key, now)
+            totals[key[0]] += shares[key]
+        for (interface, protocol), count in shares.items():
+            if totals[interface] < self.warmup_packets:
+                continue
+            percentage = count / totals[interface] * 100
+            if protocol == "TCP" and percentage > 90:
+                anomalies.append(
+                    self._anomaly(
+                        interface,
+                        "Protocol Distribution",
+                        f"Unusually high TCP traffic: {percentage:.2f}%",
+                        "medium",
+                        protocol,
+                    )
+                )
+            if protocol == "UDP" and percentage > 50:
+                anomalies.append(
+                    self._anomaly(
+                        interface,
+                        "Protocol Distribution",
+                        f"Unusually high UDP traffic: {percentage:.2f}%",
+                        "low",
+                        protocol,
+                    )
+                )
+
+        self._tick_started = now
+        self._tick_packets.clear()
+        self._tick_size_checks.clear()
+        self._tick_size_outliers.clear()
+
+        if now - self._last_prune >= 60.0:
+            for counter in (self._protocols, self._source_packets, self._source_bytes):
+                counter.prune(now)
+            # Forget cooldowns that expired, so sources seen once do not pile up
+            self._last_raised = {
+                key: raised
+                for key, raised in self._last_raised.items()
+                if now - raised < self.cooldown
+            }
+            self._last_prune = now
+        return anomalies
+
+    @staticmethod
+    def _anomaly(
+        interface: str,
+        anomaly_type: str,
+        description: str,
+        severity: str,
+        key: str = "",
+    ) -> Dict[str, Any]:
+        """
+        Describe an anomaly.
+
+        Args:
+            interface (str): Interface the anomaly was seen on
+            anomaly_type (str): Anomaly type
+            description (str): Human readable description
+            severity (str): One of the NetworkAnomaly severities
+            key (str): What the anomaly is about, for the cooldown
+
+        Returns:
+            Anomaly dictionary
+        """
+        return {
+            "interface": interface,
+            "type": anomaly_type,
+            "description": description,
+            "severity": severity,
+            "key": key,
+        }
+
+    def _due(self, anomaly: Dict[str, Any], now: float) -> bool:
+        """
+        Check an anomaly is not in its cooldown, and start the cooldown.
+
+        Args:
+            anomaly (Dict): Anomaly dictionary
+            now (float): Current time in seconds
+
+        Returns:
+            True if the anomaly should be raised
+        """
+        key = (anomaly["interface"], anomaly["type"], anomaly["key"])
+        last = self._last_raised.get(key)
+        if last is not None and now - last < self.cooldown:
+            return False
+        self._last_raised[key] = now
+        return True
+
+    def _save(self, anomalies: List[Dict[str, Any]]):
+        """
+        Store raised anomalies.
+
+        Args:
+            anomalies (List[Dict]): Anomaly dictionaries
+        """
+        for anomaly in anomalies:
+            interface_id = self._interface_ids.get(anomaly["interface"])
+            if interface_id is None:
+                interface, _ = NetworkInterface.objects.get_or_create(
+                    name=anomaly["interface"]
+                )
+                interface_id = self._interface_ids[anomaly["interface"]] = interface.pk
+            NetworkAnomaly.objects.create(
+                interface_id=interface_id,
+                anomaly_type=anomaly["type"],
+                description=anomaly["description"],
+                severity=anomaly["severity"],
+            )
+        logger.info(f"Streaming detection raised {len(anomalies)} anomalies")
@@ -1,26 +1,42 @@
+import logging
 import time
+from typing import Any, Dict, Optional
 
 import psutil
+from django.conf import settings
+from django.core.cache import cache
 
 from .models import SystemStat
 from .utils import broadcast_update
 
+logger = logging.getLogger(__name__)
 
-def get_system_stats():
-    # Get CPU usage with a shorter interval
-    cpu_usage = psutil.cpu_percent(interval=0.1)
+SYSTEM_STATS_CACHE_KEY = "netcreep:system_stats"
+# Snapshots older than this are no longer served
+SYSTEM_STATS_CACHE_TIMEOUT = 30
 
-    # Get memory information
-    memory = psutil.virtual_memory()
+# Latest snapshot seen by this process
+_snapshot: Optional[Dict[str, Any]] = None
 
-    # Get disk information
-    disk = psutil.disk_usage("/")
+# cpu_percent(interval=None) measures since its previous call; start the
+# first measurement period now rather than on the first sample
+psutil.cpu_percent(interval=None)
 
-    # Get network information
-    network = psutil.net_io_counters()
 
-    stats = {
-        "cpu_usage": cpu_usage,
+def collect_system_stats() -> Dict[str, Any]:
+    """
+    Read the current system metrics without blocking.
+
+    Returns:
+        Dictionary of CPU, memory and disk usage, network counters and the
+        sample time
+    """
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage("/")
+    network = psutil.net_io_counters()
+    return {
+        # CPU usage since the previous sample
+        "cpu_usage": psutil.cpu_percent(interval=None),
         "memory_usage": memory.percent,
         "disk_usage": disk.percent,
         "network_io": {
@@ -30,26 +46,91 @@ def get_system_stats():
         "timestamp": time.time(),
     }
 
-    # Save to database (but not too frequently)
+
+def publish_system_stats(stats: Dict[str, Any], timeout: float):
+    """
+    Share a system stats snapshot with other processes through the cache.
+
+    Args:
+        stats (Dict): Snapshot from ``collect_system_stats``
+        timeout (float): Seconds the snapshot is served for
+    """
+    global _snapshot
+    _snapshot = stats
+    try:
+        cache.set(SYSTEM_STATS_CACHE_KEY, stats, timeout)
+    except Exception as e:
+        logger.debug(f"Could not publish system stats: {e}")
+
+
+def get_system_stats() -> Dict[str, Any]:
+    """
+    Latest system stats snapshot.
+
+    Served from this process's copy while it is younger than
+    ``SYSTEM_STATS_INTERVAL``, then from the snapshot the sampler publishes
+    to the cache. Without a running sampler, one process samples and
+    shares the result for an interval, so request rates never drive
+    sampling.
+
+    Returns:
+        Snapshot from ``collect_system_stats``
+    """
+    global _snapshot
+    stats = _snapshot
+    if stats is not None and time.time() - stats["timestamp"] < (
+        settings.SYSTEM_STATS_INTERVAL
+    ):
+        return stats
+
     try:
-        latest_stat = SystemStat.objects.latest("timestamp")
-        time_diff = time.time() - latest_stat.timestamp.timestamp()
-        if time_diff > 60:  # Save only every minute
+        stats = cache.get(SYSTEM_STATS_CACHE_KEY)
+    except Exception as e:
+        logger.debug(f"Could not read system stats: {e}")
+        stats = None
+    if stats is None:
+        stats = collect_system_stats()
+        publish_system_stats(stats, settings.SYSTEM_STATS_INTERVAL)
+    _snapshot = stats
+    return stats
+
+
+class SystemStatsSampler:
+    """
+    Sample system metrics on a fixed cadence.
+
+    Each sample is published to the cache for the web processes, and a
+    SystemStat row is stored every ``save_interval`` seconds for the
+    history charts.
+    """
+
+    def __init__(self, save_interval: float = 60.0):
+        """
+        Initialize the sampler.
+
+        Args:
+            save_interval (float): Minimum seconds between stored rows
+        """
+        self.save_interval = save_interval
+        self._last_saved = 0.0
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        Take, publish and possibly store one sample.
+
+        Returns:
+            The sample
+        """
+        stats = collect_system_stats()
+        publish_system_stats(stats, SYSTEM_STATS_CACHE_TIMEOUT)
+
+        if time.monotonic() - self._last_saved >= self.save_interval:
             SystemStat.objects.create(
                 cpu_usage=stats["cpu_usage"],
                 memory_usage=stats["memory_usage"],
                 disk_usage=stats["disk_usage"],
                 network_in=stats["network_io"]["bytes_recv"],
-                network_out=stats["network_io"]["bytes_sent"]
+                network_out=stats["network_io"]["bytes_sent"],
             )
-    except SystemStat.DoesNotExist:
-        # If no previous stat exists, create one
-        SystemStat.objects.create(
-            cpu_usage=stats["cpu_usage"],
-            memory_usage=stats["memory_usage"],
-            disk_usage=stats["disk_usage"],
-            network_in=stats["network_io"]["bytes_recv"],
-            network_out=stats["network_io"]["bytes_sent"]
-        )
-
-    return stats
+            self._last_saved = time.monotonic()
+        return stats
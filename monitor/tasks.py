@@ -0,0 +1,76 @@
+import logging
+
+from django.conf import settings
+
+from .anomaly_detector import run_anomaly_detection
+from .partitions import PacketPartitions
+from .retention import FlowRetention, PacketRetention, retention_enforced_by_capture
+from .scheduler import Scheduler
+from .system_monitor import SystemStatsSampler
+
+logger = logging.getLogger(__name__)
+
+system_stats_sampler = SystemStatsSampler()
+
+
+def detect_anomalies():
+    """Run batch anomaly detection over the last hour of packets."""
+    run_anomaly_detection(time_window_hours=1)
+
+
+def sample_system_stats():
+    """Sample and publish system metrics, storing a SystemStat row every minute."""
+    system_stats_sampler.sample()
+
+
+def cleanup_packets():
+    """
+    Delete packets and flows over the configured count and age limits.
+
+    Tables whose retention a running capture enforces are left to it.
+    """
+    if retention_enforced_by_capture("packet"):
+        logger.debug("Packet cleanup skipped: the capture enforces retention")
+    else:
+        deleted = PacketRetention(
+            max_packets=settings.MAX_PACKET_STORE,
+            max_age_hours=settings.PACKET_RETENTION_HOURS,
+        ).enforce()
+        if deleted:
+            logger.info(f"Packet cleanup deleted {deleted} packets")
+    if (
+        settings.MAX_FLOW_STORE or settings.FLOW_RETENTION_HOURS
+    ) and not retention_enforced_by_capture("flow"):
+        deleted = FlowRetention(
+            max_flows=settings.MAX_FLOW_STORE,
+            max_age_hours=settings.FLOW_RETENTION_HOURS,
+        ).enforce()
+        if deleted:
+            logger.info(f"Packet cleanup deleted {deleted} flows")
+
+
+def create_packet_partitions():
+    """Create the packet table partitions for the coming days."""
+    created = PacketPartitions(days=settings.PACKET_PARTITION_DAYS).ensure()
+    if created:
+        logger.info(f"Created {created} packet partitions")
+
+
+def register_jobs(scheduler: Scheduler):
+    """
+    Register the periodic jobs with their configured intervals.
+
+    Args:
+        scheduler (Scheduler): Scheduler the jobs are added to
+    """
+    scheduler.add_job(
+        "detect_anomalies", detect_anomalies, settings.ANOMALY_DETECTION_INTERVAL
+    )
+    scheduler.add_job(
+        "sample_system_stats", sample_system_stats, settings.SYSTEM_STATS_INTERVAL
+    )
+    scheduler.add_job(
+        "cleanup_packets", cleanup_packets, settings.PACKET_CLEANUP_INTERVAL
+    )
+    if settings.PACKET_PARTITION_DAYS:
+        scheduler.add_job("create_packet_partitions", create_packet_partitions, 3600)
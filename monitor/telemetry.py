@@ -0,0 +1,129 @@
+import logging
+import multiprocessing
+from typing import Any, Dict, Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Bucket i counts values below 2**i (and at least 2**(i-1))
+HISTOGRAM_BUCKETS = 48
+
+TELEMETRY_CACHE_KEY = "netcreep:capture_telemetry"
+TELEMETRY_CACHE_TIMEOUT = 60
+
+
+class SharedHistogram:
+    """
+    Power-of-two histogram of non-negative integers in shared memory.
+
+    Every recording process owns one row, so recording is three array
+    updates without a lock; readers merge the rows. Percentiles are
+    reported as the upper bound of their bucket, within a factor of two.
+    """
+
+    def __init__(self, rows: int):
+        """
+        Initialize the histogram.
+
+        Args:
+            rows (int): Number of recording processes
+        """
+        self.rows = rows
+        # Per row: bucket counts, then total count and sum of values
+        self._stride = HISTOGRAM_BUCKETS + 2
+        self._values = multiprocessing.RawArray("q", rows * self._stride)
+
+    def record(self, row: int, value: int):
+        """
+        Add a value to a row.
+
+        Args:
+            row (int): Row owned by the calling process
+            value (int): Non-negative value, e.g. a duration in nanoseconds
+        """
+        base = row * self._stride
+        values = self._values
+        values[base + min(value.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+        values[base + HISTOGRAM_BUCKETS] += 1
+        values[base + HISTOGRAM_BUCKETS + 1] += value
+
+    def summary(self, scale: float = 1.0) -> Dict[str, Any]:
+        """
+        Merge all rows into count, mean and percentiles.
+
+        Args:
+            scale (float): Factor applied to reported values, e.g. 1e-6 to
+                report nanoseconds as milliseconds
+
+        Returns:
+            Dictionary with count, mean, p50, p90, p99 and max
+        """
+        buckets = [0] * HISTOGRAM_BUCKETS
+        count = 0
+        total = 0
+        for row in range(self.rows):
+            base = row * self._stride
+            for bucket in range(HISTOGRAM_BUCKETS):
+                buckets[bucket] += self._values[base + bucket]
+            count += self._values[base + HISTOGRAM_BUCKETS]
+            total += self._values[base + HISTOGRAM_BUCKETS + 1]
+
+        summary = {"count": count, "mean": total / count * scale if count else None}
+        for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            summary[name] = self._percentile(buckets, count, fraction, scale)
+        summary["max"] = self._percentile(buckets, count, 1.0, scale)
+        return summary
+
+    @staticmethod
+    def _percentile(
+        buckets: list, count: int, fraction: float, scale: float
+    ) -> Optional[float]:
+        """
+        Upper bound of the bucket holding a percentile.
+
+        Args:
+            buckets (list): Merged bucket counts
+            count (int): Total number of values
+            fraction (float): Percentile as a fraction
+            scale (float): Factor applied to the result
+
+        Returns:
+            Scaled bucket bound, None for an empty histogram
+        """
+        if not count:
+            return None
+        rank = max(1, round(count * fraction))
+        seen = 0
+        for bucket, bucket_count in enumerate(buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return (1 << bucket) * scale
+        return (1 << (HISTOGRAM_BUCKETS - 1)) * scale
+
+
+def publish_telemetry(telemetry: Dict[str, Any]):
+    """
+    Share a telemetry snapshot with other processes through the cache.
+
+    Args:
+        telemetry (Dict): Snapshot from ``PacketCaptureManager.get_telemetry``
+    """
+    try:
+        cache.set(TELEMETRY_CACHE_KEY, telemetry, TELEMETRY_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.debug(f"Could not publish capture telemetry: {e}")
+
+
+def get_published_telemetry() -> Optional[Dict[str, Any]]:
+    """
+    Get the latest telemetry snapshot published by a capture.
+
+    Returns:
+        Telemetry snapshot, None if no capture published one recently
+    """
+    try:
+        return cache.get(TELEMETRY_CACHE_KEY)
+    except Exception as e:
+        logger.debug(f"Could not read capture telemetry: {e}")
+        return None
@@ -0,0 +1,98 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from monitor.anomaly_detector import AdvancedAnomalyDetector
+from monitor.models import NetworkAnomaly, NetworkInterface, Packet
+from monitor.rollups import TrafficRollups
+
+
+class TestAdvancedAnomalyDetector(TestCase):
+    def setUp(self):
+        interface = NetworkInterface.objects.create(name="eth0")
+        timestamp = timezone.now() - timezone.timedelta(minutes=5)
+        packets = [
+            Packet(
+                timestamp=timestamp,
+                interface=interface,
+                protocol="UDP",
+                source_ip="10.0.0.1",
+                destination_ip="10.0.0.53",
+                source_port=40000,
+                destination_port=1 + i,
+                packet_size=100,
+            )
+            for i in range(1200)
+        ] + [
+            Packet(
+                timestamp=timestamp,
+                interface=interface,
+                protocol="TCP",
+                source_ip="10.0.0.2",
+                destination_ip="10.0.0.80",
+                source_port=50000,
+                destination_port=443,
+                packet_size=1500,
+            )
+            for _ in range(20)
+        ]
+        # A client's data packets to many HTTPS hosts and a SYN sweep
+        packets += [
+            Packet(
+                timestamp=timestamp,
+                interface=interface,
+                protocol="TCP",
+                source_ip=source_ip,
+                destination_ip=f"10.1.0.{host}",
+                source_port=50000 + host,
+                destination_port=443,
+                packet_size=60,
+                tcp_flags=flags,
+            )
+            for source_ip, flags in (("10.0.0.3", 0x18), ("10.0.0.4", 0x02))
+            for host in range(60)
+        ]
+        Packet.objects.bulk_create(packets)
+
+        rollups = TrafficRollups()
+        rollups.add(
+            {
+                "timestamp": packet.timestamp,
+                "protocol": packet.protocol,
+                "source_ip": packet.source_ip,
+                "destination_port": packet.destination_port,
+                "packet_size": packet.packet_size,
+            }
+            for packet in packets
+        )
+        rollups.flush()
+
+    def test_vectorized_matches_per_object_path(self):
+        """Test the NumPy batch path finds the same anomalies."""
+        per_object = AdvancedAnomalyDetector.detect_network_anomalies()
+        vectorized = AdvancedAnomalyDetector.detect_network_anomalies(
+            vectorized=True, chunk_size=500
+        )
+
+        def key(anomaly):
+            return anomaly["description"]
+
+        assert sorted(vectorized, key=key) == sorted(per_object, key=key)
+        scans = [
+            anomaly["description"]
+            for anomaly in vectorized
+            if anomaly["type"] == "Port Scan"
+        ]
+        assert any("from 10.0.0.4:" in scan for scan in scans)
+        assert not any("from 10.0.0.3:" in scan for scan in scans)
+        assert {anomaly["type"] for anomaly in vectorized} == {
+            "Protocol Distribution",
+            "Traffic Volume",
+            "IP Behavior",
+            "Port Scan",
+        }
+
+        AdvancedAnomalyDetector.save_anomalies(vectorized)
+        assert NetworkAnomaly.objects.filter(
+            interface=None, anomaly_type="Port Scan", severity="high"
+        ).exists()
+        assert not NetworkInterface.objects.filter(name="all").exists()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from django.test import TestCase
+from django.utils import timezone
+
+from monitor.columnar_export import export_columnar, write_npz
+from monitor.models import NetworkInterface, Packet
+
+
+class TestColumnarExport(TestCase):
+    def test_npz_export_round_trip(self):
+        """Test packets are exported in chunks as typed columns."""
+        interface = NetworkInterface.objects.create(name="eth0")
+        now = timezone.now()
+        for i in range(5):
+            Packet.objects.create(
+                timestamp=now - timedelta(seconds=5 - i),
+                interface=interface,
+                protocol="UDP" if i % 2 else "TCP",
+                source_ip=f"10.0.0.{i}",
+                destination_ip="10.0.0.254",
+                source_port=None if i == 0 else 40000 + i,
+                destination_port=53,
+                packet_size=100 + i,
+            )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "packets.npz")
+            rows = export_columnar(
+                "packets",
+                path,
+                export_format="npz",
+                start=now - timedelta(seconds=4),
+                chunk_size=2,
+            )
+            assert rows == 4
+            with np.load(path) as columns:
+                assert columns["packet_size"].tolist() == [101, 102, 103, 104]
+                assert columns["source_port"].tolist() == [40001, 40002, 40003, 40004]
+                protocols = columns["protocol_labels"][columns["protocol"]]
+                assert protocols.tolist() == ["UDP", "TCP", "UDP", "TCP"]
+                assert columns["interface_labels"].tolist() == ["eth0"]
+                seconds = columns["timestamp"] // 10**9
+                assert seconds[-1] == int((now - timedelta(seconds=1)).timestamp())
+
+    def test_npz_text_codes_span_chunks_and_keep_nulls(self):
+        """Test text labels are shared across frames and NULLs stay -1."""
+        frames = [
+            pd.DataFrame({"protocol": pd.array(["TCP", None, "TCP"], dtype="string")}),
+            pd.DataFrame({"protocol": pd.array(["UDP", "TCP"], dtype="string")}),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "protocols.npz")
+            assert write_npz(iter(frames), path) == 5
+            with np.load(path) as columns:
+                assert columns["protocol"].tolist() == [0, -1, 0, 1, 0]
+                assert columns["protocol_labels"].tolist() == ["TCP", "UDP"]
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from monitor import dashboard_publisher
+from monitor.dashboard_publisher import DashboardPublisher
+from monitor.models import NetworkInterface, Packet
+
+
+def _stats(timestamp, bytes_recv):
+    return {
+        "cpu_usage": 10.0,
+        "memory_usage": 20.0,
+        "disk_usage": 30.0,
+        "network_io": {"bytes_sent": 0, "bytes_recv": bytes_recv},
+        "timestamp": timestamp,
+    }
+
+
+class TestDashboardPublisher(TestCase):
+    def test_only_changed_sections_are_broadcast(self):
+        """Test each tick sends one delta with the sections that changed."""
+        interface = NetworkInterface.objects.create(name="eth0")
+        publisher = DashboardPublisher()
+        patches = [
+            mock.patch.object(dashboard_publisher, "get_system_stats"),
+            mock.patch.object(
+                dashboard_publisher, "get_published_telemetry", return_value=None
+            ),
+            mock.patch.object(dashboard_publisher, "broadcast_update"),
+        ]
+        stats, _, broadcast = [patch.start() for patch in patches]
+        for patch in patches:
+            self.addCleanup(patch.stop)
+
+        stats.return_value = _stats(100.0, 1000)
+        publisher.publish()
+        first = broadcast.call_args[0][0]
+        assert set(first) == {"system_stats", "capture_telemetry", "recent_packets"}
+        assert first["system_stats"]["network_in"] == 0.0
+
+        # Nothing changed: the same snapshot is not sent again
+        publisher.publish()
+        assert broadcast.call_count == 1
+
+        stats.return_value = _stats(102.0, 5000)
+        Packet.objects.create(
+            interface=interface,
+            source_ip="10.0.0.1",
+            destination_ip="10.0.0.2",
+            source_port=40000,
+            destination_port=443,
+            protocol="TCP",
+            packet_size=60,
+        )
+        publisher.publish()
+        update = broadcast.call_args[0][0]
+        assert set(update) == {"system_stats", "recent_packets"}
+        assert update["system_stats"]["network_in"] == 2000.0
+        assert update["recent_packets"][0]["source"] == "10.0.0.1:40000"
+        assert publisher.state["capture_telemetry"] is None
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_one_process_publishes_to_a_shared_layer(self):
+        """Test only the lease holder sends and others serve its state."""
+        shared = mock.patch.object(
+            DashboardPublisher, "shared", new_callable=mock.PropertyMock
+        )
+        shared.start().return_value = True
+        self.addCleanup(shared.stop)
+        first, second = DashboardPublisher(), DashboardPublisher()
+
+        assert set(first.tick()) == {
+            "system_stats",
+            "capture_telemetry",
+            "recent_packets",
+        }
+        assert second.tick() == {}
+        assert second.current_state() == first.state
+
+        # Once the holder stops, the next process sends the full state
+        first.release_lease()
+        assert set(second.tick()) == set(first.state)
+        assert first.tick() == {}
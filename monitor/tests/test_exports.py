@@ -0,0 +1,118 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+import warnings
+from datetime import timedelta
+from unittest import mock
+
+from django.core import signals
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections
+from django.test import TestCase
+from django.utils import timezone
+
+from monitor.models import NetworkInterface, Packet
+
+
+class TestPacketExports(TestCase):
+    def setUp(self):
+        interface = NetworkInterface.objects.create(name="eth0")
+        now = timezone.now()
+        for minutes, protocol in [(1, "TCP"), (2, "UDP"), (90, "TCP")]:
+            Packet.objects.create(
+                timestamp=now - timedelta(minutes=minutes),
+                interface=interface,
+                protocol=protocol,
+                source_ip="10.0.0.1",
+                destination_ip="10.0.0.2",
+                source_port=40000,
+                destination_port=443,
+                packet_size=100,
+            )
+
+    def export(self, export_format, **params):
+        response = self.client.get(
+            f"/monitor/packet-history/export/{export_format}/",
+            params,
+            HTTP_HOST="localhost",
+        )
+        assert response.status_code == 200
+        assert response.streaming
+        return b"".join(response.streaming_content)
+
+    def test_formats_and_filters(self):
+        """Test every format streams the packets matching the filters."""
+        since = (timezone.now() - timedelta(hours=1)).isoformat()
+
+        rows = list(csv.reader(io.StringIO(self.export("csv").decode())))
+        assert rows[0][0] == "Timestamp"
+        assert len(rows) == 4
+
+        packets = json.loads(self.export("json", start=since))
+        assert [packet["protocol"] for packet in packets] == ["TCP", "UDP"]
+        assert packets[0]["summary"] == "TCP packet from 10.0.0.1:40000"
+        assert json.loads(self.export("json", protocol="icmp")) == []
+
+        lines = self.export("ndjson", start=since, protocol="tcp").splitlines()
+        assert [json.loads(line)["protocol"] for line in lines] == ["TCP"]
+
+        compressed = self.export("ndjson", gzip="1")
+        assert len(gzip.decompress(compressed).splitlines()) == 3
+
+    def test_invalid_time_filter(self):
+        """Test an unparsable time filter is rejected."""
+        response = self.client.get(
+            "/monitor/packet-history/export/csv/",
+            {"start": "yesterday"},
+            HTTP_HOST="localhost",
+        )
+        assert response.status_code == 400
+
+    async def test_streams_incrementally_under_asgi(self):
+        """Test the ASGI handler sends one message per batch, unbuffered."""
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "method": "GET",
+            "scheme": "http",
+            "path": "/monitor/packet-history/export/ndjson/",
+            "query_string": b"",
+            "headers": [(b"host", b"localhost")],
+            "server": ("localhost", 80),
+        }
+        requested = False
+        disconnected = asyncio.Event()
+        messages = []
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+
+        # Keep the test transaction's connection open, as the test client does
+        signals.request_finished.disconnect(close_old_connections)
+        try:
+            with mock.patch("monitor.exports.ROWS_PER_WRITE", 1), mock.patch(
+                "monitor.exports.EXPORT_CHUNK_SIZE", 2
+            ), warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                await ASGIHandler()(scope, receive, send)
+        finally:
+            signals.request_finished.connect(close_old_connections)
+
+        assert messages[0]["status"] == 200
+        chunks = [m.get("body") for m in messages[1:] if m.get("body")]
+        assert [json.loads(chunk)["protocol"] for chunk in chunks] == [
+            "TCP",
+            "UDP",
+            "TCP",
+        ]
+        assert not [w for w in caught if "StreamingHttpResponse" in str(w.message)]
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from monitor.flow_table import FlowTable
+
+
+def make_packet(timestamp, reverse=False, size=100, tcp_flags=0x10):
+    source = ("10.0.0.1", 40000)
+    destination = ("10.0.0.2", 443)
+    if reverse:
+        source, destination = destination, source
+    return {
+        "interface": "eth0",
+        "timestamp": timestamp,
+        "protocol": "TCP",
+        "source_ip": source[0],
+        "source_port": source[1],
+        "destination_ip": destination[0],
+        "destination_port": destination[1],
+        "packet_size": size,
+        "tcp_flags": tcp_flags,
+    }
+
+
+class TestFlowTable:
+    def test_bidirectional_flow(self):
+        """Test both directions update one flow keyed on the initiator."""
+        table = FlowTable(idle_timeout=30)
+        start = timezone.now()
+        table.update(
+            [
+                make_packet(start, tcp_flags=0x02),
+                make_packet(start + timedelta(seconds=1), reverse=True, size=60),
+                dict(make_packet(start + timedelta(seconds=2)), sample_rate=4),
+            ]
+        )
+        assert len(table) == 1
+        assert table.expire(start + timedelta(seconds=10)) == []
+
+        (flow,) = table.expire(start + timedelta(seconds=40))
+        assert flow["source_ip"] == "10.0.0.1"
+        assert flow["packets"] == 5
+        assert flow["bytes"] == 500
+        assert flow["reverse_packets"] == 1
+        assert flow["reverse_bytes"] == 60
+        assert flow["tcp_flags"] == 0x12
+        assert flow["last_seen"] - flow["first_seen"] == timedelta(seconds=2)
+        assert len(table) == 0
+
+    def test_active_timeout_splits_flow(self):
+        """Test a long flow is written in records of at most active_timeout."""
+        table = FlowTable(idle_timeout=30, active_timeout=60)
+        start = timezone.now()
+        table.update(
+            make_packet(start + timedelta(seconds=20 * i), reverse=i % 2)
+            for i in range(5)
+        )
+
+        (first,) = table.expire(start)
+        assert first["packets"] + first["reverse_packets"] == 3
+        (second,) = table.flush()
+        assert second["source_ip"] == "10.0.0.1"
+        assert second["packets"] + second["reverse_packets"] == 2
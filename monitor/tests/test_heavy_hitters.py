@@ -0,0 +1,43 @@
+import random
+from collections import Counter
+
+from monitor.heavy_hitters import HeavyHitters
+from monitor.sketches import SpaceSaving
+
+
+class TestHeavyHitters:
+    def test_space_saving_keeps_heavy_keys(self):
+        """Test heavy keys survive a long tail and counts bound the truth."""
+        rng = random.Random(1)
+        stream = [f"heavy{i}" for i in range(5) for _ in range(2000)]
+        stream += [f"tail{rng.randrange(50000)}" for _ in range(20000)]
+        rng.shuffle(stream)
+
+        summary = SpaceSaving(capacity=100)
+        for offset in range(0, len(stream), 500):
+            batch = Counter(stream[offset : offset + 500])
+            summary.update({key: (count, count) for key, count in batch.items()})
+
+        assert len(summary) == 100
+        top = summary.top(5)
+        assert {key for key, *_ in top} == {f"heavy{i}" for i in range(5)}
+        for key, count, error, _ in top:
+            assert count - error <= 2000 <= count
+
+    def test_snapshot_counts_packets_and_bytes(self):
+        """Test snapshots rank keys by sample-weighted packets."""
+        packet = {
+            "source_ip": "10.0.0.1",
+            "destination_ip": "10.0.0.2",
+            "destination_port": 443,
+            "packet_size": 100,
+        }
+        heavy_hitters = HeavyHitters(capacity=10)
+        heavy_hitters.add(
+            [packet, dict(packet, source_ip="10.0.0.9", sample_rate=4)]
+            + [dict(packet, destination_port=None)]
+        )
+        fields = heavy_hitters.snapshot()["fields"]
+        assert [entry[0] for entry in fields["source_ip"]] == ["10.0.0.9", "10.0.0.1"]
+        key, packets, error, byte_count = fields["destination_port"][0]
+        assert (key, round(packets), error, round(byte_count)) == ("443", 5, 0, 500)
@@ -0,0 +1,67 @@
+import pytest
+from django.utils import timezone
+
+from monitor.packet_ring import RECORD, PacketRing
+
+
+def make_packet(index, source_ip="192.168.1.100", destination_ip="10.0.0.1"):
+    return {
+        "interface": "eth1",
+        "timestamp": timezone.now(),
+        "protocol": "TCP",
+        "source_ip": source_ip,
+        "destination_ip": destination_ip,
+        "source_port": 1024 + index,
+        "destination_port": 443,
+        "packet_size": 60 + index,
+        "sample_rate": 1,
+        "tcp_flags": 0x18,
+    }
+
+
+class TestPacketRing:
+    def test_round_trip(self):
+        """Test packets survive encoding into fixed-width records."""
+        ring = PacketRing(capacity=4, interfaces=["eth0", "eth1"])
+        ipv4 = make_packet(0)
+        ipv6 = dict(
+            make_packet(1, "fe80::1", "2001:db8::2"),
+            protocol="ICMP",
+            source_port=None,
+            destination_port=None,
+            sample_rate=8,
+            tcp_flags=0,
+        )
+
+        assert ring.put(ipv4) and ring.put(ipv6)
+        assert len(ring) == 2
+        decoded = ring.get_batch()
+
+        assert len(ring) == 0
+        for original, packet in zip((ipv4, ipv6), decoded):
+            drift = packet.pop("timestamp") - original["timestamp"]
+            assert abs(drift.total_seconds()) < 1e-6
+            original = dict(original)
+            original.pop("timestamp")
+            assert packet == original
+        assert RECORD.size == 56
+
+    def test_full_ring_and_wraparound(self):
+        """Test a full ring rejects records and reads wrap around the buffer."""
+        ring = PacketRing(capacity=3, interfaces=["eth1"])
+        assert all(ring.put(make_packet(i)) for i in range(3))
+        assert not ring.put(make_packet(3))
+
+        assert [p["packet_size"] for p in ring.get_batch(2)] == [60, 61]
+        assert ring.put(make_packet(4)) and ring.put(make_packet(5))
+        assert [p["packet_size"] for p in ring.get_batch()] == [62, 64, 65]
+
+    def test_takes_epoch_timestamps_and_rejects_unknown_interfaces(self):
+        """Test compact packets are accepted and foreign interfaces refused."""
+        ring = PacketRing(capacity=2, interfaces=["eth1"])
+        assert ring.put(dict(make_packet(0), timestamp=1700000000.5))
+        assert ring.get_batch()[0]["timestamp"].timestamp() == 1700000000.5
+
+        with pytest.raises(ValueError):
+            ring.put(dict(make_packet(1), interface="eth9"))
+        assert len(ring) == 0
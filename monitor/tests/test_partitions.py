@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from monitor.models import Packet
+from monitor.partitions import PacketPartitions
+
+
+class TestPacketPartitions(TestCase):
+    def test_plain_table_outside_postgresql(self):
+        """Test partitioning is a no-op on databases without it."""
+        partitions = PacketPartitions()
+        if partitions.supported:
+            self.skipTest("Runs against databases without partitioning")
+        assert not partitions.is_partitioned()
+        assert partitions.ensure() == 0
+        assert partitions.drop_before(timezone.now()) == 0
+
+    def test_time_range_queries_use_indexes(self):
+        """Test time filtered queries by source and port are served by indexes."""
+        if connection.vendor != "sqlite":
+            self.skipTest("Query plans are checked on SQLite")
+        since = timezone.now() - timedelta(hours=1)
+        queries = [
+            Packet.objects.filter(timestamp__gte=since),
+            Packet.objects.filter(source_ip="10.0.0.1", timestamp__gte=since),
+            Packet.objects.filter(destination_port=443, timestamp__gte=since),
+        ]
+        for queryset, index in zip(
+            queries,
+            [
+                "packet_timestamp_idx",
+                "packet_source_ip_time_idx",
+                "packet_dst_port_time_idx",
+            ],
+        ):
+            assert index in queryset.explain()
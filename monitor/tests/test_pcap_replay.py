@@ -0,0 +1,51 @@
+import os
+import struct
+import tempfile
+
+from scapy.all import IP, TCP, UDP, Ether
+
+from monitor.pcap_replay import PCAP_NSEC_MAGIC, PcapReader, PcapReplayManager
+from monitor.pcap_ring import PcapRing
+
+
+def test_reader_handles_big_endian_nanosecond_files():
+    """Test the byte order and timestamp resolution come from the header."""
+    frame = bytes(Ether() / IP(dst="10.0.0.2") / UDP(dport=53))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "capture.pcap")
+        with open(path, "wb") as f:
+            f.write(struct.pack(">IHHiIII", PCAP_NSEC_MAGIC, 2, 4, 0, 0, 65535, 1))
+            f.write(struct.pack(">IIII", 1700000000, 500000000, len(frame), 1500))
+            f.write(frame)
+
+        with PcapReader(path) as reader:
+            frames = list(reader)
+        assert reader.link_type == 1
+        assert frames == [(frame, 1500, 1700000000.5)]
+
+
+def test_replay_decodes_and_queues_every_frame():
+    """Test each worker replays its files through the decoder to the queue."""
+    tcp = bytes(Ether() / IP(src="10.0.0.1", dst="10.0.0.2") / TCP(dport=443))
+    udp = bytes(Ether() / IP(src="10.0.0.3", dst="10.0.0.2") / UDP(dport=53))
+    with tempfile.TemporaryDirectory() as directory:
+        for name, frame in (("a", tcp), ("b", udp)):
+            ring = PcapRing(directory, name)
+            for i in range(3):
+                ring.write(frame, timestamp=1700000000 + i)
+            ring.close()
+        files = sorted(
+            os.path.join(directory, entry) for entry in os.listdir(directory)
+        )
+
+        manager = PcapReplayManager(files, interface="replay", parallel=True)
+        manager._packet_capture_worker("replay", 1)
+
+    packets = [manager.packet_queue.get(timeout=1) for _ in range(3)]
+    assert {packet["protocol"] for packet in packets} == {"UDP"}
+    assert packets[0]["interface"] == "replay"
+    assert packets[-1]["timestamp"].timestamp() == 1700000002
+    counters = manager.get_capture_counters()
+    assert counters["kernel_received"] == 3
+    assert counters["captured"] == 3
+    assert manager.replay_span[2:4] == [1700000000, 1700000002]
@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+from scapy.all import IP, UDP, Ether, rdpcap
+
+from monitor.pcap_ring import PcapRing
+
+
+def test_ring_rotates_and_keeps_latest_files():
+    """Test frames are written as pcap files and old files are removed."""
+    frame = bytes(Ether() / IP(dst="10.0.0.2") / UDP(dport=53) / (b"x" * 50))
+    with tempfile.TemporaryDirectory() as directory:
+        ring = PcapRing(directory, "eth0.0", file_size=1000, file_count=2)
+        for i in range(30):
+            ring.write(frame, len(frame) + 10, timestamp=1700000000.25 + i)
+        ring.close()
+
+        files = sorted(os.listdir(directory))
+        assert len(files) == 2
+        packets = rdpcap(os.path.join(directory, files[-1]))
+        assert packets[-1].time == 1700000029.25
+        assert packets[-1].wirelen == len(frame) + 10
+        assert packets[-1][UDP].dport == 53
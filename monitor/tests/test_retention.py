@@ -0,0 +1,89 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from monitor.models import Flow, NetworkInterface, Packet
+from monitor.retention import FlowRetention, PacketRetention
+
+
+class TestPacketRetention(TestCase):
+    def setUp(self):
+        self.interface = NetworkInterface.objects.create(name="eth0")
+        now = timezone.now()
+        Packet.objects.bulk_create(
+            [
+                Packet(
+                    timestamp=now - timezone.timedelta(hours=10 - i),
+                    interface=self.interface,
+                    protocol="TCP",
+                    source_ip="192.168.1.100",
+                    destination_ip="10.0.0.1",
+                    source_port=8080,
+                    destination_port=443,
+                    packet_size=60,
+                )
+                for i in range(10)
+            ]
+        )
+
+    def test_evicts_oldest_over_capacity(self):
+        """Test the oldest packets beyond max_packets are deleted in chunks."""
+        newest_ids = list(
+            Packet.objects.order_by("-id").values_list("id", flat=True)[:4]
+        )
+        retention = PacketRetention(max_packets=4, eviction_chunk=2)
+
+        self.assertEqual(retention.enforce(), 6)
+        self.assertCountEqual(
+            Packet.objects.values_list("id", flat=True), newest_ids
+        )
+
+    def test_evicts_expired_packets(self):
+        """Test packets older than max_age_hours are deleted."""
+        retention = PacketRetention(max_age_hours=4.5)
+
+        self.assertEqual(retention.enforce(), 6)
+        self.assertEqual(Packet.objects.count(), 4)
+
+    def test_counter_tracks_inserts(self):
+        """Test inserts are counted in-process and drive eviction."""
+        retention = PacketRetention(max_packets=12, check_interval=0)
+        retention.sync()
+        retention.record_inserted(5)
+
+        with self.assertNumQueries(0):
+            retention.record_inserted(1)
+        self.assertEqual(retention.enforce(), 4)
+
+
+class TestFlowRetention(TestCase):
+    def setUp(self):
+        interface = NetworkInterface.objects.create(name="eth0")
+        now = timezone.now()
+        Flow.objects.bulk_create(
+            [
+                Flow(
+                    interface=interface,
+                    protocol="TCP",
+                    source_ip="192.168.1.100",
+                    destination_ip="10.0.0.1",
+                    source_port=40000 + i,
+                    destination_port=443,
+                    first_seen=now - timezone.timedelta(hours=11 - i),
+                    last_seen=now - timezone.timedelta(hours=10 - i),
+                    packets=1,
+                    bytes=60,
+                    reverse_packets=0,
+                    reverse_bytes=0,
+                )
+                for i in range(10)
+            ]
+        )
+
+    def test_evicts_flows_by_age_and_count(self):
+        """Test flows are aged out by last_seen, then capped by count."""
+        self.assertEqual(FlowRetention(max_age_hours=4.5).enforce(), 6)
+        self.assertEqual(FlowRetention(max_flows=3).enforce(), 1)
+        self.assertEqual(
+            list(Flow.objects.order_by("source_port").values_list("source_port")),
+            [(40007,), (40008,), (40009,)],
+        )
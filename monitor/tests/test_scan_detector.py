@@ -0,0 +1,63 @@
+from monitor.scan_detector import ScanDetector, is_probe
+from monitor.sketches import HyperLogLog
+
+
+def make_packet(destination_ip="10.0.0.1", destination_port=22, **fields):
+    packet_data = {
+        "interface": "eth0",
+        "protocol": "TCP",
+        "source_ip": "172.16.0.66",
+        "source_port": 40000,
+        "destination_ip": destination_ip,
+        "destination_port": destination_port,
+        "tcp_flags": 0x02,
+    }
+    packet_data.update(fields)
+    return packet_data
+
+
+class TestHyperLogLog:
+    def test_estimates_and_merges(self):
+        """Test exact small counts, estimates within a few percent, merging."""
+        small = HyperLogLog(precision=10)
+        for i in range(100):
+            small.add(str(i % 50))
+        assert small.count() == 50
+
+        first, second = HyperLogLog(precision=10), HyperLogLog(precision=10)
+        for i in range(20000):
+            first.add(f"a{i}")
+            second.add(f"b{i}")
+        assert abs(first.count() - 20000) < 20000 * 0.1
+        first.merge(second)
+        first.merge(small)
+        assert abs(first.count() - 40050) < 40050 * 0.1
+
+
+class TestScanDetector:
+    def test_detects_scans_in_sliding_window(self):
+        """Test vertical and horizontal scans, replies and window expiry."""
+        detector = ScanDetector(window=60, panes=6, port_threshold=100)
+        vertical = [make_packet(destination_port=port) for port in range(1, 151)]
+        scans = detector.update(vertical, now=1000.0)
+        assert [(scan["kind"], scan["ports"], scan["hosts"]) for scan in scans] == [
+            ("vertical", 150, 1)
+        ]
+
+        horizontal = [
+            make_packet(f"10.1.0.{host}", 445, source_ip="172.16.0.77")
+            for host in range(60)
+        ]
+        assert detector.update(horizontal, now=1010.0)[0]["kind"] == "horizontal"
+
+        # SYN-ACKs and replies from service ports are not probes
+        assert not is_probe(make_packet(tcp_flags=0x12))
+        assert not is_probe(
+            make_packet(protocol="UDP", source_port=53, destination_port=50000)
+        )
+
+        # Split across panes a scan still counts; once expired it is forgotten
+        assert detector.update(vertical[:80], now=1100.0) == []
+        assert len(detector.update(vertical[80:], now=1125.0)) == 1
+        assert detector.update([], now=1300.0) == []
+        assert len(detector) == 0
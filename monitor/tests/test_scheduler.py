@@ -0,0 +1,39 @@
+import threading
+import time
+
+from monitor.scheduler import Scheduler
+
+
+class TestScheduler:
+    def test_runs_jobs_without_overlap(self):
+        """Test jobs repeat, slow jobs are skipped not doubled, failures count."""
+        scheduler = Scheduler(tick=0.01)
+        calls = []
+        concurrent = []
+        release = threading.Event()
+
+        def slow():
+            concurrent.append(sum(1 for name in calls if name == "slow"))
+            calls.append("slow")
+            release.wait(1)
+
+        def failing():
+            raise RuntimeError("boom")
+
+        scheduler.add_job("fast", lambda: calls.append("fast"), 0.05, jitter=0.2)
+        scheduler.add_job("slow", slow, 0.05, jitter=0)
+        scheduler.add_job("failing", failing, 0.05)
+
+        runner = threading.Thread(target=scheduler.run)
+        runner.start()
+        time.sleep(0.4)
+        release.set()
+        scheduler.stop()
+        runner.join(5)
+
+        metrics = scheduler.get_metrics()
+        assert metrics["fast"]["runs"] >= 4
+        assert metrics["slow"]["runs"] == 1 and metrics["slow"]["skipped"] >= 3
+        assert concurrent == [0]
+        assert metrics["failing"]["failures"] == metrics["failing"]["runs"] >= 1
+        assert metrics["failing"]["last_error"] == "boom"
@@ -1,5 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock
+from monitor.sampling import LoadShedder
 from monitor.sniffer import PacketCaptureManager
 from scapy.packet import Packet as ScapyPacket
 from scapy.layers.inet import IP, TCP
@@ -60,3 +61,241 @@ class TestPacketCaptureManager:
         assert processed_packet['source_ip'] == '192.168.1.100'
         assert processed_packet['destination_ip'] == '10.0.0.1'
         assert processed_packet['protocol'] == 'TCP'
+
+    @pytest.mark.django_db
+    def test_flush_batch(self):
+        """Test a batch of packets is written with a single bulk insert."""
+        from django.utils import timezone
+        from monitor.models import Packet
+
+        manager = PacketCaptureManager(interfaces=["eth0"], batch_size=2)
+        captured_at = timezone.now() - timezone.timedelta(minutes=5)
+        batch = [
+            {
+                "interface": "eth0",
+                "timestamp": captured_at,
+                "summary": "TCP: 192.168.1.100:8080 -> 10.0.0.1:443",
+                "protocol": "TCP",
+                "source_ip": "192.168.1.100",
+                "destination_ip": "10.0.0.1",
+                "source_port": 8080,
+                "destination_port": 443,
+                "packet_size": 60,
+            },
+            {
+                "interface": "eth0",
+                "timestamp": captured_at,
+                "summary": "ICMP: 192.168.1.100:N/A -> 10.0.0.1:N/A",
+                "protocol": "ICMP",
+                "source_ip": "192.168.1.100",
+                "destination_ip": "10.0.0.1",
+                "source_port": None,
+                "destination_port": None,
+                "packet_size": 84,
+            },
+        ]
+
+        assert manager._flush_batch(batch) == 2
+        assert Packet.objects.count() == 2
+        assert Packet.objects.filter(timestamp=captured_at).count() == 2
+        assert Packet.objects.filter(interface__name="eth0").count() == 2
+
+    def test_capture_options(self):
+        """Test per-interface capture options override the global ones."""
+        manager = PacketCaptureManager(
+            interfaces=["eth0", "eth1"],
+            packet_filter="tcp",
+            snaplen=128,
+            interface_options={"eth1": {"filter": "udp port 53", "snaplen": None}},
+        )
+        options = manager._get_capture_options("eth0")
+        assert options["filter"] == "tcp"
+        assert options["snaplen"] == 128
+        assert options["buffer_size"] is None
+        assert manager._get_capture_options("eth1")["filter"] == "udp port 53"
+        assert manager._get_capture_options("eth1")["snaplen"] == 128
+
+    def test_interface_env_overrides(self):
+        """Test per-interface variables and the shared limits reach the manager."""
+        from django.test import override_settings
+
+        from monitor.sniffer import start_sniffing
+
+        env = {
+            "NETCREEP_CAPTURE_INTERFACES": "eth0,eth1",
+            "NETCREEP_RING_BLOCK_SIZE_ETH1": "262144",
+            "NETCREEP_RING_BLOCK_TIMEOUT_ETH1": "10",
+            "NETCREEP_SNAPLEN_ETH0": "96",
+        }
+        with patch.dict("os.environ", env), patch(
+            "monitor.sniffer.PacketCaptureManager"
+        ) as manager, override_settings(
+            MAX_PACKET_STORE=1000, PACKET_RETENTION_HOURS=6, FLOW_RETENTION_HOURS=48
+        ):
+            start_sniffing()
+        kwargs = manager.call_args.kwargs
+        assert kwargs["max_packet_store"] == 1000
+        assert kwargs["max_packet_age_hours"] == 6
+        assert kwargs["max_flow_age_hours"] == 48
+        options = kwargs["interface_options"]
+        assert options["eth0"]["snaplen"] == 96
+        assert options["eth0"]["ring_block_size"] is None
+        assert options["eth1"]["ring_block_size"] == 262144
+        assert options["eth1"]["ring_block_timeout"] == 10
+
+    def test_mmap_ring_walks_block(self):
+        """Test every frame of a TPACKET_V3 block is handled, then released."""
+        import threading
+
+        from monitor.capture_engines import (
+            _BLOCK_HEADER,
+            _BLOCK_HEADER_OFFSET,
+            _TPACKET3_HEADER,
+            TP_STATUS_KERNEL,
+            TP_STATUS_USER,
+            mmap_ring_capture,
+        )
+
+        class Ring(bytearray):
+            """Stands in for the kernel's mapping of a one-block ring."""
+
+            def close(self):
+                pass
+
+        block_size = 4096
+        ring = Ring(block_size)
+        frames = [b"first frame", b"second, longer frame"]
+        _BLOCK_HEADER.pack_into(ring, _BLOCK_HEADER_OFFSET, TP_STATUS_USER, 2, 48)
+        offset = 48
+        for index, frame in enumerate(frames):
+            next_offset = 128 if index == 0 else 0
+            _TPACKET3_HEADER.pack_into(
+                ring, offset, next_offset, 1700000000 + index, 500000000,
+                len(frame), len(frame) + 100, 0, 32, 46,
+            )
+            ring[offset + 32 : offset + 32 + len(frame)] = frame
+            offset += next_offset
+
+        stop_event = threading.Event()
+        handled = []
+
+        def handle_frame(frame, wire_length, timestamp):
+            handled.append((bytes(frame), wire_length, timestamp))
+            stop_event.set()
+
+        with patch("monitor.capture_engines.mmap.mmap", return_value=ring), patch(
+            "monitor.capture_engines.select.poll"
+        ):
+            mmap_ring_capture(
+                MagicMock(), handle_frame, stop_event, block_size=block_size,
+                block_count=1,
+            )
+
+        assert handled == [
+            (b"first frame", 111, 1700000000.5),
+            (b"second, longer frame", 120, 1700000001.5),
+        ]
+        status = _BLOCK_HEADER.unpack_from(ring, _BLOCK_HEADER_OFFSET)[0]
+        assert status == TP_STATUS_KERNEL
+
+    def test_snaplen_program(self):
+        """Test snaplen is enforced by the BPF program return value."""
+        from monitor.bpf import BPF_RET_K, compile_filter
+
+        assert compile_filter(snaplen=96) == [(BPF_RET_K, 0, 0, 96)]
+
+    def test_decode_frame_matches_scapy(self):
+        """Test the fast decoder produces the same fields as scapy."""
+        from scapy.layers.inet import ICMP, UDP
+        from scapy.layers.inet6 import IPv6, IPv6ExtHdrHopByHop
+        from scapy.layers.l2 import Dot1Q, Ether
+
+        from monitor.packet_decoder import decode_frame
+
+        manager = PacketCaptureManager(interfaces=["eth0"])
+        eth = Ether(src="00:11:22:33:44:55", dst="66:77:88:99:aa:bb")
+        frames = [
+            eth / IP(src="192.168.1.100", dst="10.0.0.1") / TCP(sport=8080, dport=443),
+            eth / Dot1Q(vlan=10) / IP(src="10.0.0.2", dst="10.0.0.3") / UDP(dport=53),
+            eth / IP(src="10.0.0.2", dst="10.0.0.3") / ICMP(),
+            eth
+            / IPv6(src="fe80::1", dst="2001:db8::2")
+            / IPv6ExtHdrHopByHop()
+            / TCP(sport=1234, dport=22),
+        ]
+        for frame in frames:
+            raw_frame = bytes(frame)
+            expected = manager._process_packet(Ether(raw_frame), "eth0")
+            decoded = decode_frame(memoryview(raw_frame), "eth0")
+            expected.pop("timestamp")
+            decoded.pop("timestamp")
+            assert decoded == expected
+
+        compact = decode_frame(raw_frame, "eth0", timestamp=1700000000.5, compact=True)
+        assert compact["timestamp"] == 1700000000.5 and "summary" not in compact
+
+        arp_frame = bytes(eth)[:12] + b"\x08\x06" + b"\x00" * 28
+        assert decode_frame(arp_frame) is None
+
+    def test_capture_counters_merge_workers(self):
+        """Test per-worker counters are merged per interface and overall."""
+        manager = PacketCaptureManager(
+            interfaces=["eth0", "eth1"], workers_per_interface=2
+        )
+        manager.worker_counters[:] = [10, 1, 20, 0, 5, 2, 0, 0]
+
+        counters = manager.get_capture_counters()
+        assert counters["captured"] == 35
+        assert counters["dropped"] == 3
+        assert counters["interfaces"]["eth0"]["captured"] == 30
+        assert counters["interfaces"]["eth1"]["dropped"] == 2
+        assert len(counters["interfaces"]["eth1"]["workers"]) == 2
+
+    def test_interface_sharding_caps_writers(self, caplog):
+        """Test writers beyond the interface count are not started."""
+        manager = PacketCaptureManager(
+            interfaces=["eth0", "eth1"], num_writers=4, shard_by="interface"
+        )
+        assert manager.num_writers == 2
+        assert len(manager.packet_queues) == 2
+        assert "Capping 4 packet writers" in caplog.text
+
+        manager = PacketCaptureManager(
+            interfaces=["eth0"], num_writers=4, shard_by="flow"
+        )
+        assert manager.num_writers == 4
+
+    def test_flow_sharding_is_symmetric(self):
+        """Test both directions of a flow are routed to the same writer."""
+        manager = PacketCaptureManager(
+            interfaces=["eth0"], num_writers=4, shard_by="flow"
+        )
+        forward = {
+            "protocol": "TCP",
+            "source_ip": "10.0.0.1",
+            "destination_ip": "10.0.0.2",
+            "source_port": 40000,
+            "destination_port": 443,
+        }
+        reverse = {
+            "protocol": "TCP",
+            "source_ip": "10.0.0.2",
+            "destination_ip": "10.0.0.1",
+            "source_port": 443,
+            "destination_port": 40000,
+        }
+        writer = manager._get_writer(forward, "eth0")
+        assert 0 <= writer < 4
+        assert manager._get_writer(reverse, "eth0") == writer
+
+    def test_load_shedding_sampling(self):
+        """Test sampling steps in as the queue fills and records its rate."""
+        shedder = LoadShedder(queues=1, capacity=100)
+        assert shedder.rate_for_depth(10) == 1
+        assert shedder.rate_for_depth(50) == 2
+        assert shedder.rate_for_depth(96) == 64
+
+        packet_data = {"source_ip": "10.0.0.1"}
+        rates = [shedder.sample(0, packet_data, lambda _: 75) for _ in range(64)]
+        assert set(rates) == {0, 8}
+        assert rates.count(8) == 8
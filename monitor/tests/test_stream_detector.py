@@ -0,0 +1,115 @@
+import statistics
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from monitor.models import NetworkAnomaly
+from monitor.sniffer import PacketCaptureManager
+from monitor.stream_detector import (
+    DecayingCounter,
+    RunningStats,
+    StreamingAnomalyDetector,
+)
+
+
+def make_packet(source_ip="192.168.1.100", protocol="TCP", size=100):
+    return {
+        "interface": "eth0",
+        "timestamp": timezone.now(),
+        "protocol": protocol,
+        "source_ip": source_ip,
+        "destination_ip": "10.0.0.1",
+        "source_port": 40000,
+        "destination_port": 443,
+        "packet_size": size,
+    }
+
+
+class TestStreamingPrimitives:
+    def test_running_stats_and_decay(self):
+        """Test Welford statistics and decaying counters."""
+        values = [3.0, 7.0, 1.0, 9.0, 4.0]
+        stats = RunningStats()
+        for value in values:
+            stats.update(value)
+        assert abs(stats.mean - statistics.mean(values)) < 1e-9
+        assert abs(stats.variance - statistics.variance(values)) < 1e-9
+
+        counter = DecayingCounter(time_constant=10.0)
+        counter.add("a", 100, now=0.0)
+        counter.add("a", 100, now=10.0)
+        assert abs(counter.get("a", 10.0) - (100 / 2.718281828 + 100)) < 0.01
+        counter.prune(now=100.0, minimum=1.0)
+        assert len(counter) == 0
+
+
+class TestStreamingAnomalyDetector(TestCase):
+    def test_raises_anomalies_with_cooldown(self):
+        """Test rate spikes and busy sources raise anomalies once."""
+        detector = StreamingAnomalyDetector(warmup_ticks=10, ip_packet_threshold=5000)
+        now = 1000.0
+        for tick in range(20):
+            now += 1.0
+            packets = [
+                make_packet(f"10.0.{tick}.{i}", ("TCP", "UDP", "ICMP")[i % 3])
+                for i in range(200)
+            ]
+            assert detector.process(packets, now) == []
+
+        now += 1.0
+        burst = [make_packet("172.16.0.66") for _ in range(6000)]
+        raised = detector.process(burst, now)
+        assert {anomaly["type"] for anomaly in raised} == {
+            "IP Behavior",
+            "Traffic Spike",
+        }
+        assert NetworkAnomaly.objects.filter(
+            interface__name="eth0", severity="critical", is_resolved=False
+        ).exists()
+
+        now += 1.0
+        assert detector.process(burst, now) == []
+
+    def test_expired_cooldowns_are_forgotten(self):
+        """Test a source's cooldown entry is dropped once it has expired."""
+        detector = StreamingAnomalyDetector(ip_packet_threshold=100, cooldown=30.0)
+        burst = [make_packet("172.16.0.66") for _ in range(200)]
+        raised = detector.process(burst, 1000.0)
+        assert [anomaly["type"] for anomaly in raised] == ["IP Behavior"]
+        assert ("eth0", "IP Behavior", "172.16.0.66") in detector._last_raised
+
+        detector.process([], 1010.0)
+        assert ("eth0", "IP Behavior", "172.16.0.66") in detector._last_raised
+        detector.process([], 1100.0)
+        assert detector._last_raised == {}
+
+    def test_runs_on_packet_time(self):
+        """Test ticks follow packet timestamps, however fast batches arrive."""
+        detector = StreamingAnomalyDetector(warmup_ticks=10, ip_packet_threshold=1e9)
+        started = timezone.now() - timedelta(hours=2)
+        for tick in range(20):
+            packets = [
+                make_packet(f"10.0.{tick}.{i}", ("TCP", "UDP", "ICMP")[i % 3])
+                for i in range(200)
+            ]
+            for packet_data in packets:
+                packet_data["timestamp"] = started + timedelta(seconds=tick)
+            assert detector.process(packets) == []
+        assert detector.process([]) == []
+
+        burst = [make_packet("172.16.0.66") for _ in range(6000)]
+        for packet_data in burst:
+            packet_data["timestamp"] = started + timedelta(seconds=21)
+        raised = detector.process(burst)
+        assert [anomaly["type"] for anomaly in raised] == ["Traffic Spike"]
+
+
+def test_flow_sharded_writers_share_one_detector():
+    """Test detection moves to one process when writers split interfaces."""
+    shared = PacketCaptureManager(interfaces=["eth0"], num_writers=2, shard_by="flow")
+    assert shared.detection_queue is not None
+    per_writer = PacketCaptureManager(
+        interfaces=["eth0", "eth1"], num_writers=2, shard_by="interface"
+    )
+    assert per_writer.detection_queue is None
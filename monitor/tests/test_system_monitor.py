@@ -0,0 +1,27 @@
+import time
+from unittest import mock
+
+from django.test import TestCase
+
+from monitor import system_monitor
+from monitor.models import SystemStat
+from monitor.system_monitor import SystemStatsSampler, get_system_stats
+
+
+class TestSystemStatsSampler(TestCase):
+    def test_requests_serve_the_sampled_snapshot(self):
+        """Test requests reuse the sampler's snapshot and rows are throttled."""
+        sampler = SystemStatsSampler(save_interval=60)
+        sampler.sample()
+        stats = sampler.sample()
+        assert SystemStat.objects.count() == 1
+
+        with mock.patch.object(system_monitor, "collect_system_stats") as collect:
+            for _ in range(100):
+                assert get_system_stats() is stats
+            collect.assert_not_called()
+
+            # A stale snapshot is replaced, as without a running sampler
+            stats["timestamp"] = time.time() - 3600
+            collect.return_value = {"timestamp": time.time()}
+            assert get_system_stats() is collect.return_value
@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from monitor import tasks
+from monitor.retention import PacketRetention
+from monitor.scheduler import Scheduler
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class TestTasks(TestCase):
+    @override_settings(
+        ANOMALY_DETECTION_INTERVAL=120,
+        SYSTEM_STATS_INTERVAL=2,
+        PACKET_CLEANUP_INTERVAL=600,
+        PACKET_PARTITION_DAYS=1,
+    )
+    def test_register_jobs_wires_intervals(self):
+        """Test every job is registered with its configured interval."""
+        scheduler = Scheduler()
+        tasks.register_jobs(scheduler)
+
+        intervals = {name: job.interval for name, job in scheduler.jobs.items()}
+        assert intervals == {
+            "detect_anomalies": 120,
+            "sample_system_stats": 2,
+            "cleanup_packets": 600,
+            "create_packet_partitions": 3600,
+        }
+        assert scheduler.jobs["cleanup_packets"].func is tasks.cleanup_packets
+
+    def test_jobs_call_through(self):
+        """Test each job runs the work it wraps with its configured limits."""
+        with mock.patch.object(tasks, "run_anomaly_detection") as detect:
+            tasks.detect_anomalies()
+        detect.assert_called_once_with(time_window_hours=1)
+
+        with mock.patch.object(tasks.system_stats_sampler, "sample") as sample:
+            tasks.sample_system_stats()
+        sample.assert_called_once_with()
+
+        with override_settings(PACKET_PARTITION_DAYS=2), mock.patch.object(
+            tasks, "PacketPartitions"
+        ) as partitions:
+            partitions.return_value.ensure.return_value = 0
+            tasks.create_packet_partitions()
+        partitions.assert_called_once_with(days=2)
+
+    @override_settings(
+        CACHES=LOCMEM_CACHE,
+        MAX_PACKET_STORE=10,
+        PACKET_RETENTION_HOURS=24,
+        MAX_FLOW_STORE=None,
+        FLOW_RETENTION_HOURS=None,
+    )
+    def test_cleanup_skipped_while_capture_enforces_retention(self):
+        """Test cleanup enforces retention unless a capture already does."""
+        with mock.patch.object(tasks, "PacketRetention") as retention:
+            retention.return_value.enforce.return_value = 0
+            tasks.cleanup_packets()
+            retention.assert_called_once_with(max_packets=10, max_age_hours=24)
+
+            PacketRetention(check_interval=0).maybe_enforce()
+            retention.reset_mock()
+            tasks.cleanup_packets()
+        retention.assert_not_called()
@@ -0,0 +1,22 @@
+from monitor.telemetry import SharedHistogram
+
+
+class TestSharedHistogram:
+    def test_summary_merges_rows(self):
+        """Test rows are merged and percentiles land on bucket bounds."""
+        histogram = SharedHistogram(rows=2)
+        for value in (1, 2, 3, 100):
+            histogram.record(0, value)
+        histogram.record(1, 1000)
+
+        summary = histogram.summary()
+        assert summary["count"] == 5
+        assert summary["mean"] == 221.2
+        assert summary["p50"] == 4
+        assert summary["max"] == 1024
+
+    def test_empty_summary(self):
+        """Test an empty histogram reports no percentiles."""
+        summary = SharedHistogram(rows=1).summary(1e-6)
+        assert summary["count"] == 0
+        assert summary["p99"] is None
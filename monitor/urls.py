@@ -18,6 +18,11 @@ urlpatterns = [
     # Packet Capture
     path("start-sniffing/", views.start_sniffing_view, name="start_sniffing"),
     path("packet-history/", views.packet_history_view, name="packet_history"),
+    path(
+        "capture-telemetry/",
+        views.capture_telemetry_json,
+        name="capture_telemetry",
+    ),
     path(
         "packet-history/export/csv/",
         views.export_packets_csv,
@@ -28,6 +33,16 @@ urlpatterns = [
         views.export_packets_json,
         name="export_packets_json",
     ),
+    path(
+        "packet-history/export/ndjson/",
+        views.export_packets_ndjson,
+        name="export_packets_ndjson",
+    ),
+    path(
+        "scheduler-metrics/",
+        views.scheduler_metrics_json,
+        name="scheduler_metrics",
+    ),
     # Analysis
     path("network-analysis/", views.network_analysis_view, name="network_analysis"),
     path("anomalies/", views.anomalies_view, name="anomalies"),
@@ -1,4 +1,3 @@
-import csv
 import json
 import logging
 import threading
@@ -6,18 +5,24 @@ from datetime import timedelta
 import os
 
 from django.contrib import messages
+from django.core.handlers.asgi import ASGIRequest
 from django.core.serializers.json import DjangoJSONEncoder
-from django.db.models import Count, Q, Sum
+from django.db.models import Q
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 import psutil
 
 from .alert_service import check_threshold
+from .exports import stream_packet_export
 from .forms import AlertThresholdForm
+from .heavy_hitters import get_heavy_hitters
 from .models import Alert, AlertThreshold, NetworkAnomaly, Packet, SystemStat
+from .rollups import rollup_totals
+from .scheduler import get_scheduler_metrics
 from .sniffer import start_sniffing
 from .system_monitor import get_system_stats
+from .telemetry import get_published_telemetry
 
 logger = logging.getLogger(__name__)
 
@@ -170,8 +175,22 @@ def system_stats_json(request):
     return JsonResponse(stats)
 
 
+def capture_telemetry_json(request):
+    # Read the running capture directly, or the snapshot its writer published
+    if capture_manager is not None and sniffing_active:
+        telemetry = capture_manager.get_telemetry()
+    else:
+        telemetry = get_published_telemetry()
+    return JsonResponse({"active": sniffing_active, "telemetry": telemetry})
+
+
+def scheduler_metrics_json(request):
+    # Published by the run_scheduler command after every job run
+    return JsonResponse({"jobs": get_scheduler_metrics()})
+
+
 def anomalies_view(request):
-    recent_anomalies = NetworkAnomaly.objects.filter(resolved=False).order_by(
+    recent_anomalies = NetworkAnomaly.objects.filter(is_resolved=False).order_by(
         "-timestamp"
     )[:10]
     return render(
@@ -180,62 +199,50 @@ def anomalies_view(request):
 
 
 def get_protocol_distribution():
-    return (
-        Packet.objects.values("protocol").annotate(count=Count("id")).order_by("-count")
-    )
+    return [
+        {"protocol": row["key"], "count": row["packets"]}
+        for row in rollup_totals("protocol")
+    ]
 
 
 def get_top_talkers():
-    return (
-        Packet.objects.values("source_ip")
-        .annotate(packet_count=Count("id"), total_bytes=Sum("packet_size"))
-        .order_by("-packet_count")[:10]
-    )
+    # A running capture's heavy hitters cover about the last hour; without
+    # one, fall back to the all-time rollups
+    talkers = get_heavy_hitters("source_ip", limit=10)
+    if talkers is None:
+        talkers = rollup_totals("source_ip", limit=10)
+    return [
+        {
+            "source_ip": row["key"],
+            "packet_count": row["packets"],
+            "total_bytes": row["bytes"],
+        }
+        for row in talkers
+    ]
 
 
 def get_port_activity():
-    return (
-        Packet.objects.filter(destination_port__isnull=False)
-        .values("destination_port")
-        .annotate(count=Count("id"))
-        .order_by("-count")[:10]
-    )
+    ports = get_heavy_hitters("destination_port", limit=10)
+    if ports is None:
+        ports = rollup_totals("destination_port", limit=10)
+    return [
+        {"destination_port": int(row["key"]), "count": row["packets"]}
+        for row in ports
+    ]
 
 
 def network_analysis_view(request):
-    # Get protocol distribution
-    protocol_dist = list(
-        Packet.objects.values("protocol").annotate(count=Count("id")).order_by("-count")
-    )
-    print("Protocol Distribution:", protocol_dist)  # Debug print
-
-    # Get top talkers
-    top_talkers = list(
-        Packet.objects.values("source_ip")
-        .annotate(packet_count=Count("id"), total_bytes=Sum("packet_size"))
-        .exclude(source_ip__isnull=True)
-        .order_by("-packet_count")[:10]
-    )
-    print("Top Talkers:", top_talkers)  # Debug print
-
-    # Get port activity
-    port_activity = list(
-        Packet.objects.values("destination_port")
-        .annotate(count=Count("id"))
-        .exclude(destination_port__isnull=True)
-        .order_by("-count")[:10]
-    )
-    print("Port Activity:", port_activity)  # Debug print
+    # Read the traffic rollups rather than grouping the packet table
+    protocol_dist = get_protocol_distribution()
+    top_talkers = get_top_talkers()
+    port_activity = get_port_activity()
 
-    # Create context with debug information
     context = {
         "protocol_distribution": json.dumps(protocol_dist, cls=DjangoJSONEncoder),
         "top_talkers": json.dumps(top_talkers, cls=DjangoJSONEncoder),
         "port_activity": json.dumps(port_activity, cls=DjangoJSONEncoder),
-        "debug_packet_count": Packet.objects.count(),  # Add total packet count
+        "debug_packet_count": sum(proto["count"] for proto in protocol_dist),
     }
-
-    print("Context being sent to template:", context)  # Debug print
     return render(request, "monitor/network_analysis.html", context)
 
 
@@ -319,65 +326,22 @@ def test_alert(request):
 
 
 def export_packets_csv(request):
-    response = HttpResponse(content_type="text/csv")
-    response[
-        "Content-Disposition"
-    ] = f'attachment; filename="packet_history_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(
-        [
-            "Timestamp",
-            "Protocol",
-            "Source IP",
-            "Source Port",
-            "Destination IP",
-            "Destination Port",
-            "Size",
-            "Summary",
-        ]
-    )
+    return _export_packets(request, "csv")
 
-    packets = Packet.objects.all().order_by("-timestamp")
-    for packet in packets:
-        writer.writerow(
-            [
-                packet.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                packet.protocol,
-                packet.source_ip,
-                packet.source_port,
-                packet.destination_ip,
-                packet.destination_port,
-                packet.packet_size,
-                str(packet),
-            ]
-        )
 
-    return response
+def export_packets_json(request):
+    return _export_packets(request, "json")
 
 
-def export_packets_json(request):
-    packets = Packet.objects.all().order_by("-timestamp")
-    packet_list = []
+def export_packets_ndjson(request):
+    return _export_packets(request, "ndjson")
 
-    for packet in packets:
-        packet_list.append(
-            {
-                "timestamp": packet.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                "protocol": packet.protocol,
-                "source_ip": packet.source_ip,
-                "source_port": packet.source_port,
-                "destination_ip": packet.destination_ip,
-                "destination_port": packet.destination_port,
-                "size": packet.packet_size,
-                "summary": str(packet),
-            }
-        )
 
-    response = HttpResponse(
-        json.dumps(packet_list, indent=2), content_type="application/json"
-    )
-    response[
-        "Content-Disposition"
-    ] = f'attachment; filename="packet_history_{timezone.now().strftime("%Y%m%d_%H%M%S")}.json"'
-    return response
+def _export_packets(request, export_format):
+    """Stream packets filtered by time range and protocol as a download."""
+    try:
+        return stream_packet_export(
+            request.GET, export_format, asynchronous=isinstance(request, ASGIRequest)
+        )
+    except ValueError as e:
+        return HttpResponse(str(e), status=400)
@@ -134,8 +134,22 @@ RATELIMIT_PERIOD = int(os.getenv("RATE_LIMIT_PERIOD", 3600))
 
 # Network Capture Settings
 CAPTURE_INTERFACES = os.getenv("CAPTURE_INTERFACES", "WiFi,Ethernet").split(",")
-MAX_PACKET_STORE = int(os.getenv("MAX_PACKET_STORE", 50000))
 PACKET_CLEANUP_INTERVAL = int(os.getenv("PACKET_CLEANUP_INTERVAL", 7200))
+# Packet limits, shared with the capture writers, which enforce them while a
+# capture runs; MAX_PACKET_STORE is the cap's older variable name
+MAX_PACKET_STORE = int(
+    os.getenv("NETCREEP_MAX_PACKETS", os.getenv("MAX_PACKET_STORE", 50000))
+)
+PACKET_RETENTION_HOURS = float(os.getenv("NETCREEP_RETENTION_HOURS", 0)) or None
+# Flow limits, shared with the capture writers; 0 for no limit
+MAX_FLOW_STORE = int(os.getenv("NETCREEP_MAX_FLOWS", 0)) or None
+FLOW_RETENTION_HOURS = float(os.getenv("NETCREEP_FLOW_RETENTION_HOURS", 0)) or None
+# Days per partition of a partitioned packet table (PostgreSQL), 0 if unused
+PACKET_PARTITION_DAYS = int(os.getenv("PACKET_PARTITION_DAYS", 0))
+
+# Background jobs run by the run_scheduler command (seconds)
+ANOMALY_DETECTION_INTERVAL = int(os.getenv("ANOMALY_DETECTION_INTERVAL", 300))
+SYSTEM_STATS_INTERVAL = float(os.getenv("SYSTEM_STATS_INTERVAL", 5))
 
 # IP Whitelisting
 ALLOWED_IP_RANGES = os.getenv("ALLOWED_IP_RANGES", "127.0.0.1/32,192.168.1.0/24").split(
@@ -158,11 +172,28 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 # Channels Configuration
 ASGI_APPLICATION = "netcreep.asgi.application"
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer'
+# Set to share dashboard groups between several web processes through Redis
+CHANNEL_REDIS_URL = os.getenv("CHANNEL_REDIS_URL")
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': [CHANNEL_REDIS_URL],
+                # Messages queued per socket before a slow one misses updates
+                'capacity': int(os.getenv("CHANNEL_LAYER_CAPACITY", 100)),
+                'expiry': int(os.getenv("CHANNEL_LAYER_EXPIRY", 10)),
+            },
+        }
     }
-}
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer'
+        }
+    }
+# Seconds between dashboard updates pushed to browsers
+DASHBOARD_PUSH_INTERVAL = float(os.getenv("DASHBOARD_PUSH_INTERVAL", 1))
 
 # Root URL Configuration
 ROOT_URLCONF = "netcreep.urls"
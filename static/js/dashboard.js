@@ -69,20 +69,21 @@ const diskChart = new Chart(document.getElementById('disk-chart').getContext('2d
 const ws = new WebSocket(`ws://${window.location.host}/ws/dashboard/`);
 
 ws.onopen = function() {
+    // The server pushes the current state and then every change
     console.log('WebSocket connected');
-    // Request initial stats
-    ws.send(JSON.stringify({ type: 'get_stats' }));
-    // Request initial packets
-    ws.send(JSON.stringify({ type: 'get_packets' }));
 };
 
 ws.onmessage = function(e) {
     const data = JSON.parse(e.data);
     
-    if (data.type === 'system_stats' && data.data) {
+    if (data.type === 'dashboard_update' && data.data) {
+        applyDashboardUpdate(data.data);
+    } else if (data.type === 'system_stats' && data.data) {
         updateSystemStats(data.data);
     } else if (data.type === 'recent_packets' && data.data) {
         updatePacketTable(data.data);
+    } else if (data.type === 'capture_telemetry' && data.data) {
+        updateCaptureTelemetry(data.data);
     }
 };
 
@@ -94,6 +95,19 @@ ws.onclose = function() {
     }, 5000);
 };
 
+function applyDashboardUpdate(update) {
+    // Only the sections that changed since the last update are sent
+    if (update.system_stats && update.system_stats.timestamp) {
+        updateSystemStats(update.system_stats);
+    }
+    if (update.recent_packets) {
+        updatePacketTable(update.recent_packets);
+    }
+    if (update.capture_telemetry) {
+        updateCaptureTelemetry(update.capture_telemetry);
+    }
+}
+
 function updateSystemStats(stats) {
     // Update display values
     document.getElementById('cpu-usage').textContent = stats.cpu_usage.toFixed(1);
@@ -141,6 +155,18 @@ function updatePacketTable(packets) {
     `).join('');
 }
 
+function updateCaptureTelemetry(telemetry) {
+    const depths = telemetry.queue_depth.current.filter(depth => depth !== null);
+    const latency = telemetry.commit_latency_ms.p99;
+    document.getElementById('capture-captured').textContent = telemetry.capture.captured;
+    document.getElementById('capture-queue-dropped').textContent = telemetry.capture.dropped;
+    document.getElementById('capture-kernel-dropped').textContent = telemetry.capture.kernel_dropped;
+    document.getElementById('capture-queue-depth').textContent =
+        depths.reduce((total, depth) => total + depth, 0);
+    document.getElementById('capture-commit-latency').textContent =
+        latency === null ? '-' : latency.toFixed(1);
+}
+
 function getProtocolColor(protocol) {
     switch (protocol.toUpperCase()) {
         case 'TCP': return 'bg-blue-100 text-blue-800';
@@ -149,11 +175,3 @@ function getProtocolColor(protocol) {
         default: return 'bg-gray-100 text-gray-800';
     }
 }
-
-// Request updates every second
-setInterval(() => {
-    if (ws.readyState === WebSocket.OPEN) {
-        ws.send(JSON.stringify({ type: 'get_stats' }));
-        ws.send(JSON.stringify({ type: 'get_packets' }));
-    }
-}, 1000); 
\ No newline at end of file